@@ -0,0 +1,293 @@
+"""ASGI middleware shared by the FastAPI app in main.py.
+
+These are plain ASGI classes rather than BaseHTTPMiddleware so they add no extra task or body buffering
+per request.
+"""
+import json
+import logging
+import os
+import zlib
+from typing import Dict, Optional
+
+from starlette.exceptions import HTTPException
+
+from database.query_stats import QueryStats, _current, query_metrics
+from database.session import _env_int
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """Count the SQL statements each HTTP request issues.
+
+    Adds `X-DB-Query-Count`, `X-DB-Commit-Count` and `X-DB-Time-Ms` response headers, records per-route
+    totals in `database.query_stats.query_metrics`, and logs a warning when a single statement is repeated
+    DB_N_PLUS_ONE_THRESHOLD (default 10) times within one request.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int | None = None):
+        self.app = app
+        if n_plus_one_threshold is None:
+            try:
+                n_plus_one_threshold = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "10"))
+            except ValueError:
+                n_plus_one_threshold = 10
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-commit-count", str(stats.commits).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_ms:.2f}".encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or scope.get("path", "")
+            repeated = stats.repeated(self.n_plus_one_threshold)
+            if repeated:
+                sql, n = repeated[0]
+                logger.warning("Possible N+1 in %s %s: statement executed %d times: %s", scope.get("method"), route_path, n, sql[:200])
+            query_metrics.record(f"{scope.get('method')} {route_path}", stats, n_plus_one=bool(repeated))
+
+
+# media types worth compressing; everything else (PDFs, images, archives) is already compressed
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """"gzip;q=0.8, br" -> {"gzip": 0.8, "br": 1.0}."""
+    codings: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[name] = q
+    return codings
+
+
+def negotiate_encoding(header: str) -> Optional[str]:
+    """Best of "br" (if brotli is installed) and "gzip" for an Accept-Encoding header, or None."""
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for name in offered:
+        q = codings.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress `data` and flush, so a streamed chunk reaches the client without waiting for more."""
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush()
+
+
+class CompressionMiddleware:
+    """gzip/brotli response compression negotiated from Accept-Encoding.
+
+    Only compressible media types (JSON, NDJSON, CSV and other text) are compressed. Responses that
+    already carry a Content-Encoding, 204/206/304 responses and complete bodies under COMPRESSION_MIN_SIZE
+    bytes (default 1024) are passed through, as are bodies sent through a server extension
+    (`http.response.pathsend`, `http.response.zerocopy`) rather than as `http.response.body` messages.
+    A compressed response is a different representation from the one its validators describe: a strong
+    ETag is made weak and Accept-Ranges is dropped, since byte ranges of the encoded body cannot be
+    served. Streamed bodies are compressed chunk by chunk and flushed after each one. Brotli is preferred
+    when the `brotli` package is installed and the client accepts it. Levels: COMPRESSION_GZIP_LEVEL (default 6) and COMPRESSION_BROTLI_QUALITY (default 4); both trade CPU
+    per response against bytes on the wire.
+    """
+
+    def __init__(self, app, minimum_size: int | None = None, gzip_level: int | None = None, brotli_quality: int | None = None):
+        self.app = app
+        self.minimum_size = _env_int("COMPRESSION_MIN_SIZE", 1024) if minimum_size is None else minimum_size
+        self.gzip_level = _env_int("COMPRESSION_GZIP_LEVEL", 6) if gzip_level is None else gzip_level
+        self.brotli_quality = _env_int("COMPRESSION_BROTLI_QUALITY", 4) if brotli_quality is None else brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", ())}
+                content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+                if (
+                    message["status"] in (204, 206, 304)
+                    or b"content-encoding" in headers
+                    or b"content-range" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                if start is not None:
+                    # the body goes out another way (http.response.pathsend / zerocopy): send it as it is
+                    passthrough = True
+                    await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                # first body chunk: decide, then send the (possibly rewritten) start message
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = []
+                for k, v in start.get("headers", ()):
+                    name = k.lower()
+                    if name in (b"content-length", b"accept-ranges"):
+                        continue
+                    if name == b"etag" and not v.startswith(b"W/"):
+                        v = b"W/" + v
+                    headers.append((k, v))
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body:
+                    body = compressor.finish(body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send(dict(start, headers=headers))
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(dict(start, headers=headers))
+                start = None
+            if more_body:
+                data = compressor.chunk(body) if body else b""
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies over a per-path byte limit before the app buffers them.
+
+    `limits` maps a path prefix to its maximum body size. A declared Content-Length over the limit is
+    answered with 413 straight away, without reading the body. Bodies without one (chunked transfer) are
+    counted as they are received and the read fails with a 413 HTTPException once the limit is passed, so
+    multipart parsing stops spooling at that point.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def limit_for(self, path: str) -> Optional[int]:
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limit_for(scope.get("path", "")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        detail = f"Request body exceeds {limit} bytes"
+        for name, value in scope.get("headers", ()):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > limit:
+                    body = json.dumps({"detail": detail}).encode()
+                    await send({
+                        "type": "http.response.start",
+                        "status": 413,
+                        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), (b"connection", b"close")],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,209 @@
+"""Authenticated-principal resolution shared by every endpoint.
+
+`get_current_user` and `get_current_officer` decode the bearer JWT and resolve its subject to a
+`Principal` (user fields plus the officer profile, if any). The resolved principals are kept in a bounded
+LRU cache, keyed by user id, for PRINCIPAL_CACHE_TTL_SECONDS (default 60) and PRINCIPAL_CACHE_SIZE entries
+(default 1024). A cache hit costs no database round-trip; a miss is one SELECT of users outer-joined to
+lro_officers.
+
+Cache entries are dropped:
+- by `invalidate_principal(user_id)`; call it after changing a user's `is_active` flag or officer profile
+  outside the ORM;
+- automatically, whenever this process inserts, updates or deletes a User or LROOfficer through the ORM
+  (mapper events at the bottom of this module). The entry is dropped at flush and again when the session's
+  transaction commits or rolls back, so a request that cached the old row between the two cannot keep it.
+
+Other workers notice such changes once the TTL expires, so keep the TTL short enough to bound how long a
+deactivated account keeps access.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import jwt
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from database.session import _env_float, _env_int, get_db
+from models.lro_backend_models import LROOfficer, User
+
+JWT_SECRET = os.getenv("JWT_SECRET", "CHANGE_ME")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+
+bearer_scheme = HTTPBearer()
+
+
+@dataclass(frozen=True)
+class OfficerPrincipal:
+    officer_id: int
+    user_id: int
+    employee_id: str
+    assigned_office_id: Optional[int]
+    role: Optional[str]
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of an authenticated user; safe to share between requests and sessions."""
+    user_id: int
+    full_name: str
+    email: str
+    nic_number: str
+    phone_number: Optional[str]
+    user_type: str
+    is_active: bool
+    officer: Optional[OfficerPrincipal] = None
+
+    @property
+    def officer_id(self) -> Optional[int]:
+        return self.officer.officer_id if self.officer else None
+
+
+class PrincipalCache:
+    """Bounded LRU of user_id -> (expires_at, Principal or None for unknown users)."""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        self.maxsize = _env_int('PRINCIPAL_CACHE_SIZE', 1024) if maxsize is None else maxsize
+        self.ttl = _env_float('PRINCIPAL_CACHE_TTL_SECONDS', 60.0) if ttl is None else ttl
+        self._entries: "OrderedDict[int, tuple[float, Optional[Principal]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> tuple[bool, Optional[Principal]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, user_id: int, principal: Optional[Principal]) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate(int(user_id))
+
+
+def _to_principal(user: User, officer: Optional[LROOfficer]) -> Principal:
+    user_type = getattr(user.user_type, "value", user.user_type)
+    return Principal(
+        user_id=user.user_id,
+        full_name=user.full_name,
+        email=user.email,
+        nic_number=user.nic_number,
+        phone_number=user.phone_number,
+        user_type=user_type,
+        is_active=bool(user.is_active),
+        officer=OfficerPrincipal(
+            officer_id=officer.officer_id,
+            user_id=officer.user_id,
+            employee_id=officer.employee_id,
+            assigned_office_id=officer.assigned_office_id,
+            role=officer.role,
+        ) if officer is not None else None,
+    )
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    """Resolve a user id to a Principal, from the cache or with one SELECT."""
+    found, principal = principal_cache.get(user_id)
+    if found:
+        return principal
+    stmt = (
+        select(User, LROOfficer)
+        .outerjoin(LROOfficer, LROOfficer.user_id == User.user_id)
+        .where(User.user_id == user_id)
+        .limit(1)
+    )
+    row = (await db.execute(stmt)).first()
+    principal = _to_principal(row[0], row[1]) if row else None
+    principal_cache.put(user_id, principal)
+    return principal
+
+
+def _token_subject(credentials: HTTPAuthorizationCredentials) -> int:
+    try:
+        data = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    try:
+        return int(data.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token payload")
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    principal = await load_principal(db, _token_subject(credentials))
+    if principal is None or not principal.is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
+    return principal
+
+
+async def get_current_officer(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_db)) -> OfficerPrincipal:
+    principal = await load_principal(db, _token_subject(credentials))
+    if principal is None or principal.officer is None:
+        raise HTTPException(status_code=403, detail="Officer access required")
+    if not principal.is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
+    return principal.officer
+
+
+_PENDING_KEY = "principal_invalidations"
+
+
+def _on_user_change(mapper, connection, target) -> None:
+    user_ids = {target.user_id}
+    # reassigning an officer profile changes two principals: the old holder's and the new one's
+    user_ids.update(inspect(target).attrs.user_id.history.deleted or ())
+    session = object_session(target)
+    for user_id in user_ids:
+        if user_id is None:
+            continue
+        invalidate_principal(user_id)
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+def _on_transaction_end(session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_principal(user_id)
+
+
+for _model in (User, LROOfficer):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _on_user_change)
+
+for _event in ("after_commit", "after_rollback"):
+    event.listen(Session, _event, _on_transaction_end)
@@ -0,0 +1,317 @@
+"""Token-bucket rate limiting for the login and register endpoints.
+
+Every attempt takes one token from several buckets: one for the client IP and one each for the NIC and
+email in the payload, kept separately for login and register. If any bucket is empty the request is
+rejected with 429 and a `Retry-After` of the time until that bucket holds a token again. A rejected
+attempt takes no tokens, so an attacker hammering from one IP does not lock a victim's email out of
+logins from elsewhere.
+
+Limits are `AUTH_RATE_LIMIT_<SCOPE>_<KEY>` = "<burst>/<seconds>": the bucket holds `burst` tokens and
+refills at burst/seconds per second. For example, AUTH_RATE_LIMIT_LOGIN_IP=30/60 allows a burst of 30
+logins per IP and then one every 2 s. "off" disables one rule and AUTH_RATE_LIMIT_ENABLED=false disables
+them all.
+
+Backends (AUTH_RATE_LIMIT_BACKEND):
+- `shm` (default on POSIX): an open-addressed table of buckets in a memory-mapped file
+  (AUTH_RATE_LIMIT_FILE, default /dev/shm/lro-auth-ratelimit), guarded by flock. Every worker process on
+  the host shares it, so the limits hold for the whole server, not per worker. The table has
+  AUTH_RATE_LIMIT_SLOTS slots; when a key's probe window is full, the least recently used bucket there is
+  reused, and its key starts again with a full bucket. The slot count is part of the file name
+  (`<file>.<slots>`), so workers configured with different counts, e.g. during a rolling restart, use
+  separate tables instead of resetting each other's.
+- `memory`: a per-process LRU dict. Use it for single-worker runs and tests.
+
+The file is opened lazily in each process and reopened after a fork; a descriptor inherited from the
+parent would share the parent's flock and give no mutual exclusion.
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from database.session import _env_bool, _env_int
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, fall back to per-process buckets
+    fcntl = None
+
+SCOPES = ("login", "register")
+KEYS = ("ip", "nic", "email")
+
+DEFAULT_LIMITS = {
+    ("login", "ip"): "30/60",
+    ("login", "nic"): "10/300",
+    ("login", "email"): "10/300",
+    ("register", "ip"): "20/60",
+    ("register", "nic"): "3/3600",
+    ("register", "email"): "3/3600",
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+    capacity: float
+    refill_per_sec: float
+
+
+def parse_rule(value: str) -> Optional[Rule]:
+    """"30/60" -> Rule(30, 0.5); "off", "0" or "" -> None. Raises ValueError on anything else."""
+    value = (value or "").strip().lower()
+    if value in ("", "0", "off", "none"):
+        return None
+    burst, _, seconds = value.partition("/")
+    capacity, period = float(burst), float(seconds or 1)
+    if capacity <= 0 or period <= 0:
+        raise ValueError(f"invalid rate limit {value!r}")
+    return Rule(capacity, capacity / period)
+
+
+def _take_from(state: List[Tuple[float, float]], rules: List[Rule], now: float) -> Tuple[List[float], List[Tuple[float, float]]]:
+    """Refill each (tokens, updated) bucket to `now`; take one token from all of them or from none.
+
+    Returns (waits, new_state): waits[i] is how long bucket i needs to hold a token again, 0.0 if it has
+    one. Tokens were taken only when every wait is 0.0.
+    """
+    refilled, waits = [], []
+    for (tokens, updated), rule in zip(state, rules):
+        tokens = min(rule.capacity, tokens + max(0.0, now - updated) * rule.refill_per_sec)
+        waits.append(0.0 if tokens >= 1.0 else (1.0 - tokens) / rule.refill_per_sec)
+        refilled.append(tokens)
+    if any(waits):
+        return waits, [(t, now) for t in refilled]
+    return waits, [(t - 1.0, now) for t in refilled]
+
+
+class MemoryBackend:
+    """Per-process buckets in a bounded LRU."""
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, keys: List[str], rules: List[Rule], now: float) -> List[float]:
+        with self._lock:
+            state = [self._buckets.get(k, (r.capacity, now)) for k, r in zip(keys, rules)]
+            waits, state = _take_from(state, rules, now)
+            for key, bucket in zip(keys, state):
+                self._buckets[key] = bucket
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return waits
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SharedMemoryBackend:
+    """Buckets in a memory-mapped file shared by every process that opens it.
+
+    Layout: 16-byte header (magic, slot count) followed by slots of (key hash, tokens, updated).
+    A key hashes to a slot and probes the next PROBES slots; hash 0 marks an empty slot.
+
+    The file lives at `<path>.<slots>`. It is only ever grown, never truncated: another process may have it
+    mapped, and touching pages past a shrunk end of file raises SIGBUS there.
+    """
+
+    MAGIC = b"LROTB001"
+    HEADER = struct.Struct("<8sQ")
+    SLOT = struct.Struct("<Qdd")
+    PROBES = 8
+
+    def __init__(self, path: str, slots: int = 65536):
+        self.slots = max(slots, self.PROBES)
+        self.path = f"{path}.{self.slots}"
+        self.size = self.HEADER.size + self.slots * self.SLOT.size
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> None:
+        if self._map is not None and self._pid == os.getpid():
+            return
+        # first use in this process, or we are a forked child holding the parent's descriptor
+        self.close()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size < self.size:
+                # new (or short) file: extend it with zeroes, which are empty slots
+                os.ftruncate(fd, self.size)
+            header = os.pread(fd, self.HEADER.size, 0)
+            if self.HEADER.unpack(header) != (self.MAGIC, self.slots):
+                # not initialised yet, or left by another format: clear the slots in place
+                os.pwrite(fd, bytes(self.size - self.HEADER.size), self.HEADER.size)
+                os.pwrite(fd, self.HEADER.pack(self.MAGIC, self.slots), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(fd, self.size)
+        self._fd = fd
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _slot_for(self, h: int) -> Tuple[int, bool]:
+        """Offset of the slot holding hash `h` (found=True), else of an empty or least recently used slot."""
+        start = h % self.slots
+        victim, victim_updated = None, math.inf
+        for i in range(self.PROBES):
+            offset = self.HEADER.size + ((start + i) % self.slots) * self.SLOT.size
+            slot_hash, _, updated = self.SLOT.unpack_from(self._map, offset)
+            if slot_hash == h:
+                return offset, True
+            if slot_hash == 0:
+                return offset, False
+            if updated < victim_updated:
+                victim, victim_updated = offset, updated
+        return victim, False
+
+    def take(self, keys: List[str], rules: List[Rule], now: float) -> List[float]:
+        with self._lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                hashes = [self._hash(k) for k in keys]
+                offsets, state = [], []
+                for h, rule in zip(hashes, rules):
+                    offset, found = self._slot_for(h)
+                    if not found:
+                        # claim the slot now so a later key in this call cannot pick the same one
+                        self.SLOT.pack_into(self._map, offset, h, rule.capacity, now)
+                    _, tokens, updated = self.SLOT.unpack_from(self._map, offset)
+                    offsets.append(offset)
+                    state.append((tokens, updated))
+                waits, state = _take_from(state, rules, now)
+                for h, offset, (tokens, updated) in zip(hashes, offsets, state):
+                    self.SLOT.pack_into(self._map, offset, h, tokens, updated)
+                return waits
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._map[self.HEADER.size:] = bytes(self.size - self.HEADER.size)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+        self._map = None
+        self._fd = None
+
+
+def _default_file() -> str:
+    root = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(root, "lro-auth-ratelimit")
+
+
+class AuthRateLimiter:
+    """Per-scope token buckets keyed by client IP, NIC and email, with counters of shed requests."""
+
+    def __init__(self, backend=None, limits: Optional[Dict[Tuple[str, str], Optional[Rule]]] = None, enabled: Optional[bool] = None):
+        self.enabled = _env_bool("AUTH_RATE_LIMIT_ENABLED", True) if enabled is None else enabled
+        self.trust_forwarded = _env_bool("AUTH_RATE_LIMIT_TRUST_FORWARDED", False)
+        if limits is None:
+            limits = {
+                (scope, key): parse_rule(os.getenv(f"AUTH_RATE_LIMIT_{scope.upper()}_{key.upper()}", DEFAULT_LIMITS[(scope, key)]))
+                for scope, key in DEFAULT_LIMITS
+            }
+        self.limits = limits
+        self._backend = backend
+        self._lock = threading.Lock()
+        self.allowed: Dict[str, int] = {scope: 0 for scope in SCOPES}
+        self.rejected: Dict[str, int] = {scope: 0 for scope in SCOPES}
+        self.limited: Dict[str, Dict[str, int]] = {scope: {key: 0 for key in KEYS} for scope in SCOPES}
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            name = os.getenv("AUTH_RATE_LIMIT_BACKEND", "shm" if fcntl is not None else "memory").lower()
+            if name == "shm" and fcntl is not None:
+                self._backend = SharedMemoryBackend(
+                    os.getenv("AUTH_RATE_LIMIT_FILE") or _default_file(),
+                    _env_int("AUTH_RATE_LIMIT_SLOTS", 65536),
+                )
+            else:
+                self._backend = MemoryBackend()
+        return self._backend
+
+    def client_ip(self, request: Request) -> Optional[str]:
+        if self.trust_forwarded:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else None
+
+    def check(self, scope: str, ip: Optional[str] = None, nic: Optional[str] = None, email: Optional[str] = None) -> float:
+        """Take a token for each given key; returns 0.0 if allowed, else seconds until retry."""
+        if not self.enabled:
+            return 0.0
+        values = {"ip": ip, "nic": nic.strip().upper() if nic else None, "email": email.strip().lower() if email else None}
+        names, keys, rules = [], [], []
+        for name, value in values.items():
+            rule = self.limits.get((scope, name))
+            if value and rule is not None:
+                names.append(name)
+                keys.append(f"{scope}:{name}:{value}")
+                rules.append(rule)
+        if not keys:
+            return 0.0
+        waits = self.backend.take(keys, rules, time.time())
+        with self._lock:
+            if not any(waits):
+                self.allowed[scope] += 1
+            else:
+                self.rejected[scope] += 1
+            # a rejection counts against every key that was empty
+            for name, wait in zip(names, waits):
+                if wait:
+                    self.limited[scope][name] += 1
+        return max(waits)
+
+    def enforce(self, scope: str, request: Request, nic: Optional[str] = None, email: Optional[str] = None) -> None:
+        """Raise 429 with Retry-After when the attempt is over any limit."""
+        retry_after = self.check(scope, self.client_ip(request), nic, email)
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many attempts, retry later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "backend": type(self.backend).__name__,
+                "limits": {
+                    f"{scope}.{key}": ({"burst": rule.capacity, "refill_per_sec": rule.refill_per_sec} if rule else None)
+                    for (scope, key), rule in self.limits.items()
+                },
+                "allowed": dict(self.allowed),
+                "rejected": dict(self.rejected),
+                "limited": {scope: dict(keys) for scope, keys in self.limited.items()},
+            }
+
+
+auth_rate_limiter = AuthRateLimiter()
@@ -6,11 +6,14 @@ from .user_auth import router as user_auth
 from .user_applications import router as user_applications
 from .user_payments import router as user_payments
 from .user_documents import router as user_documents
+from .user_uploads import router as user_uploads
 from .admin_applications import router as admin_applications
 from .admin_documents import router as admin_documents
+from .admin_stats import router as admin_stats
+from .admin_exports import router as admin_exports
 from .chat import router as chat
 
 # Expose router names expected by main.py
 __all__ = [
-    'user_auth', 'user_applications', 'user_payments', 'user_documents', 'admin_applications', 'admin_documents', 'chat'
+    'user_auth', 'user_applications', 'user_payments', 'user_documents', 'user_uploads', 'admin_applications', 'admin_documents', 'admin_stats', 'admin_exports', 'chat'
 ]
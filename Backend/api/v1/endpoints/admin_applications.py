@@ -1,48 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from typing import List
-import os
-import jwt
+from typing import Annotated, List, Literal, Optional
+from datetime import datetime
 
-from database.session import get_db
+from database.session import get_db, get_read_db
 from schemas.admin_schemas import ApplicationReviewResponse, ApplicationStatusUpdateRequest, ApplicationLogResponse
-from models.lro_backend_models import LROOfficer
-from crud.admin_applications import list_all_applications, get_application_detail, update_application_status, get_application_logs
-
-JWT_SECRET = os.getenv("JWT_SECRET", "CHANGE_ME")
-JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+from api.principals import get_current_officer
+from crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from crud.admin_applications import list_applications_page, get_application_detail, update_application_status, get_application_logs
 
 router = APIRouter(prefix="/admin/applications", tags=["admin-applications"])
 
-# Reuse bearer from user auth
-from api.v1.endpoints.user_auth import bearer_scheme
-
-async def get_current_officer(credentials=Depends(bearer_scheme), db: AsyncSession = Depends(get_db)):
-    token = credentials.credentials
-    try:
-        data = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-    except jwt.PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    user_id = data.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token payload")
-    # find officer by user_id
-    from models.lro_backend_models import LROOfficer as _Officer
-    stmt = select(_Officer).where(_Officer.user_id == int(user_id))
-    r = await db.execute(stmt)
-    officer = r.scalars().first()
-    if not officer:
-        raise HTTPException(status_code=403, detail="Officer access required")
-    return officer
-
 @router.get("/", response_model=List[ApplicationReviewResponse])
-async def list_all_applications_endpoint(db: AsyncSession = Depends(get_db), current_officer = Depends(get_current_officer)):
-    apps = await list_all_applications(db)
+async def list_all_applications_endpoint(
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: Annotated[Optional[str], Query(description="X-Next-Cursor value from the previous page")] = None,
+    order: Annotated[Literal["desc", "asc"], Query()] = "desc",
+    status_id: Optional[int] = None,
+    service_id: Optional[int] = None,
+    assigned_officer_id: Optional[int] = None,
+    date_from: Annotated[Optional[datetime], Query(description="inclusive")] = None,
+    date_to: Annotated[Optional[datetime], Query(description="exclusive")] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_officer = Depends(get_current_officer),
+):
+    """One page of applications ordered by (application_date, application_id).
+    When more rows follow, the cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    try:
+        apps, next_cursor = await list_applications_page(
+            db, limit=limit, cursor=cursor, descending=order == "desc",
+            status_id=status_id, service_id=service_id, assigned_officer_id=assigned_officer_id,
+            date_from=date_from, date_to=date_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return apps
 
 @router.get("/{application_id}", response_model=ApplicationReviewResponse)
-async def get_application_endpoint(application_id: int, db: AsyncSession = Depends(get_db), current_officer = Depends(get_current_officer)):
+async def get_application_endpoint(application_id: int, db: AsyncSession = Depends(get_read_db), current_officer = Depends(get_current_officer)):
     app = await get_application_detail(db, application_id)
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -57,6 +56,6 @@ async def update_application_status_endpoint(application_id: int, payload: Appli
     return
 
 @router.get("/{application_id}/logs", response_model=List[ApplicationLogResponse])
-async def get_application_logs_endpoint(application_id: int, db: AsyncSession = Depends(get_db), officer = Depends(get_current_officer)):
+async def get_application_logs_endpoint(application_id: int, db: AsyncSession = Depends(get_read_db), officer = Depends(get_current_officer)):
     logs = await get_application_logs(db, application_id)
     return logs
@@ -1,43 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from typing import Annotated, Literal, Optional
+from datetime import datetime
 
-from database.session import get_db
+from database.session import get_db, get_read_db
 from schemas.admin_schemas import DocumentReviewRequest, DocumentAdminResponse
-from api.v1.endpoints.user_auth import get_current_user, bearer_scheme
-from crud.documents import list_documents_for_application, get_document_by_id, set_document_verification, list_all_documents
-from models.lro_backend_models import LROOfficer
+from api.principals import get_current_officer, OfficerPrincipal
+from api.v1.endpoints.user_documents import attach_download_urls
+from crud.documents import list_documents_for_application, get_document_by_id, set_document_verification, list_documents_page
+from models.enums import VerificationStatusEnum
+from crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/admin/documents", tags=["admin-documents"])
 
-async def get_current_officer(credentials=Depends(bearer_scheme), db: AsyncSession = Depends(get_db)) -> LROOfficer:
-    token = credentials.credentials
-    # decode token and map to LROOfficer by user id
-    import os, jwt
-    JWT_SECRET = os.getenv("JWT_SECRET", "CHANGE_ME")
-    JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-    try:
-        data = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-    except jwt.PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    user_id = data.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token payload")
-    from models.lro_backend_models import LROOfficer as _Officer
-    stmt = select(_Officer).where(_Officer.user_id == int(user_id))
-    r = await db.execute(stmt)
-    officer = r.scalars().first()
-    if not officer:
-        raise HTTPException(status_code=403, detail="Officer access required")
-    return officer
-
 @router.get("/", response_model=list[DocumentAdminResponse])
-async def list_documents(db: AsyncSession = Depends(get_db), officer: LROOfficer = Depends(get_current_officer)):
-    docs = await list_all_documents(db)
-    return docs
+async def list_documents(
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: Annotated[Optional[str], Query(description="X-Next-Cursor value from the previous page")] = None,
+    order: Annotated[Literal["desc", "asc"], Query()] = "desc",
+    verification_status: Optional[VerificationStatusEnum] = None,
+    document_type: Optional[str] = None,
+    application_id: Optional[int] = None,
+    uploaded_from: Annotated[Optional[datetime], Query(description="inclusive")] = None,
+    uploaded_to: Annotated[Optional[datetime], Query(description="exclusive")] = None,
+    db: AsyncSession = Depends(get_read_db),
+    officer: OfficerPrincipal = Depends(get_current_officer),
+):
+    """One page of documents ordered by (uploaded_at, document_id); next page cursor in X-Next-Cursor."""
+    try:
+        docs, next_cursor = await list_documents_page(
+            db, limit=limit, cursor=cursor, descending=order == "desc",
+            verification_status=verification_status.value if verification_status else None,
+            document_type=document_type, application_id=application_id,
+            uploaded_from=uploaded_from, uploaded_to=uploaded_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return attach_download_urls(docs)
 
 @router.post("/{document_id}/verify", status_code=status.HTTP_204_NO_CONTENT)
-async def verify_document(document_id: int, payload: DocumentReviewRequest, db: AsyncSession = Depends(get_db), officer: LROOfficer = Depends(get_current_officer)):
+async def verify_document(document_id: int, payload: DocumentReviewRequest, db: AsyncSession = Depends(get_db), officer: OfficerPrincipal = Depends(get_current_officer)):
     # delegate to CRUD function
     doc = await set_document_verification(db, document_id, payload.verification_status.value, officer.officer_id, payload.remarks)
     if not doc:
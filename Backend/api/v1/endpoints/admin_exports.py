@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Annotated, AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from api.principals import get_current_officer
+from crud.exports import FORMATS, export_chunks
+from database.session import get_read_sessionmaker
+from models.enums import PaymentStatusEnum, VerificationStatusEnum
+
+router = APIRouter(prefix="/admin/exports", tags=["admin-exports"])
+
+ExportFormat = Annotated[Literal["ndjson", "csv"], Query(description="ndjson (one JSON object per line) or csv")]
+Order = Annotated[Literal["desc", "asc"], Query()]
+
+
+def _export_response(kind: str, fmt: str, **filters) -> StreamingResponse:
+    """Stream an export from its own read session.
+
+    The request's dependency sessions are closed before a streaming body is sent, so the generator opens
+    (and closes) a session for the lifetime of the stream.
+    """
+    async def body() -> AsyncIterator[bytes]:
+        Session = await get_read_sessionmaker()
+        async with Session() as db:
+            async for chunk in export_chunks(db, kind, fmt, **filters):
+                yield chunk
+
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    return StreamingResponse(
+        body(),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{kind}-{stamp}.{fmt}"'},
+    )
+
+
+@router.get("/applications")
+async def export_applications(
+    format: ExportFormat = "ndjson",
+    order: Order = "desc",
+    status_id: Optional[int] = None,
+    service_id: Optional[int] = None,
+    assigned_officer_id: Optional[int] = None,
+    date_from: Annotated[Optional[datetime], Query(description="inclusive")] = None,
+    date_to: Annotated[Optional[datetime], Query(description="exclusive")] = None,
+    officer=Depends(get_current_officer),
+):
+    """Every matching application (same filters as the admin list), streamed as NDJSON or CSV."""
+    return _export_response(
+        "applications", format, descending=order == "desc",
+        status_id=status_id, service_id=service_id, assigned_officer_id=assigned_officer_id,
+        date_from=date_from, date_to=date_to,
+    )
+
+
+@router.get("/documents")
+async def export_documents(
+    format: ExportFormat = "ndjson",
+    order: Order = "desc",
+    verification_status: Optional[VerificationStatusEnum] = None,
+    document_type: Optional[str] = None,
+    application_id: Optional[int] = None,
+    uploaded_from: Annotated[Optional[datetime], Query(description="inclusive")] = None,
+    uploaded_to: Annotated[Optional[datetime], Query(description="exclusive")] = None,
+    officer=Depends(get_current_officer),
+):
+    """Every matching uploaded document (same filters as the admin list), streamed as NDJSON or CSV."""
+    return _export_response(
+        "documents", format, descending=order == "desc",
+        verification_status=verification_status.value if verification_status else None,
+        document_type=document_type, application_id=application_id,
+        uploaded_from=uploaded_from, uploaded_to=uploaded_to,
+    )
+
+
+@router.get("/payments")
+async def export_payments(
+    format: ExportFormat = "ndjson",
+    order: Order = "desc",
+    payment_status: Optional[PaymentStatusEnum] = None,
+    application_id: Optional[int] = None,
+    paid_from: Annotated[Optional[datetime], Query(description="inclusive")] = None,
+    paid_to: Annotated[Optional[datetime], Query(description="exclusive")] = None,
+    officer=Depends(get_current_officer),
+):
+    """Every matching payment, streamed as NDJSON or CSV."""
+    return _export_response(
+        "payments", format, descending=order == "desc",
+        payment_status=payment_status.value if payment_status else None,
+        application_id=application_id, paid_from=paid_from, paid_to=paid_to,
+    )
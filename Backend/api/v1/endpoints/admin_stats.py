@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.session import get_read_db
+from schemas.admin_schemas import DashboardStatsResponse
+from crud.stats import get_dashboard_stats
+from api.principals import get_current_officer
+
+router = APIRouter(prefix="/admin/stats", tags=["admin-stats"])
+
+
+@router.get("/", response_model=DashboardStatsResponse)
+async def get_stats_endpoint(db: AsyncSession = Depends(get_read_db), officer = Depends(get_current_officer)):
+    """Application counts per status/service/office and document verification counts, from dashboard_counters."""
+    return await get_dashboard_stats(db)
@@ -1,41 +1,161 @@
-import uvicorn, sentencepiece as spm, torch
-from bot.model import Seq2Seq
-from bot.infer import sample_reply, DEVICE
 from pydantic import BaseModel
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from typing import Callable, Optional
+import logging
 import os
+import threading
+import time
 
 router = APIRouter(prefix="/chat", tags=["chat"])
+logger = logging.getLogger(__name__)
 
 class ChatIn(BaseModel):
     """
     Pydantic model defining the JSON structure for the /chat request body.
     """
-    system: str = "You are a helpful assistant."  
-    history: str = ""                          
+    system: str = "You are a helpful assistant."
+    history: str = ""
     user: str
 
 current_dir = os.path.dirname(__file__)
-tokenizer_path = os.path.abspath(
+tokenizer_path = os.getenv("CHAT_TOKENIZER_PATH") or os.path.abspath(
     os.path.join(current_dir,"..", "..", "..", "bot", "artifacts", "tokenizer.model")
 )
-model_path = os.path.abspath(
+model_path = os.getenv("CHAT_MODEL_PATH") or os.path.abspath(
     os.path.join(current_dir,"..", "..", "..", "bot", "artifacts", "best.pkl")
 )
 
-# Load trained SentencePiece tokenizer
-sp = spm.SentencePieceProcessor(model_file=tokenizer_path)
-# Load model checkpoint
-ckpt = torch.load((model_path), map_location=DEVICE)
-# Create Seq2Seq model instance with vocab size + pad_id from checkpoint
-model = Seq2Seq(vocab=sp.get_piece_size(), pad_id=ckpt["pad_id"]).to(DEVICE)
-# Load model weights into the instance
-model.load_state_dict(ckpt["model"])
-# Set to evaluation mode (disable dropout, etc.)
-model.eval()  
+# Seconds clients are told to wait (Retry-After) while the model is still loading
+CHAT_RETRY_AFTER_SECONDS = 10
+
+ReplyFn = Callable[[str, str, str], str]
+
+
+def _load_seq2seq() -> ReplyFn:
+    """Load tokenizer + Seq2Seq weights and return a reply function.
+    torch/sentencepiece are imported here, not at module import, so the API starts without them.
+    """
+    import sentencepiece as spm, torch
+    from bot.model import Seq2Seq
+    from bot.infer import sample_reply, DEVICE
+
+    # Load trained SentencePiece tokenizer
+    sp = spm.SentencePieceProcessor(model_file=tokenizer_path)
+    # Load model checkpoint
+    ckpt = torch.load((model_path), map_location=DEVICE)
+    # Create Seq2Seq model instance with vocab size + pad_id from checkpoint
+    model = Seq2Seq(vocab=sp.get_piece_size(), pad_id=ckpt["pad_id"]).to(DEVICE)
+    # Load model weights into the instance
+    model.load_state_dict(ckpt["model"])
+    # Set to evaluation mode (disable dropout, etc.)
+    model.eval()
+
+    def reply(system: str, history: str, user: str) -> str:
+        return sample_reply(sp, model, system, history, user)
+    return reply
+
+
+class ChatModelLoader:
+    """Loads the chat model once, off the request path, and tracks its state.
+
+    States: idle -> loading -> ready | failed. `start()` kicks off loading in a daemon thread (called from
+    the app lifespan when CHAT_MODEL_PRELOAD is on, otherwise by the first chat request). After loading,
+    one warm-up inference runs so the first real request does not pay for lazy allocations.
+
+    serve.py loads the weights in the supervisor with `start(warmup=False)`: inference would start torch's
+    thread pools, which do not survive a fork. Each worker calls `after_fork()` and then `start()` from its
+    lifespan, which runs the warm-up there (or retries a load that failed in the supervisor).
+    """
+
+    def __init__(self, load_fn: Callable[[], ReplyFn] = _load_seq2seq):
+        self._load_fn = load_fn
+        self._lock = threading.Lock()
+        self._reply: Optional[ReplyFn] = None
+        self._thread: Optional[threading.Thread] = None
+        self.state = "idle"
+        self.error: Optional[str] = None
+        self.load_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+
+    def start(self, warmup: bool = True) -> None:
+        with self._lock:
+            if self.state == "ready" and warmup and self.warmup_ms is None and not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._warm_up_loaded, name="chat-model-warmup", daemon=True)
+                self._thread.start()
+                return
+            if self.state != "idle":
+                return
+            self.state = "loading"
+            self._thread = threading.Thread(target=self._load, args=(warmup,), name="chat-model-loader", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.state
+
+    def after_fork(self) -> None:
+        """Reset state that does not carry over into a forked worker: threads, and a failed load."""
+        self._lock = threading.Lock()
+        self._thread = None
+        if self.state != "ready":
+            self.state = "idle"
+            self.error = None
+
+    def _warm_up(self, reply: ReplyFn) -> None:
+        started = time.perf_counter()
+        reply("You are a helpful assistant.", "", "hello")
+        self.warmup_ms = round((time.perf_counter() - started) * 1000.0, 2)
+
+    def _warm_up_loaded(self) -> None:
+        try:
+            self._warm_up(self._reply)
+        except Exception as exc:
+            self._fail(exc)
+            return
+        logger.info("Chat model warmed up in %sms", self.warmup_ms)
+
+    def _fail(self, exc: Exception) -> None:
+        logger.warning("Chat model unavailable: %s: %s", type(exc).__name__, exc)
+        with self._lock:
+            self._reply = None
+            self.error = f"{type(exc).__name__}: {exc}"[:200]
+            self.state = "failed"
+
+    def _load(self, warmup: bool = True) -> None:
+        try:
+            started = time.perf_counter()
+            reply = self._load_fn()
+            self.load_ms = round((time.perf_counter() - started) * 1000.0, 2)
+            if warmup:
+                self._warm_up(reply)
+        except Exception as exc:
+            self._fail(exc)
+            return
+        with self._lock:
+            self._reply = reply
+            self.state = "ready"
+        logger.info("Chat model ready (load=%sms warmup=%sms)", self.load_ms, self.warmup_ms)
+
+    def status(self) -> dict:
+        return {"state": self.state, "error": self.error, "load_ms": self.load_ms, "warmup_ms": self.warmup_ms}
+
+    def reply(self, system: str, history: str, user: str) -> str:
+        if self._reply is None:
+            raise RuntimeError("chat model not ready")
+        return self._reply(system, history, user)
+
+
+model_loader = ChatModelLoader()
 
 
 @router.post("/")
 def chat(inp: ChatIn):
-    text = sample_reply(sp, model, inp.system, inp.history, inp.user)
-    return {"reply": text} 
\ No newline at end of file
+    if model_loader.state == "idle":
+        model_loader.start()
+    if model_loader.state != "ready":
+        headers = {"Retry-After": str(CHAT_RETRY_AFTER_SECONDS)} if model_loader.state == "loading" else None
+        raise HTTPException(status_code=503, detail=f"Chat model {model_loader.state}", headers=headers)
+    text = model_loader.reply(inp.system, inp.history, inp.user)
+    return {"reply": text}
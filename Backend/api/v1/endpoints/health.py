@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from database.session import get_engine
+from tools.storage import get_storage
+
+router = APIRouter(prefix="/health", tags=["health"])
+logger = logging.getLogger(__name__)
+
+# Readiness results are reused for this many seconds so frequent probes cost no DB round-trip
+try:
+    HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+except ValueError:
+    HEALTH_CACHE_SECONDS = 5.0
+# Upper bound on the DB and storage checks so a hung dependency fails readiness instead of hanging the probe
+try:
+    HEALTH_DB_TIMEOUT_SECONDS = float(os.getenv("HEALTH_DB_TIMEOUT_SECONDS", "2"))
+except ValueError:
+    HEALTH_DB_TIMEOUT_SECONDS = 2.0
+
+
+def uploads_root() -> str:
+    return os.path.join(os.getcwd(), 'uploaded_documents')
+
+
+async def check_database() -> Dict[str, Any]:
+    engine = get_engine()
+    if engine is None:
+        return {"ok": False, "error": "engine not initialised"}
+    started = time.perf_counter()
+    try:
+        async def _ping():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        await asyncio.wait_for(_ping(), HEALTH_DB_TIMEOUT_SECONDS)
+    except Exception as exc:
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"[:200]}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000.0, 2)}
+
+
+async def check_storage() -> Dict[str, Any]:
+    # the configured backend: the uploads directory must be writable, an S3 bucket must answer a HEAD
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(get_storage().ping(), HEALTH_DB_TIMEOUT_SECONDS)
+    except Exception as exc:
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"[:200]}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000.0, 2)}
+
+
+async def check_chat() -> Dict[str, Any]:
+    # chat is optional: the API serves without it, so this check is registered as non-critical
+    from api.v1.endpoints.chat import model_loader
+    return dict(model_loader.status(), ok=model_loader.state == "ready")
+
+
+# name -> (check, critical). Non-critical checks are reported but do not fail readiness.
+READINESS_CHECKS: Dict[str, tuple[Callable[[], Awaitable[Dict[str, Any]]], bool]] = {
+    "database": (check_database, True),
+    "storage": (check_storage, True),
+    "chat": (check_chat, False),
+}
+
+
+class ReadinessCache:
+    """Runs the readiness checks at most once per `ttl` seconds; concurrent probes share one run."""
+
+    def __init__(self, ttl: float = HEALTH_CACHE_SECONDS):
+        self.ttl = ttl
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._result = None
+
+    async def get(self) -> Dict[str, Any]:
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._result
+        async with self._lock:
+            if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+                return self._result
+            names = list(READINESS_CHECKS)
+            results = await asyncio.gather(*(READINESS_CHECKS[n][0]() for n in names), return_exceptions=True)
+            checks = {}
+            for name, result in zip(names, results):
+                if isinstance(result, Exception):
+                    result = {"ok": False, "error": f"{type(result).__name__}: {result}"[:200]}
+                checks[name] = dict(result, critical=READINESS_CHECKS[name][1])
+                if not result["ok"]:
+                    logger.warning("Readiness check %s failed: %s", name, result.get("error"))
+            ready = all(c["ok"] for c in checks.values() if c["critical"])
+            self._result = {"status": "ready" if ready else "not_ready", "checks": checks}
+            self._checked_at = time.monotonic()
+            return self._result
+
+
+readiness = ReadinessCache()
+
+
+@router.get("/live")
+async def live():
+    """Liveness: the process is up and the event loop is responsive. Does no I/O."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(request: Request):
+    """Readiness: database, storage and (informational) chat model state, cached for HEALTH_CACHE_SECONDS.
+
+    The probe is unauthenticated, so it reports which checks and startup phases failed but not why; the
+    error messages are in the log.
+    """
+    result = await readiness.get()
+    body = {
+        "status": result["status"],
+        "checks": {name: {k: v for k, v in check.items() if k != "error"} for name, check in result["checks"].items()},
+    }
+    startup = getattr(request.app.state, "startup", None)
+    if startup is not None:
+        body["startup"] = startup
+    return JSONResponse(body, status_code=200 if body["status"] == "ready" else 503)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+
+from api.principals import get_current_officer
+from api.rate_limit import auth_rate_limiter
+from database.session import get_pool_stats
+from database.query_stats import query_metrics
+from models.security import password_hasher
+
+# Pool sizes, per-route SQL and rate-limit keys are operational detail: officers only
+router = APIRouter(prefix="/internal/metrics", tags=["internal-metrics"], dependencies=[Depends(get_current_officer)])
+
+
+@router.get("/db-pool")
+async def db_pool_metrics():
+    """Live connection pool statistics for this worker process.
+
+    Use `checkedout`/`overflow` against DB_POOL_SIZE/DB_MAX_OVERFLOW and the wait histogram to size
+    workers so that workers * (pool_size + max_overflow) stays below the database's max_connections.
+    """
+    return get_pool_stats()
+
+
+@router.get("/queries")
+async def query_metrics_endpoint():
+    """Per-route SQL statement counts, commits and DB time aggregated since this worker started."""
+    return query_metrics.snapshot()
+
+
+@router.get("/password-hashing")
+async def password_hashing_metrics():
+    """bcrypt worker pool: in-flight and queued hashes, rejections and wait/run times for this worker."""
+    return password_hasher.stats()
+
+
+@router.get("/rate-limit")
+async def rate_limit_metrics():
+    """Login/register attempts allowed and rejected by this worker, with rejections per limiting key."""
+    return auth_rate_limiter.stats()
@@ -1,19 +1,58 @@
-from fastapi import APIRouter, Header, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from email.utils import formatdate
+from mimetypes import guess_type
+from urllib.parse import quote
+import asyncio
 import os
+import stat
+import time
+
+from api.responses import StoredFileResponse, not_modified, precondition_failed
+from database.session import _env_int
+from tools.minio_storage import is_reserved_key, stored_sha256, verify_presigned
 
 router = APIRouter()
 
-@router.get("/internal/static/{file_path:path}")
-def serve_internal_file(file_path: str, x_user_id: str | None = Header(None)):
-    """Serve files under uploaded_documents safely for internal use.
+# Stored documents never change under their key, so clients may reuse them; "private" keeps shared caches out.
+STATIC_CACHE_MAX_AGE = _env_int("STATIC_CACHE_MAX_AGE", 3600)
+# "x-accel-redirect" (nginx) or "x-sendfile" (Apache, lighttpd): after the checks, let the front proxy send
+# the bytes. For nginx, STATIC_OFFLOAD_PREFIX must be an `internal` location aliased to uploaded_documents/.
+STATIC_OFFLOAD = os.getenv("STATIC_OFFLOAD", "").strip().lower()
+STATIC_OFFLOAD_PREFIX = os.getenv("STATIC_OFFLOAD_PREFIX", "/protected-uploads/")
+
+
+def _stat_and_hash(path: str):
+    st = os.stat(path)
+    return st, (stored_sha256(path) if stat.S_ISREG(st.st_mode) else None)
+
+
+def _etag(st: os.stat_result, sha256: str | None) -> str:
+    """Strong ETag: the content hash recorded at upload; for files stored before hashes were recorded,
+    the inode, mtime and size, which change whenever a key is rewritten (writes always replace the file)."""
+    if sha256:
+        return f'"{sha256}"'
+    return f'"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"'
+
 
-    Permission model (simple, for development/testing):
-    - If caller provides X-User-Id header, require that the user id appears in the file_path segments.
-    - Otherwise serve the file if it exists.
+@router.api_route("/internal/static/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_internal_file(
+    file_path: str,
+    request: Request,
+    expires: int | None = Query(None),
+    signature: str | None = Query(None),
+):
+    """Serve files under uploaded_documents to holders of a signed URL (tools.minio_storage.generate_presigned_url).
 
-    Note: In production this endpoint should verify JWT/session and ensure strict ACLs.
+    Access is decided by the signature alone: it was issued for this key and has not expired. Ownership is
+    checked when the URL is handed out, so serving it needs no session or database query, and the check
+    happens before the filesystem is touched.
+
+    Responses carry a strong ETag, Last-Modified and Cache-Control. Conditional requests get 304/412,
+    Range requests 206 (single or multipart) or 416. With STATIC_OFFLOAD set, the body is left to the
+    front proxy.
     """
+    if expires is None or signature is None or not verify_presigned(file_path, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired download link")
     uploads_root = os.path.join(os.getcwd(), 'uploaded_documents')
     # Normalize and prevent path traversal
     candidate = os.path.normpath(os.path.join(uploads_root, file_path))
@@ -21,12 +60,36 @@ def serve_internal_file(file_path: str, x_user_id: str | None = Header(None)):
     candidate_abs = os.path.abspath(candidate)
     if not candidate_abs.startswith(uploads_root_abs):
         raise HTTPException(status_code=400, detail="Invalid file path")
-    if not os.path.exists(candidate_abs):
+    # blobs are reachable only through their object keys
+    relative = os.path.relpath(candidate_abs, uploads_root_abs)
+    if is_reserved_key(relative):
+        raise HTTPException(status_code=404, detail="File not found")
+    # one stat (plus the hash xattr) off the event loop, reused for the headers and the response
+    try:
+        st, sha256 = await asyncio.to_thread(_stat_and_hash, candidate_abs)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=404, detail="File not found")
-    # Basic permission check for dev: if X-User-Id provided, the file path must contain it
-    if x_user_id:
-        # split on OS separator and forward slashes to be safe
-        parts = file_path.replace("/", os.sep).split(os.sep)
-        if x_user_id not in parts:
-            raise HTTPException(status_code=403, detail="Forbidden")
-    return FileResponse(candidate_abs, filename=os.path.basename(candidate_abs))
+
+    etag = _etag(st, sha256)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        # a cached copy must not outlive the link it was fetched with
+        "Cache-Control": f"private, max-age={max(0, min(STATIC_CACHE_MAX_AGE, expires - int(time.time())))}",
+    }
+    if precondition_failed(request.headers, etag):
+        return Response(status_code=412, headers=headers)
+    if not_modified(request.headers, etag, st.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    filename = os.path.basename(candidate_abs)
+    if STATIC_OFFLOAD in ("x-accel-redirect", "x-sendfile"):
+        if STATIC_OFFLOAD == "x-accel-redirect":
+            headers["X-Accel-Redirect"] = STATIC_OFFLOAD_PREFIX.rstrip("/") + "/" + quote(relative.replace(os.sep, "/"))
+        else:
+            headers["X-Sendfile"] = candidate_abs
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+        return Response(headers=headers, media_type=guess_type(filename)[0] or "application/octet-stream")
+    return StoredFileResponse(candidate_abs, filename=filename, stat_result=st, headers=headers)
@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any
 
-from database.session import get_db
+from database.session import get_db, get_read_db
 from schemas.user_schemas import ApplicationCreateRequest, ApplicationResponse, DocumentCreateRequest, DocumentResponse
 from api.v1.endpoints.user_auth import get_current_user
+from api.v1.endpoints.user_documents import attach_download_urls
 from crud.applications import list_user_applications, create_application, get_application, add_document, list_application_documents
 # import service-specific detail creators
 from crud.applications import (
@@ -18,10 +19,37 @@ from crud.applications import (
 router = APIRouter(prefix="/user/applications", tags=["user-applications"])
 
 @router.get("/", response_model=List[ApplicationResponse])
-async def list_user_applications_endpoint(db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
+async def list_user_applications_endpoint(db: AsyncSession = Depends(get_read_db), current_user=Depends(get_current_user)):
     apps = await list_user_applications(db, current_user.user_id)
     return apps
 
+async def _create_service_details(db: AsyncSession, application_id: int, payload: Any) -> None:
+    """Create the service-specific detail rows for a new application without committing."""
+    from crud.applications import associate_documents_with_application
+    if not isinstance(payload, dict):
+        return
+    if 'seller' in payload or 'buyer' in payload:
+        await create_land_transfer_details(db, application_id, payload, commit=False)
+        # attach any provided document ids
+        docs = payload.get('documents') or payload.get('document_ids') or []
+    elif 'land_details' in payload or 'extract_details' in payload:
+        await create_copy_of_land_registers_details(db, application_id, payload, commit=False)
+        docs = payload.get('applicant', {}).get('signature_document_id')
+    elif 'property_details' in payload or 'registered_to_search' in payload:
+        await create_search_land_registers_details(db, application_id, payload, commit=False)
+        docs = payload.get('applicant', {}).get('signature_document_id')
+    elif 'notary_public_name' in payload or 'number_of_deeds' in payload:
+        await create_search_duplicate_deeds_details(db, application_id, payload, commit=False)
+        docs = payload.get('applicant', {}).get('signature_document_id') or payload.get('applicant_signature_document_id')
+    elif 'deed_number' in payload or 'date_of_deed_attestation' in payload:
+        await create_copy_document_details(db, application_id, payload, commit=False)
+        docs = payload.get('applicant', {}).get('signature_document_id')
+    else:
+        return
+    if docs:
+        # single id -> list
+        await associate_documents_with_application(db, application_id, [docs] if isinstance(docs, int) else docs, commit=False)
+
 @router.post("/", response_model=ApplicationResponse, status_code=status.HTTP_201_CREATED)
 async def create_application_endpoint(payload: Any = Body(...), db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
     """
@@ -44,51 +72,24 @@ async def create_application_endpoint(payload: Any = Body(...), db: AsyncSession
         except Exception:
             raise HTTPException(status_code=400, detail="Missing service_id in payload")
 
-    # create base application
+    # create base application (and its log row); everything below commits once at the end
     try:
-        app_obj = await create_application(db, current_user.user_id, int(service_id), reference_number)
+        app_obj = await create_application(db, current_user.user_id, int(service_id), reference_number, commit=False)
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
 
-    # Heuristic: call service-detail creation based on payload keys
+    # Heuristic: call service-detail creation based on payload keys.
+    # Details run in a savepoint so a failure there rolls back only the details, not the application.
     try:
-        if isinstance(payload, dict) and ('seller' in payload or 'buyer' in payload):
-            await create_land_transfer_details(db, app_obj.application_id, payload)
-            # attach any provided document ids
-            docs = payload.get('documents') or payload.get('document_ids') or []
-            if docs:
-                from crud.applications import associate_documents_with_application
-                await associate_documents_with_application(db, app_obj.application_id, docs)
-        elif isinstance(payload, dict) and ('land_details' in payload or 'extract_details' in payload):
-            await create_copy_of_land_registers_details(db, app_obj.application_id, payload)
-            docs = payload.get('applicant', {}).get('signature_document_id')
-            if docs:
-                from crud.applications import associate_documents_with_application
-                # single id -> list
-                await associate_documents_with_application(db, app_obj.application_id, [docs] if isinstance(docs, int) else docs)
-        elif isinstance(payload, dict) and ('property_details' in payload or 'registered_to_search' in payload):
-            await create_search_land_registers_details(db, app_obj.application_id, payload)
-            docs = payload.get('applicant', {}).get('signature_document_id')
-            if docs:
-                from crud.applications import associate_documents_with_application
-                await associate_documents_with_application(db, app_obj.application_id, [docs] if isinstance(docs, int) else docs)
-        elif isinstance(payload, dict) and ('notary_public_name' in payload or 'number_of_deeds' in payload):
-            await create_search_duplicate_deeds_details(db, app_obj.application_id, payload)
-            docs = payload.get('applicant', {}).get('signature_document_id') or payload.get('applicant_signature_document_id')
-            if docs:
-                from crud.applications import associate_documents_with_application
-                await associate_documents_with_application(db, app_obj.application_id, [docs] if isinstance(docs, int) else docs)
-        elif isinstance(payload, dict) and ('deed_number' in payload or 'date_of_deed_attestation' in payload):
-            await create_copy_document_details(db, app_obj.application_id, payload)
-            docs = payload.get('applicant', {}).get('signature_document_id')
-            if docs:
-                from crud.applications import associate_documents_with_application
-                await associate_documents_with_application(db, app_obj.application_id, [docs] if isinstance(docs, int) else docs)
+        async with db.begin_nested():
+            await _create_service_details(db, app_obj.application_id, payload)
     except Exception:
         # Do not fail application creation if adding details fails; log and continue
         # In production we'd emit a proper log entry or background job retry
         pass
 
+    # single commit for the application, its log entry and its details
+    await db.commit()
     return app_obj
 
 @router.get("/{application_id}", response_model=ApplicationResponse)
@@ -107,9 +108,9 @@ async def add_document_endpoint(payload: DocumentCreateRequest, db: AsyncSession
     return doc
 
 @router.get("/{application_id}/documents", response_model=List[DocumentResponse])
-async def list_app_documents_endpoint(application_id: int, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
+async def list_app_documents_endpoint(application_id: int, db: AsyncSession = Depends(get_read_db), current_user=Depends(get_current_user)):
+    # ownership first: the documents come back with signed download URLs
+    if not await get_application(db, application_id, current_user.user_id):
+        raise HTTPException(status_code=404, detail="Application not found")
     docs = await list_application_documents(db, application_id)
-    if docs:
-        if docs[0].application.user_id != current_user.user_id:
-            raise HTTPException(status_code=403, detail="Forbidden")
-    return docs
+    return attach_download_urls(docs)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime, timedelta
@@ -8,11 +8,11 @@ import jwt
 from database.session import get_db
 from schemas.user_schemas import UserRegisterRequest, UserLoginRequest, TokenResponse, UserResponse
 from crud.users import get_user_by_email, create_user
-from crud.users import get_user_by_id
 from models.lro_backend_models import User as _User
+from models.security import PasswordHasherBusy
 
-JWT_SECRET = os.getenv("JWT_SECRET", "CHANGE_ME")
-JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+from api.principals import JWT_SECRET, JWT_ALGORITHM
+from api.rate_limit import auth_rate_limiter
 try:
     ACCESS_TOKEN_EXPIRES_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440")))
 except Exception:
@@ -36,7 +36,9 @@ async def get_user_by_nic_and_phone(db: AsyncSession, nic: str, phone: str):
         raise NotImplementedError("NIC+phone lookup not implemented; ensure crud.users.get_user_by_nic_and_phone is available")
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(payload: UserRegisterRequest, db: AsyncSession = Depends(get_db)):
+async def register(payload: UserRegisterRequest, request: Request, db: AsyncSession = Depends(get_db)):
+    # per-IP/NIC/email token buckets (429 + Retry-After) before any DB lookup or bcrypt hash
+    auth_rate_limiter.enforce("register", request, nic=payload.nic_number, email=payload.email)
     # payload may be accepted using frontend aliases (fullName, id, phone, requesterType, registrationOffice)
     # Check if user already exists by email or nic
     existing = await get_user_by_email(db, payload.email)
@@ -44,11 +46,16 @@ async def register(payload: UserRegisterRequest, db: AsyncSession = Depends(get_
         raise HTTPException(status_code=400, detail="User already exists")
     # create_user signature: (db, full_name, nic_number, email, password, phone_number=None, address=None, user_type='citizen')
     # Support mapping requester_type -> user_type and registration_office -> address for now
-    user = await create_user(db, payload.full_name, payload.nic_number, payload.email, payload.password or "", payload.phone_number, payload.registration_office)
+    try:
+        user = await create_user(db, payload.full_name, payload.nic_number, payload.email, payload.password or "", payload.phone_number, payload.registration_office)
+    except PasswordHasherBusy:
+        # hashing pool and queue are full: shed the request instead of queueing without bound
+        raise HTTPException(status_code=503, detail="Server busy, retry shortly", headers={"Retry-After": "1"})
     return user
 
 @router.post("/login", response_model=TokenResponse)
-async def login(payload: UserLoginRequest, db: AsyncSession = Depends(get_db)):
+async def login(payload: UserLoginRequest, request: Request, db: AsyncSession = Depends(get_db)):
+    auth_rate_limiter.enforce("login", request, nic=payload.id, email=payload.email)
     # Support both email-only login and id+phone+otp flows
     # Email-only login: issue token if the email exists (no password required)
     if payload.email:
@@ -83,24 +90,6 @@ async def login(payload: UserLoginRequest, db: AsyncSession = Depends(get_db)):
 
     raise HTTPException(status_code=400, detail="Invalid login payload")
 
-# Dependency for routes requiring auth (user)
-from fastapi import Security
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-bearer_scheme = HTTPBearer()
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_db)):
-    token = credentials.credentials
-    try:
-        data = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    user_id = data.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token payload")
-    # fetch by id
-    user = await get_user_by_id(db, int(user_id))
-    if not user or not user.is_active:
-        raise HTTPException(status_code=403, detail="Inactive user")
-    return user
+# Dependencies for routes requiring auth live in api.principals (cached principal resolution);
+# re-exported here because endpoints and tests import them from this module
+from api.principals import bearer_scheme, get_current_user  # noqa: E402,F401
@@ -2,20 +2,45 @@ from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import os
+import time
 
-from database.session import get_db
+from database.session import _env_int, get_db, get_read_db
 from schemas.user_schemas import DocumentResponse
 from api.v1.endpoints.user_auth import get_current_user
-from crud.documents import list_user_documents, list_application_documents, get_document_by_id
+from crud.documents import list_user_documents, get_user_document
 from crud.applications import add_document
-from tools.minio_storage import upload_file_to_minio, generate_presigned_url
+from tools.storage import UploadTooLarge, get_storage
 
 router = APIRouter(prefix="/user/documents", tags=["user-documents"])
 
+# Largest file accepted for any document type; main.py also caps the whole request body at this plus
+# MULTIPART_OVERHEAD_BYTES so oversized uploads are refused before they are spooled.
+UPLOAD_MAX_BYTES = _env_int("UPLOAD_MAX_BYTES", 25 * 1024 * 1024)
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Accepted document types and their size limits. Agreements and deeds are multi-page scans; an ID photo is
+# a single image.
+DOCUMENT_TYPE_LIMITS = {
+    "Sales Agreement": UPLOAD_MAX_BYTES,
+    "Current Title Deed": UPLOAD_MAX_BYTES,
+    "Photo ID (Buyer & Seller)": min(UPLOAD_MAX_BYTES, 5 * 1024 * 1024),
+}
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File exceeds the {limit} byte limit for this document type")
+
+
+def attach_download_urls(docs):
+    """Set `download_url` on each document; signing is pure CPU, so a whole page costs no I/O."""
+    for doc, url in zip(docs, get_storage().presign_many(doc.file_path for doc in docs)):
+        doc.download_url = url
+    return docs
+
 @router.get("/", response_model=List[DocumentResponse])
-async def list_my_documents(db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
+async def list_my_documents(db: AsyncSession = Depends(get_read_db), current_user=Depends(get_current_user)):
     docs = await list_user_documents(db, current_user.user_id)
-    return docs
+    return attach_download_urls(docs)
 
 @router.post("/upload", response_model=DocumentResponse)
 async def upload_document(application_id: int = Form(...), document_type: str = Form(...), file: UploadFile = File(...), db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
@@ -26,26 +51,35 @@ async def upload_document(application_id: int = Form(...), document_type: str =
         raise HTTPException(status_code=404, detail="Application not found or not owned by user")
 
     # Validate document type
-    allowed = [
-        "Sales Agreement",
-        "Current Title Deed",
-        "Photo ID (Buyer & Seller)",
-    ]
-    if document_type not in allowed:
+    if document_type not in DOCUMENT_TYPE_LIMITS:
         raise HTTPException(status_code=400, detail="Invalid document type")
+    limit = DOCUMENT_TYPE_LIMITS[document_type]
+    # the multipart parser records the size of the spooled part; refuse before copying it anywhere
+    if getattr(file, "size", None) is not None and file.size > limit:
+        raise _too_large(limit)
 
-    # Upload to MinIO
+    # the client's file name becomes part of the object key: keep only its last path component
+    file_name = os.path.basename((file.filename or "").replace("\\", "/"))
+    if file_name in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid file name")
+
+    # Stream to storage in chunks (parts, on S3) read off the event loop, hashing as we go
+    object_key = f"applications/{application_id}/{int(time.time())}_{file_name}"
+    storage = get_storage()
     try:
-        content = await file.read()
-        object_key = f"applications/{application_id}/{int(__import__('time').time())}_{file.filename}"
-        upload_file_to_minio(object_key, content, file.content_type)
-    except Exception as e:
+        stored = await storage.put_stream(object_key, file.file, max_bytes=limit, content_type=file.content_type)
+    except UploadTooLarge:
+        raise _too_large(limit)
+    except ValueError:
+        # the key check refused the name (NUL or other characters storage cannot name a file with)
+        raise HTTPException(status_code=400, detail="Invalid file name")
+    except Exception:
         raise HTTPException(status_code=500, detail="Failed to upload file")
 
     file_path = object_key
-    doc = await add_document(db, application_id, document_type, file.filename, file_path)
+    doc = await add_document(db, application_id, document_type, file_name, file_path, sha256=stored.sha256, size_bytes=stored.size, retain_blob=storage.content_addressed)
     # Attach a presigned URL for client-side download in response metadata (short-lived)
-    url = generate_presigned_url(object_key)
+    url = storage.presign(object_key)
     # Prefer to return the original doc object (set attribute) so direct calls receive the object
     try:
         setattr(doc, 'download_url', url)
@@ -59,31 +93,21 @@ async def upload_document(application_id: int = Form(...), document_type: str =
 
 @router.get("/{document_id}/download")
 async def download_document(document_id: int, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
-    """Return a short-lived download URL for the requested document if the user owns it."""
-    # import here to avoid circular import at module load time
-    from crud.documents import get_document_by_id
+    """Return a short-lived download URL for the requested document if the user owns it.
 
-    doc = await get_document_by_id(db, document_id)
+    The signed URL is the only access check /internal/static makes, so ownership is decided here, in the
+    query: another user's document is indistinguishable from a missing one (404).
+    """
+    doc = await get_user_document(db, document_id, current_user.user_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    # basic ownership check: require the requesting user to be the document owner
-    # the Retrieved doc object may expose user_id or application.user_id depending on ORM
-    owner_id = getattr(doc, 'user_id', None)
-    if owner_id is None:
-        # try application owner lookup if available
-        try:
-            owner_id = doc.application.user_id
-        except Exception:
-            owner_id = None
-    if owner_id is not None and owner_id != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
 
     # resolve stored object key
     object_key = getattr(doc, 'minio_object_key', None) or getattr(doc, 'file_path', None)
     if not object_key:
         raise HTTPException(status_code=500, detail="Document storage key missing")
 
-    url = generate_presigned_url(object_key)
+    url = get_storage().presign(object_key)
     if not url:
         raise HTTPException(status_code=500, detail="Failed to generate download URL")
     return {"download_url": url}
@@ -0,0 +1,199 @@
+"""Resumable document uploads.
+
+For large scans over unreliable links. Protocol:
+
+    POST   /user/documents/uploads                  {application_id, document_type, file_name, size[, sha256]}
+                                                    -> 201 session with upload_id and offset 0
+    PATCH  /user/documents/uploads/{id}             raw bytes, header Upload-Offset: <current offset>
+                                                    -> session with the new offset
+    GET    /user/documents/uploads/{id}             -> session; Upload-Offset header is the resume point
+    POST   /user/documents/uploads/{id}/finalize    -> the created document (same body as /upload)
+    DELETE /user/documents/uploads/{id}             -> 204, staging data discarded
+
+A PATCH whose connection drops keeps the bytes that arrived, so the client asks for the offset and
+continues from there. A PATCH at the wrong offset gets 409 with the current offset. Finalize hashes the
+staged file, checks the optional sha256, stores it like a regular upload and creates the document row
+and marks the session complete in one transaction. Repeating finalize returns the same document.
+"""
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from api.v1.endpoints.user_auth import get_current_user
+from api.v1.endpoints.user_documents import DOCUMENT_TYPE_LIMITS
+from crud import upload_sessions
+from crud.applications import add_document, get_application
+from crud.documents import get_document_by_id
+from database.session import get_db
+from schemas.user_schemas import DocumentResponse, UploadSessionCreateRequest, UploadSessionResponse
+from tools.minio_storage import UPLOAD_CHUNK_SIZE, close_staging, discard_staging, open_staging, staging_path
+from tools.storage import ChecksumMismatch, get_storage
+
+router = APIRouter(prefix="/user/documents/uploads", tags=["user-documents"])
+
+
+def _session_response(session, response: Response) -> UploadSessionResponse:
+    response.headers["Upload-Offset"] = str(session.offset)
+    return UploadSessionResponse.model_validate(session)
+
+
+async def _open_session(db: AsyncSession, upload_id: str, user_id: int):
+    session = await upload_sessions.get_session(db, upload_id, user_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
+    return session
+
+
+def _conflict(session, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={"message": detail, "offset": session.offset},
+        headers={"Upload-Offset": str(session.offset)},
+    )
+
+
+@router.post("", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload(payload: UploadSessionCreateRequest, response: Response, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
+    if not await get_application(db, payload.application_id, current_user.user_id):
+        raise HTTPException(status_code=404, detail="Application not found or not owned by user")
+    limit = DOCUMENT_TYPE_LIMITS.get(payload.document_type)
+    if limit is None:
+        raise HTTPException(status_code=400, detail="Invalid document type")
+    if payload.size > limit:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {limit} byte limit for this document type")
+    # sweep a bounded batch of abandoned sessions; scripts/gc_storage.py catches up on the rest
+    for upload_id in await upload_sessions.purge_expired(db):
+        await asyncio.to_thread(discard_staging, upload_id)
+    session = await upload_sessions.create_session(
+        db, current_user.user_id, payload.application_id, payload.document_type, payload.file_name,
+        payload.size, payload.content_type, payload.sha256,
+    )
+    return _session_response(session, response)
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(upload_id: str, response: Response, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
+    session = await _open_session(db, upload_id, current_user.user_id)
+    return _session_response(session, response)
+
+
+@router.patch("/{upload_id}", response_model=UploadSessionResponse)
+async def append_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """Append the request body at `Upload-Offset`, streaming it to the staging file off the event loop."""
+    session = await _open_session(db, upload_id, current_user.user_id)
+    if session.document_id is not None:
+        raise _conflict(session, "Upload already finalized")
+    if upload_offset != session.offset:
+        raise _conflict(session, "Upload-Offset does not match the session offset")
+    token = await upload_sessions.claim(db, upload_id, current_user.user_id, upload_offset)
+    if token is None:
+        await db.refresh(session)
+        raise _conflict(session, "Another request is writing to this upload")
+
+    written = 0
+    try:
+        f = await asyncio.to_thread(open_staging, upload_id, upload_offset)
+        try:
+            buf = bytearray()
+            renewed = time.monotonic()
+            try:
+                async for chunk in request.stream():
+                    if upload_offset + written + len(buf) + len(chunk) > session.size:
+                        raise HTTPException(status_code=413, detail="Chunk goes past the declared upload size")
+                    buf += chunk
+                    if len(buf) >= UPLOAD_CHUNK_SIZE:
+                        await asyncio.to_thread(f.write, bytes(buf))
+                        written += len(buf)
+                        buf.clear()
+                        if time.monotonic() - renewed > upload_sessions.UPLOAD_SESSION_LEASE_SECONDS / 3:
+                            if not await upload_sessions.renew(db, upload_id, token):
+                                raise HTTPException(status_code=409, detail="Upload lease lost")
+                            renewed = time.monotonic()
+            except ClientDisconnect:
+                # keep what arrived; the client resumes from the recorded offset
+                pass
+            if buf:
+                await asyncio.to_thread(f.write, bytes(buf))
+                written += len(buf)
+        finally:
+            await asyncio.to_thread(close_staging, f)
+    except BaseException:
+        await upload_sessions.release(db, upload_id, token)
+        raise
+
+    if not await upload_sessions.advance(db, upload_id, token, upload_offset + written):
+        raise HTTPException(status_code=409, detail="Upload lease lost")
+    await db.refresh(session)
+    return _session_response(session, response)
+
+
+@router.post("/{upload_id}/finalize", response_model=DocumentResponse)
+async def finalize_upload(upload_id: str, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
+    session = await _open_session(db, upload_id, current_user.user_id)
+    if session.document_id is not None:
+        doc = await get_document_by_id(db, session.document_id)
+        if doc is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return doc
+    if session.offset != session.size:
+        raise _conflict(session, "Upload is incomplete")
+    token = await upload_sessions.claim(db, upload_id, current_user.user_id, session.size)
+    if token is None:
+        await db.refresh(session)
+        if session.document_id is not None:
+            return await get_document_by_id(db, session.document_id)
+        raise _conflict(session, "Another request is finalizing this upload")
+
+    # the upload id in the key makes a retried finalize overwrite its own earlier link, not add another
+    object_key = f"applications/{session.application_id}/{upload_id}_{session.file_name}"
+    storage = get_storage()
+    try:
+        stored = await storage.put_file(object_key, staging_path(upload_id), session.sha256, session.content_type)
+    except ChecksumMismatch as exc:
+        await asyncio.to_thread(discard_staging, upload_id)
+        await upload_sessions.release(db, upload_id, token, reset=True)
+        raise HTTPException(status_code=422, detail=f"Checksum mismatch: got sha256 {exc.actual}; upload restarts at offset 0")
+    except BaseException:
+        await upload_sessions.release(db, upload_id, token)
+        raise
+
+    try:
+        doc = await add_document(
+            db, session.application_id, session.document_type, session.file_name, object_key,
+            commit=False, sha256=stored.sha256, size_bytes=stored.size, retain_blob=storage.content_addressed,
+        )
+        if not await upload_sessions.complete(db, upload_id, token, doc.document_id, commit=False):
+            raise HTTPException(status_code=409, detail="Upload lease lost")
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        await upload_sessions.release(db, upload_id, token)
+        await storage.delete(object_key)
+        raise
+    await asyncio.to_thread(discard_staging, upload_id)
+
+    url = storage.presign(object_key)
+    setattr(doc, 'download_url', url)
+    return doc
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(upload_id: str, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)):
+    session = await _open_session(db, upload_id, current_user.user_id)
+    if session.document_id is None:
+        token = await upload_sessions.claim(db, upload_id, current_user.user_id, session.offset)
+        if token is None:
+            raise _conflict(session, "Another request is writing to this upload")
+        await asyncio.to_thread(discard_staging, upload_id)
+    await upload_sessions.delete_session(db, upload_id, current_user.user_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
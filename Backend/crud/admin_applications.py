@@ -1,56 +1,101 @@
+from datetime import datetime
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from models.lro_backend_models import Application, User, Services, ApplicationStatus, ApplicationLog
+from crud import reference, stats
+from crud.pagination import DEFAULT_PAGE_SIZE, clamp_limit, encode_cursor, keyset_after
 
-async def list_all_applications(db: AsyncSession) -> List[Dict[str, Any]]:
+_SUMMARY_COLUMNS = (
+    Application.application_id,
+    Application.user_id,
+    User.full_name,
+    Application.service_id,
+    Services.service_name,
+    Application.status_id,
+    ApplicationStatus.status_name,
+    Application.application_date,
+    Application.reference_number,
+)
+
+# field names of _SUMMARY_COLUMNS, in order (API responses and exports)
+SUMMARY_FIELDS = (
+    "application_id",
+    "user_id",
+    "user_full_name",
+    "service_id",
+    "service_name",
+    "status_id",
+    "status_name",
+    "application_date",
+    "reference_number",
+)
+
+def _summary_dict(row) -> Dict[str, Any]:
+    return dict(zip(SUMMARY_FIELDS, row))
+
+def applications_query(
+    status_id: int | None = None,
+    service_id: int | None = None,
+    assigned_officer_id: int | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    descending: bool = True,
+) -> Select:
+    """Filtered application summaries ordered by (application_date, application_id).
+    Each equality filter has a matching (<filter>, application_date, application_id) index.
+    """
     stmt = (
-        select(
-            Application.application_id,
-            Application.user_id,
-            User.full_name,
-            Application.service_id,
-            Services.service_name,
-            Application.status_id,
-            ApplicationStatus.status_name,
-            Application.application_date,
-            Application.reference_number,
-        )
+        select(*_SUMMARY_COLUMNS)
         .join(User, Application.user_id == User.user_id)
         .join(Services, Application.service_id == Services.service_id)
         .join(ApplicationStatus, Application.status_id == ApplicationStatus.status_id)
-        .order_by(Application.application_date.desc())
     )
-    r = await db.execute(stmt)
-    rows = r.all()
-    result = []
-    for row in rows:
-        result.append({
-            "application_id": row[0],
-            "user_id": row[1],
-            "user_full_name": row[2],
-            "service_id": row[3],
-            "service_name": row[4],
-            "status_id": row[5],
-            "status_name": row[6],
-            "application_date": row[7],
-            "reference_number": row[8],
-        })
-    return result
+    if status_id is not None:
+        stmt = stmt.where(Application.status_id == status_id)
+    if service_id is not None:
+        stmt = stmt.where(Application.service_id == service_id)
+    if assigned_officer_id is not None:
+        stmt = stmt.where(Application.assigned_officer_id == assigned_officer_id)
+    if date_from is not None:
+        stmt = stmt.where(Application.application_date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Application.application_date < date_to)
+    if descending:
+        return stmt.order_by(Application.application_date.desc(), Application.application_id.desc())
+    return stmt.order_by(Application.application_date.asc(), Application.application_id.asc())
+
+async def list_all_applications(db: AsyncSession, **filters) -> List[Dict[str, Any]]:
+    """Every matching application, newest first. Prefer list_applications_page for anything user-facing."""
+    r = await db.execute(applications_query(**filters))
+    return [_summary_dict(row) for row in r.all()]
+
+async def list_applications_page(
+    db: AsyncSession,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    descending: bool = True,
+    **filters,
+) -> Tuple[List[Dict[str, Any]], str | None]:
+    """One keyset page of application summaries. Returns (rows, next_cursor); next_cursor is None on the
+    last page. Raises ValueError for a malformed cursor.
+    """
+    limit = clamp_limit(limit)
+    stmt = applications_query(descending=descending, **filters)
+    if cursor:
+        stmt = stmt.where(keyset_after(Application.application_date, Application.application_id, cursor, descending))
+    r = await db.execute(stmt.limit(limit + 1))
+    rows = [_summary_dict(row) for row in r.all()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["application_date"], rows[-1]["application_id"])
+    return rows, next_cursor
 
 async def get_application_detail(db: AsyncSession, application_id: int) -> Dict[str, Any] | None:
     stmt = (
-        select(
-            Application.application_id,
-            Application.user_id,
-            User.full_name,
-            Application.service_id,
-            Services.service_name,
-            Application.status_id,
-            ApplicationStatus.status_name,
-            Application.application_date,
-            Application.reference_number,
-        )
+        select(*_SUMMARY_COLUMNS)
         .join(User, Application.user_id == User.user_id)
         .join(Services, Application.service_id == Services.service_id)
         .join(ApplicationStatus, Application.status_id == ApplicationStatus.status_id)
@@ -60,42 +105,44 @@ async def get_application_detail(db: AsyncSession, application_id: int) -> Dict[
     row = r.first()
     if not row:
         return None
-    return {
-        "application_id": row[0],
-        "user_id": row[1],
-        "user_full_name": row[2],
-        "service_id": row[3],
-        "service_name": row[4],
-        "status_id": row[5],
-        "status_name": row[6],
-        "application_date": row[7],
-        "reference_number": row[8],
-    }
+    return _summary_dict(row)
 
-async def update_application_status(db: AsyncSession, application_id: int, status_id: int, officer_id: int, remarks: str | None = None) -> None:
-    stmt = select(Application).where(Application.application_id == application_id)
+async def update_application_status(db: AsyncSession, application_id: int, status_id: int, officer_id: int, remarks: str | None = None, commit: bool = True) -> None:
+    # locked and refreshed: the counter deltas are computed from the current status and officer
+    stmt = (
+        select(Application)
+        .where(Application.application_id == application_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
     r = await db.execute(stmt)
     app = r.scalars().first()
     if not app:
         raise ValueError("Application not found")
 
-    sstmt = select(ApplicationStatus).where(ApplicationStatus.status_id == status_id)
-    sr = await db.execute(sstmt)
-    status_obj = sr.scalars().first()
-    if not status_obj:
+    status_name = await reference.get_status_name(db, status_id)
+    if not status_name:
         raise ValueError("Invalid status id")
 
+    deltas = {}
+    stats.move(deltas, stats.STATUS, app.status_id, status_id)
+    old_office = await stats.officer_office(db, app.assigned_officer_id)
+    stats.move(deltas, stats.OFFICE, old_office, await stats.officer_office(db, officer_id))
+
     app.status_id = status_id
     import datetime as _dt
     app.last_updated_at = _dt.datetime.utcnow()
     app.assigned_officer_id = officer_id
     db.add(app)
-    await db.commit()
 
-    # log
-    log = ApplicationLog(application_id=app.application_id, officer_id=officer_id, action_taken=f"Status set to {status_obj.status_name}", remarks=remarks)
+    # log in the same transaction as the status change
+    log = ApplicationLog(application_id=app.application_id, officer_id=officer_id, action_taken=f"Status set to {status_name}", remarks=remarks)
     db.add(log)
-    await db.commit()
+    await stats.apply_deltas(db, deltas)
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
 
 async def get_application_logs(db: AsyncSession, application_id: int) -> List[ApplicationLog]:
     stmt = select(ApplicationLog).where(ApplicationLog.application_id == application_id).order_by(ApplicationLog.timestamp.desc())
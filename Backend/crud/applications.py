@@ -1,21 +1,50 @@
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
-from models.lro_backend_models import Application, Services, UploadedDocuments, ApplicationLog
-from models.lro_backend_models import AppLandTransfer, AppCopyOfLandRegisters, AppSearchLandRegisters, AppSearchDuplicateDeeds, AppCopyOfDocument
+from typing import List, Optional
+from models.lro_backend_models import Application, UploadedDocuments, ApplicationLog
+from models.enums import VerificationStatusEnum
+from models.lro_backend_models import AppLandTransfer, AppCopyOfLandRegisters, AppSearchLandRegisters, AppSearchDuplicateDeeds, AppCopyOfDocument, SearchRegisterFolios
 from datetime import datetime
 import uuid
+from crud import blobs, reference, stats
+
+# Write helpers flush (to obtain generated ids) instead of committing mid-way and commit once at the end.
+# Pass commit=False to compose several helpers into one transaction and commit from the caller
+# (see create_application_endpoint).
+
+async def _finish(db: AsyncSession, commit: bool) -> None:
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+
+async def bulk_insert_folios(db: AsyncSession, search_register_id: int, folios: list[dict], volume_key: str, folio_key: str) -> int:
+    """Insert all folio rows for a register in one executemany INSERT (no per-row ORM objects).
+    `volume_key`/`folio_key` name the payload fields, which differ between the copy and search forms.
+    Returns the number of rows inserted.
+    """
+    rows = [
+        {
+            'search_register_id': search_register_id,
+            'register_name': f.get('division'),
+            'volume_number': f.get(volume_key),
+            'folio_number': f.get(folio_key),
+        }
+        for f in folios
+    ]
+    if rows:
+        await db.execute(insert(SearchRegisterFolios), rows)
+    return len(rows)
 
 async def list_user_applications(db: AsyncSession, user_id: int) -> List[Application]:
     stmt = select(Application).where(Application.user_id == user_id).order_by(Application.application_date.desc())
     r = await db.execute(stmt)
     return r.scalars().all()
 
-async def create_application(db: AsyncSession, user_id: int, service_id: int, reference_number: str | None) -> Application:
+async def create_application(db: AsyncSession, user_id: int, service_id: int, reference_number: str | None, commit: bool = True) -> Application:
     # validate service exists
-    svc_stmt = select(Services).where(Services.service_id == service_id)
-    svc_r = await db.execute(svc_stmt)
-    svc = svc_r.scalars().first()
+    svc = await reference.get_service(db, service_id)
     if not svc:
         raise ValueError("Service not found")
 
@@ -31,13 +60,17 @@ async def create_application(db: AsyncSession, user_id: int, service_id: int, re
         last_updated_at=datetime.utcnow(),
     )
     db.add(app)
-    await db.commit()
-    await db.refresh(app)
+    await db.flush()
 
-    # create initial log
+    # create initial log in the same transaction
     log = ApplicationLog(application_id=app.application_id, officer_id=None, action_taken="Created by user", remarks=None)
     db.add(log)
-    await db.commit()
+    deltas = {}
+    stats.add_delta(deltas, stats.STATUS, app.status_id, 1)
+    stats.add_delta(deltas, stats.SERVICE, service_id, 1)
+    stats.add_delta(deltas, stats.OFFICE, None, 1)
+    await stats.apply_deltas(db, deltas)
+    await _finish(db, commit)
     return app
 
 async def get_application(db: AsyncSession, application_id: int, user_id: int | None = None) -> Application | None:
@@ -47,20 +80,29 @@ async def get_application(db: AsyncSession, application_id: int, user_id: int |
     r = await db.execute(stmt)
     return r.scalars().first()
 
-async def add_document(db: AsyncSession, application_id: int, document_type: str, file_name: str, file_path: str) -> UploadedDocuments:
+async def add_document(db: AsyncSession, application_id: int, document_type: str, file_name: str, file_path: str, commit: bool = True, sha256: Optional[str] = None, size_bytes: Optional[int] = None, retain_blob: bool = True) -> UploadedDocuments:
+    """Insert a document row. `retain_blob` counts a reference to the shared blob for `sha256`; pass the
+    storage backend's `content_addressed` (False on S3, whose objects are not shared)."""
     doc = UploadedDocuments(
         application_id=application_id,
         document_type=document_type,
         file_name=file_name,
         file_path=file_path,
+        sha256=sha256,
+        size_bytes=size_bytes,
+        # set client-side like application_date: sqlite stores func.now() without microseconds, which would
+        # not compare consistently against keyset cursors
+        uploaded_at=datetime.utcnow(),
     )
     db.add(doc)
-    await db.commit()
-    await db.refresh(doc)
-    # add application log
+    await db.flush()
+    # add application log in the same transaction
     log = ApplicationLog(application_id=application_id, officer_id=None, action_taken=f"Uploaded document {doc.document_id}", remarks=None)
     db.add(log)
-    await db.commit()
+    await stats.apply_deltas(db, {(stats.DOCUMENT_STATUS, VerificationStatusEnum.PENDING.value): 1})
+    if sha256 is not None and retain_blob:
+        await blobs.retain(db, sha256, size_bytes)
+    await _finish(db, commit)
     return doc
 
 async def list_application_documents(db: AsyncSession, application_id: int) -> List[UploadedDocuments]:
@@ -68,7 +110,7 @@ async def list_application_documents(db: AsyncSession, application_id: int) -> L
     r = await db.execute(stmt)
     return r.scalars().all()
 
-async def create_land_transfer_details(db: AsyncSession, application_id: int, payload: dict) -> "AppLandTransfer":
+async def create_land_transfer_details(db: AsyncSession, application_id: int, payload: dict, commit: bool = True) -> "AppLandTransfer":
     # payload expected to contain seller/buyer keys
     seller = payload.get('seller', {})
     buyer = payload.get('buyer', {})
@@ -86,11 +128,10 @@ async def create_land_transfer_details(db: AsyncSession, application_id: int, pa
         guarantor2_nic=payload.get('guarantor2_nic'),
     )
     db.add(at)
-    await db.commit()
-    await db.refresh(at)
+    await _finish(db, commit)
     return at
 
-async def create_copy_of_land_registers_details(db: AsyncSession, application_id: int, payload: dict) -> "AppCopyOfLandRegisters":
+async def create_copy_of_land_registers_details(db: AsyncSession, application_id: int, payload: dict, commit: bool = True) -> "AppCopyOfLandRegisters":
     cr = AppCopyOfLandRegisters(
         application_id=application_id,
         land_district=payload.get('land_details', {}).get('district'),
@@ -101,19 +142,13 @@ async def create_copy_of_land_registers_details(db: AsyncSession, application_id
         applicant_signature_document_id=payload.get('applicant', {}).get('signature_document_id'),
     )
     db.add(cr)
-    await db.commit()
-    await db.refresh(cr)
+    await db.flush()
     # create folios if provided
-    folios = payload.get('extract_details') or []
-    if folios:
-        from models.lro_backend_models import SearchRegisterFolios
-        for f in folios:
-            fol = SearchRegisterFolios(search_register_id=cr.copy_register_id, register_name=f.get('division'), volume_number=f.get('volume'), folio_number=f.get('folio'))
-            db.add(fol)
-        await db.commit()
+    await bulk_insert_folios(db, cr.copy_register_id, payload.get('extract_details') or [], 'volume', 'folio')
+    await _finish(db, commit)
     return cr
 
-async def create_search_land_registers_details(db: AsyncSession, application_id: int, payload: dict) -> "AppSearchLandRegisters":
+async def create_search_land_registers_details(db: AsyncSession, application_id: int, payload: dict, commit: bool = True) -> "AppSearchLandRegisters":
     sr = AppSearchLandRegisters(
         application_id=application_id,
         property_village=payload.get('property_details', {}).get('village'),
@@ -126,19 +161,13 @@ async def create_search_land_registers_details(db: AsyncSession, application_id:
         applicant_signature_document_id=payload.get('applicant', {}).get('signature_document_id'),
     )
     db.add(sr)
-    await db.commit()
-    await db.refresh(sr)
+    await db.flush()
     # create folios
-    folios = payload.get('registered_to_search') or []
-    if folios:
-        from models.lro_backend_models import SearchRegisterFolios
-        for f in folios:
-            fol = SearchRegisterFolios(search_register_id=sr.search_register_id, register_name=f.get('division'), volume_number=f.get('volNo'), folio_number=f.get('folioNo'))
-            db.add(fol)
-        await db.commit()
+    await bulk_insert_folios(db, sr.search_register_id, payload.get('registered_to_search') or [], 'volNo', 'folioNo')
+    await _finish(db, commit)
     return sr
 
-async def create_search_duplicate_deeds_details(db: AsyncSession, application_id: int, payload: dict) -> "AppSearchDuplicateDeeds":
+async def create_search_duplicate_deeds_details(db: AsyncSession, application_id: int, payload: dict, commit: bool = True) -> "AppSearchDuplicateDeeds":
     sd = AppSearchDuplicateDeeds(
         application_id=application_id,
         notary_public_name=payload.get('notary_public_name'),
@@ -159,11 +188,10 @@ async def create_search_duplicate_deeds_details(db: AsyncSession, application_id
         applicant_signature_document_id=payload.get('applicant', {}).get('signature_document_id') or payload.get('applicant', {}).get('signature_document_id')
     )
     db.add(sd)
-    await db.commit()
-    await db.refresh(sd)
+    await _finish(db, commit)
     return sd
 
-async def create_copy_document_details(db: AsyncSession, application_id: int, payload: dict) -> "AppCopyOfDocument":
+async def create_copy_document_details(db: AsyncSession, application_id: int, payload: dict, commit: bool = True) -> "AppCopyOfDocument":
     cd = AppCopyOfDocument(
         application_id=application_id,
         document_deed_number=payload.get('deed_number'),
@@ -174,28 +202,23 @@ async def create_copy_document_details(db: AsyncSession, application_id: int, pa
         applicant_signature_document_id=payload.get('applicant', {}).get('signature_document_id')
     )
     db.add(cd)
-    await db.commit()
-    await db.refresh(cd)
+    await _finish(db, commit)
     return cd
 
-async def associate_documents_with_application(db: AsyncSession, application_id: int, document_ids: list[int]) -> int:
+async def associate_documents_with_application(db: AsyncSession, application_id: int, document_ids: list[int], commit: bool = True) -> int:
     """Associate existing uploaded document rows with the created application.
     Returns number of rows updated.
     """
     if not document_ids:
         return 0
-    # fetch documents that match provided ids
-    stmt = select(UploadedDocuments).where(UploadedDocuments.document_id.in_(document_ids))
+    # single UPDATE ... WHERE document_id IN (...) instead of loading every row to change one column
+    stmt = (
+        update(UploadedDocuments)
+        .where(UploadedDocuments.document_id.in_(document_ids))
+        .values(application_id=application_id)
+    )
     r = await db.execute(stmt)
-    docs = r.scalars().all()
-    updated = 0
-    for d in docs:
-        try:
-            d.application_id = application_id
-            db.add(d)
-            updated += 1
-        except Exception:
-            continue
+    updated = r.rowcount or 0
     if updated:
-        await db.commit()
+        await _finish(db, commit)
     return updated
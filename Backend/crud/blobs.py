@@ -0,0 +1,77 @@
+"""Reference counts for content-addressed document blobs.
+
+With content-addressed storage (see tools/minio_storage.py) every UploadedDocuments row with the same
+sha256 shares one blob on disk. `storage_blobs` holds, per hash, how many rows point at it. `retain` and
+`release` adjust the count in the caller's transaction, as single statements, when a document row is
+added or deleted.
+
+Rows removed without going through crud (ON DELETE CASCADE from applications, manual SQL) are not
+counted; `rebuild_statements` recomputes every count from uploaded_documents and is run before garbage
+collection (scripts/gc_storage.py), so a stale count never frees a blob that is still in use.
+"""
+from typing import Any, Iterable, List, Set
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.stats import _insert_for
+from models.lro_backend_models import StorageBlob, UploadedDocuments
+
+
+async def retain(db: AsyncSession, sha256: str, size_bytes: int | None = None) -> None:
+    """Count one more document row referencing `sha256` (does not flush or commit)."""
+    insert = _insert_for(db)
+    stmt = insert(StorageBlob).values(sha256=sha256, size_bytes=size_bytes, ref_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StorageBlob.sha256],
+        set_={"ref_count": StorageBlob.ref_count + 1},
+    )
+    await db.execute(stmt)
+
+
+async def release(db: AsyncSession, sha256: str) -> None:
+    """Count one fewer reference to `sha256`; the blob itself is removed later by garbage collection."""
+    await db.execute(
+        update(StorageBlob)
+        .where(StorageBlob.sha256 == sha256, StorageBlob.ref_count > 0)
+        .values(ref_count=StorageBlob.ref_count - 1)
+    )
+
+
+def rebuild_statements() -> List[Any]:
+    """DELETE + INSERT ... SELECT statements that recompute every count; run them in one transaction."""
+    counts = (
+        select(UploadedDocuments.sha256, func.max(UploadedDocuments.size_bytes), func.count())
+        .where(UploadedDocuments.sha256.is_not(None))
+        .group_by(UploadedDocuments.sha256)
+    )
+    columns = [StorageBlob.sha256, StorageBlob.size_bytes, StorageBlob.ref_count]
+    return [delete(StorageBlob), StorageBlob.__table__.insert().from_select(columns, counts)]
+
+
+async def rebuild_refcounts(db: AsyncSession, commit: bool = True) -> None:
+    for stmt in rebuild_statements():
+        await db.execute(stmt)
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+
+
+async def referenced_blobs(db: AsyncSession, sha256s: Iterable[str], batch_size: int = 500) -> Set[str]:
+    """The hashes among `sha256s` that at least one document row references."""
+    sha256s = list(sha256s)
+    found: Set[str] = set()
+    for i in range(0, len(sha256s), batch_size):
+        r = await db.execute(
+            select(StorageBlob.sha256).where(StorageBlob.sha256.in_(sha256s[i:i + batch_size]), StorageBlob.ref_count > 0)
+        )
+        found.update(r.scalars().all())
+    return found
+
+
+async def forget(db: AsyncSession, sha256s: Iterable[str]) -> None:
+    """Drop the rows of blobs that were removed from storage, unless they were referenced again meanwhile."""
+    sha256s = list(sha256s)
+    if sha256s:
+        await db.execute(delete(StorageBlob).where(StorageBlob.sha256.in_(sha256s), StorageBlob.ref_count <= 0))
@@ -1,10 +1,15 @@
+from datetime import datetime
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
-from models.lro_backend_models import UploadedDocuments, ApplicationLog
+from typing import List, Tuple
+from models.lro_backend_models import UploadedDocuments, ApplicationLog, Application
+from crud import blobs, stats
+from crud.pagination import DEFAULT_PAGE_SIZE, clamp_limit, encode_cursor, keyset_after
 
 async def list_user_documents(db: AsyncSession, user_id: int) -> List[UploadedDocuments]:
-    stmt = select(UploadedDocuments).join(UploadedDocuments.application).where(UploadedDocuments.application.has(user_id=user_id))
+    # plain join: a has() EXISTS here is correlated per document row and scans uploaded_documents
+    stmt = select(UploadedDocuments).join(UploadedDocuments.application).where(Application.user_id == user_id)
     r = await db.execute(stmt)
     return r.scalars().all()
 
@@ -18,25 +23,114 @@ async def get_document_by_id(db: AsyncSession, document_id: int) -> UploadedDocu
     r = await db.execute(stmt)
     return r.scalars().first()
 
-async def set_document_verification(db: AsyncSession, document_id: int, verification_status: str, officer_id: int, remarks: str | None = None):
-    doc = await get_document_by_id(db, document_id)
+async def get_user_document(db: AsyncSession, document_id: int, user_id: int) -> UploadedDocuments | None:
+    """The document if its application belongs to `user_id`, else None (ownership decided in the query)."""
+    stmt = (
+        select(UploadedDocuments)
+        .join(UploadedDocuments.application)
+        .where(UploadedDocuments.document_id == document_id, Application.user_id == user_id)
+    )
+    r = await db.execute(stmt)
+    return r.scalars().first()
+
+async def _get_document_for_update(db: AsyncSession, document_id: int) -> UploadedDocuments | None:
+    # locked and refreshed: counter deltas are computed from the current verification status
+    stmt = (
+        select(UploadedDocuments)
+        .where(UploadedDocuments.document_id == document_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    r = await db.execute(stmt)
+    return r.scalars().first()
+
+async def set_document_verification(db: AsyncSession, document_id: int, verification_status: str, officer_id: int, remarks: str | None = None, commit: bool = True):
+    doc = await _get_document_for_update(db, document_id)
     if not doc:
         return None
+    deltas = {}
+    stats.move(deltas, stats.DOCUMENT_STATUS, doc.verification_status, verification_status)
     doc.verification_status = verification_status
     db.add(doc)
-    await db.commit()
-    # add log
+    # add log in the same transaction as the verification change
     log = ApplicationLog(application_id=doc.application_id, officer_id=officer_id, action_taken=f"Document {document_id} set to {verification_status}", remarks=remarks)
     db.add(log)
-    await db.commit()
+    await stats.apply_deltas(db, deltas)
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+    return doc
+
+async def delete_document(db: AsyncSession, document_id: int, officer_id: int | None = None, commit: bool = True) -> UploadedDocuments | None:
+    """Delete a document row and release its blob reference; the caller removes the stored object
+    (`tools.minio_storage.delete_object(doc.file_path)`) once this has committed."""
+    doc = await _get_document_for_update(db, document_id)
+    if not doc:
+        return None
+    deltas = {}
+    stats.add_delta(deltas, stats.DOCUMENT_STATUS, doc.verification_status, -1)
+    await db.delete(doc)
+    log = ApplicationLog(application_id=doc.application_id, officer_id=officer_id, action_taken=f"Deleted document {document_id}", remarks=None)
+    db.add(log)
+    await stats.apply_deltas(db, deltas)
+    if doc.sha256 is not None:
+        await blobs.release(db, doc.sha256)
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
     return doc
 
-async def list_all_documents(db: AsyncSession) -> List[UploadedDocuments]:
+def documents_query(
+    verification_status: str | None = None,
+    document_type: str | None = None,
+    application_id: int | None = None,
+    uploaded_from: datetime | None = None,
+    uploaded_to: datetime | None = None,
+    descending: bool = True,
+) -> Select:
+    """Filtered documents ordered by (uploaded_at, document_id); see the composite indexes on UploadedDocuments."""
+    stmt = select(UploadedDocuments)
+    if verification_status is not None:
+        stmt = stmt.where(UploadedDocuments.verification_status == verification_status)
+    if document_type is not None:
+        stmt = stmt.where(UploadedDocuments.document_type == document_type)
+    if application_id is not None:
+        stmt = stmt.where(UploadedDocuments.application_id == application_id)
+    if uploaded_from is not None:
+        stmt = stmt.where(UploadedDocuments.uploaded_at >= uploaded_from)
+    if uploaded_to is not None:
+        stmt = stmt.where(UploadedDocuments.uploaded_at < uploaded_to)
+    if descending:
+        return stmt.order_by(UploadedDocuments.uploaded_at.desc(), UploadedDocuments.document_id.desc())
+    return stmt.order_by(UploadedDocuments.uploaded_at.asc(), UploadedDocuments.document_id.asc())
+
+async def list_all_documents(db: AsyncSession, **filters) -> List[UploadedDocuments]:
     """Return all uploaded documents ordered by upload time (newest first)."""
-    stmt = select(UploadedDocuments).order_by(UploadedDocuments.uploaded_at.desc())
-    r = await db.execute(stmt)
+    r = await db.execute(documents_query(**filters))
     return r.scalars().all()
 
+async def list_documents_page(
+    db: AsyncSession,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    descending: bool = True,
+    **filters,
+) -> Tuple[List[UploadedDocuments], str | None]:
+    """One keyset page of documents. Returns (documents, next_cursor); raises ValueError for a bad cursor."""
+    limit = clamp_limit(limit)
+    stmt = documents_query(descending=descending, **filters)
+    if cursor:
+        stmt = stmt.where(keyset_after(UploadedDocuments.uploaded_at, UploadedDocuments.document_id, cursor, descending))
+    r = await db.execute(stmt.limit(limit + 1))
+    docs = list(r.scalars().all())
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1].uploaded_at, docs[-1].document_id)
+    return docs, next_cursor
+
 async def list_application_documents(db: AsyncSession, application_id: int) -> List[UploadedDocuments]:
     """Compatibility wrapper for previous function name used by endpoints."""
     return await list_documents_for_application(db, application_id)
@@ -0,0 +1,158 @@
+"""Streaming exports of applications, documents and payments as NDJSON or CSV.
+
+Rows are read with `AsyncSession.stream()` and `yield_per`, so the driver fetches EXPORT_BATCH_SIZE rows
+at a time (a server-side cursor on postgres) and memory stays flat however large the table is. Exports
+select plain columns, not ORM entities, so nothing accumulates in the session's identity map. Each batch
+is encoded into one chunk of bytes.
+
+The filters are the ones the admin list endpoints take; see `applications_query`, `documents_query` and
+`payments_query`. Rows are ordered by the same (timestamp, id) keys.
+
+Value encoding: datetimes as ISO 8601, Decimals (payment amounts) as strings to keep exact cents, enums
+as their value and NULL as null in NDJSON or an empty field in CSV. In CSV, text that a spreadsheet would
+run as a formula (starting with =, +, -, @, tab or CR) is prefixed with a single quote; file names and
+remarks come from users.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Sequence, Tuple
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.admin_applications import SUMMARY_FIELDS, applications_query
+from crud.documents import documents_query
+from crud.payments import payments_query
+from database.session import _env_int
+from models.lro_backend_models import Payments, UploadedDocuments
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPORT_BATCH_SIZE = _env_int("EXPORT_BATCH_SIZE", 1000)
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    fields: Tuple[str, ...]
+    query: Callable[..., Select]
+
+
+_DOCUMENT_COLUMNS = (
+    UploadedDocuments.document_id,
+    UploadedDocuments.application_id,
+    UploadedDocuments.document_type,
+    UploadedDocuments.file_name,
+    UploadedDocuments.verification_status,
+    UploadedDocuments.uploaded_at,
+)
+
+_PAYMENT_COLUMNS = (
+    Payments.payment_id,
+    Payments.application_id,
+    Payments.amount,
+    Payments.payment_date,
+    Payments.payment_method,
+    Payments.transaction_reference,
+    Payments.payment_status,
+)
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "applications": ExportSpec(SUMMARY_FIELDS, applications_query),
+    "documents": ExportSpec(
+        tuple(c.key for c in _DOCUMENT_COLUMNS),
+        lambda **filters: documents_query(**filters).with_only_columns(*_DOCUMENT_COLUMNS),
+    ),
+    "payments": ExportSpec(
+        tuple(c.key for c in _PAYMENT_COLUMNS),
+        lambda **filters: payments_query(**filters).with_only_columns(*_PAYMENT_COLUMNS),
+    ),
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _ndjson_chunk(fields: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    if orjson is not None:
+        return b"".join(orjson.dumps({f: _plain(v) for f, v in zip(fields, row)}) + b"\n" for row in rows)
+    return "".join(
+        json.dumps({f: _plain(v) for f, v in zip(fields, row)}, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for row in rows
+    ).encode()
+
+
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return _plain(value)
+
+
+def _csv_chunk(rows: Sequence[Sequence[Any]]) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerows([_csv_value(v) for v in row] for row in rows)
+    return buf.getvalue().encode()
+
+
+async def stream_rows(db: AsyncSession, stmt: Select, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Sequence[Tuple]]:
+    """Yield the rows of `stmt` in batches of at most `batch_size`, fetched incrementally."""
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    try:
+        async for batch in result.partitions():
+            yield batch
+    finally:
+        await result.close()
+
+
+async def export_batches(
+    db: AsyncSession,
+    kind: str,
+    fmt: str = "ndjson",
+    batch_size: int = EXPORT_BATCH_SIZE,
+    **filters,
+) -> AsyncIterator[Tuple[bytes, int]]:
+    """Like `export_chunks`, but yields (chunk, number of rows in it); the CSV header counts as 0 rows."""
+    spec = EXPORTS[kind]
+    if fmt not in FORMATS:
+        raise KeyError(fmt)
+    if fmt == "csv":
+        yield _csv_chunk([spec.fields]), 0
+    async for batch in stream_rows(db, spec.query(**filters), batch_size):
+        yield (_csv_chunk(batch) if fmt == "csv" else _ndjson_chunk(spec.fields, batch)), len(batch)
+
+
+async def export_chunks(
+    db: AsyncSession,
+    kind: str,
+    fmt: str = "ndjson",
+    batch_size: int = EXPORT_BATCH_SIZE,
+    **filters,
+) -> AsyncIterator[bytes]:
+    """Encoded export of `kind` ("applications", "documents" or "payments"), one chunk per batch of rows.
+
+    CSV output starts with a header row. Raises KeyError for an unknown kind or format.
+    """
+    async for chunk, _ in export_batches(db, kind, fmt, batch_size, **filters):
+        yield chunk
@@ -0,0 +1,47 @@
+"""Keyset (cursor) pagination helpers shared by the admin list queries.
+
+A cursor is the (timestamp, id) of the last row on the previous page, encoded as an opaque url-safe
+string. Pages are ordered by (timestamp, id) so ties on the timestamp are broken deterministically and
+each page is an index range scan on a (timestamp, id) composite index instead of an OFFSET scan.
+"""
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = base64.urlsafe_b64decode(padded.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def keyset_after(ts_col, id_col, cursor: str, descending: bool = True):
+    """WHERE clause selecting rows strictly after `cursor` in (ts_col, id_col) order.
+
+    Written as `ts <= :ts AND (ts < :ts OR id < :id)` (mirrored for ascending) rather than a row-value
+    comparison so both SQLite and Postgres turn the leading term into an index range.
+    """
+    ts, row_id = decode_cursor(cursor)
+    if descending:
+        return and_(ts_col <= ts, or_(ts_col < ts, id_col < row_id))
+    return and_(ts_col >= ts, or_(ts_col > ts, id_col > row_id))
+
+
+def clamp_limit(limit: int | None) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
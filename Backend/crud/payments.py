@@ -1,3 +1,4 @@
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from models.lro_backend_models import Payments, Application, PaymentStatusEnum
@@ -19,8 +20,8 @@ async def create_payment_for_application(db: AsyncSession, payload, user_id: int
         payment_status=PaymentStatusEnum.COMPLETED.value,
     )
     db.add(p)
+    # server defaults (payment_date) come back via INSERT ... RETURNING; no refresh round-trip needed
     await db.commit()
-    await db.refresh(p)
     return p
 
 async def list_payments_for_application(db: AsyncSession, application_id: int, user_id: int):
@@ -31,3 +32,24 @@ async def list_payments_for_application(db: AsyncSession, application_id: int, u
         if payments[0].application.user_id != user_id:
             raise ValueError("Forbidden")
     return payments
+
+def payments_query(
+    payment_status: str | None = None,
+    application_id: int | None = None,
+    paid_from: datetime | None = None,
+    paid_to: datetime | None = None,
+    descending: bool = True,
+) -> Select:
+    """Filtered payments ordered by (payment_date, payment_id)."""
+    stmt = select(Payments)
+    if payment_status is not None:
+        stmt = stmt.where(Payments.payment_status == payment_status)
+    if application_id is not None:
+        stmt = stmt.where(Payments.application_id == application_id)
+    if paid_from is not None:
+        stmt = stmt.where(Payments.payment_date >= paid_from)
+    if paid_to is not None:
+        stmt = stmt.where(Payments.payment_date < paid_to)
+    if descending:
+        return stmt.order_by(Payments.payment_date.desc(), Payments.payment_id.desc())
+    return stmt.order_by(Payments.payment_date.asc(), Payments.payment_id.asc())
@@ -0,0 +1,179 @@
+"""Process-local cache of the reference tables: application_status, services and offices.
+
+These tables have a handful of rows that change only when an administrator edits them, yet the write
+paths used to SELECT them on every call just to validate an id or fetch a name. The cache holds one
+immutable, versioned `ReferenceData` snapshot per engine (primary and replica each get their own). The
+snapshot is:
+- loaded at startup (`preload`), or lazily by the first lookup;
+- reloaded when older than REFERENCE_CACHE_TTL_SECONDS (default 300);
+- reloaded after `invalidate()`;
+- reloaded when a lookup misses and the snapshot is older than MISS_RELOAD_SECONDS, so a row added by
+  another process is found without waiting for the TTL, while a stream of bad ids cannot force a reload
+  per request;
+- dropped for every engine when this process inserts, updates or deletes one of these rows through the
+  ORM (mapper events below), at flush and again when that session's transaction commits or rolls back.
+
+Lookups run on the caller's session, so a reload happens inside the caller's transaction. A session that
+has written reference rows sees its own uncommitted changes, so snapshots it loads are returned to it
+but not cached for anyone else.
+"""
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from database.session import _env_float
+from models.lro_backend_models import ApplicationStatus, Offices, Services
+
+
+# a miss reloads at most this often
+MISS_RELOAD_SECONDS = 1.0
+
+# Session.info flag: the session's transaction has written reference rows
+_PENDING_KEY = "reference_changes"
+
+
+@dataclass(frozen=True)
+class ServiceRef:
+    service_id: int
+    service_name: str
+    service_code: str
+    base_fee: Decimal
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    version: int
+    loaded_at: float
+    statuses: Dict[int, str] = field(default_factory=dict)
+    services: Dict[int, ServiceRef] = field(default_factory=dict)
+    offices: Dict[int, str] = field(default_factory=dict)
+
+
+class ReferenceCache:
+    """Versioned reference-table snapshot for one engine; concurrent reloads share one load."""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = _env_float('REFERENCE_CACHE_TTL_SECONDS', 300.0) if ttl is None else ttl
+        self._data: Optional[ReferenceData] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        self._data = None
+
+    def _fresh(self) -> bool:
+        return self._data is not None and time.monotonic() - self._data.loaded_at < self.ttl
+
+    async def load(self, db: AsyncSession, store: bool = True) -> ReferenceData:
+        statuses = dict((await db.execute(select(ApplicationStatus.status_id, ApplicationStatus.status_name))).all())
+        services = {
+            sid: ServiceRef(sid, name, code, fee)
+            for sid, name, code, fee in (await db.execute(
+                select(Services.service_id, Services.service_name, Services.service_code, Services.base_fee)
+            )).all()
+        }
+        offices = dict((await db.execute(select(Offices.office_id, Offices.office_name))).all())
+        self._version += 1
+        self.loads += 1
+        data = ReferenceData(self._version, time.monotonic(), statuses, services, offices)
+        if store:
+            self._data = data
+        return data
+
+    async def get(self, db: AsyncSession, reload: bool = False) -> ReferenceData:
+        if db.sync_session.info.get(_PENDING_KEY):
+            # this transaction has changed reference rows: never share what it reads
+            return await self.load(db, store=False)
+        data = self._data
+        if data is not None and not reload and self._fresh():
+            return data
+        async with self._lock:
+            # another task may have reloaded while we waited
+            if self._data is not None and self._data is not data and self._fresh():
+                return self._data
+            if not reload and self._fresh():
+                return self._data
+            return await self.load(db)
+
+
+_caches: "weakref.WeakKeyDictionary[object, ReferenceCache]" = weakref.WeakKeyDictionary()
+
+
+def cache_for(db_or_engine) -> ReferenceCache:
+    """The ReferenceCache of the engine behind a session (or of an AsyncEngine)."""
+    bind = db_or_engine.sync_engine if isinstance(db_or_engine, AsyncEngine) else db_or_engine.get_bind()
+    cache = _caches.get(bind)
+    if cache is None:
+        cache = _caches[bind] = ReferenceCache()
+    return cache
+
+
+def invalidate(db_or_engine=None) -> None:
+    """Drop cached reference data for one engine, or for every engine when called without arguments."""
+    if db_or_engine is None:
+        for cache in list(_caches.values()):
+            cache.invalidate()
+    else:
+        cache_for(db_or_engine).invalidate()
+
+
+async def preload(engine: AsyncEngine) -> ReferenceData:
+    async with AsyncSession(engine) as db:
+        return await cache_for(engine).get(db, reload=True)
+
+
+async def reference_data(db: AsyncSession) -> ReferenceData:
+    return await cache_for(db).get(db)
+
+
+async def _lookup(db: AsyncSession, table: str, key: Optional[int]):
+    if key is None:
+        return None
+    cache = cache_for(db)
+    data = await cache.get(db)
+    value = getattr(data, table).get(key)
+    if value is None and time.monotonic() - data.loaded_at >= MISS_RELOAD_SECONDS:
+        data = await cache.get(db, reload=True)
+        value = getattr(data, table).get(key)
+    return value
+
+
+async def get_status_name(db: AsyncSession, status_id: Optional[int]) -> Optional[str]:
+    return await _lookup(db, "statuses", status_id)
+
+
+async def get_service(db: AsyncSession, service_id: Optional[int]) -> Optional[ServiceRef]:
+    return await _lookup(db, "services", service_id)
+
+
+async def get_office_name(db: AsyncSession, office_id: Optional[int]) -> Optional[str]:
+    return await _lookup(db, "offices", office_id)
+
+
+def _on_reference_change(mapper, connection, target) -> None:
+    invalidate()
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+
+
+def _on_transaction_end(session) -> None:
+    # a snapshot loaded by another session between the flush and now may predate the commit
+    if session.info.pop(_PENDING_KEY, False):
+        invalidate()
+
+
+for _model in (ApplicationStatus, Services, Offices):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _on_reference_change)
+
+for _event in ("after_commit", "after_rollback"):
+    event.listen(Session, _event, _on_transaction_end)
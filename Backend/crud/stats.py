@@ -0,0 +1,146 @@
+"""Admin dashboard counters.
+
+Counts live in `dashboard_counters` as (dimension, bucket) -> value and are adjusted by the crud write
+paths in the same transaction as the row change, so reading the dashboard is one small SELECT no matter
+how many applications or documents exist. Each adjustment is a single multi-row
+INSERT ... ON CONFLICT DO UPDATE SET value = value + excluded.value.
+
+Dimensions:
+    application_status   bucket = status_id
+    application_service  bucket = service_id
+    application_office   bucket = office of the assigned officer, or "unassigned"
+    document_status      bucket = verification status value
+
+Writes that bypass crud (manual SQL, bulk imports) are not counted; `rebuild_counters` recomputes every
+dimension from the source tables.
+"""
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import String, cast, delete, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.reference import reference_data
+from models.lro_backend_models import Application, DashboardCounter, LROOfficer, UploadedDocuments
+from models.enums import VerificationStatusEnum
+
+STATUS = "application_status"
+SERVICE = "application_service"
+OFFICE = "application_office"
+DOCUMENT_STATUS = "document_status"
+UNASSIGNED = "unassigned"
+
+Deltas = Dict[Tuple[str, str], int]
+
+
+def _bucket(value: Any) -> str:
+    if value is None:
+        return UNASSIGNED
+    return str(getattr(value, "value", value))
+
+
+def _insert_for(db: AsyncSession):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def add_delta(deltas: Deltas, dimension: str, bucket: Any, n: int) -> None:
+    key = (dimension, _bucket(bucket))
+    deltas[key] = deltas.get(key, 0) + n
+
+
+def move(deltas: Deltas, dimension: str, old: Any, new: Any) -> None:
+    """Record one row moving from bucket `old` to bucket `new` (no-op when they are equal)."""
+    if _bucket(old) != _bucket(new):
+        add_delta(deltas, dimension, old, -1)
+        add_delta(deltas, dimension, new, 1)
+
+
+async def apply_deltas(db: AsyncSession, deltas: Deltas) -> None:
+    """Add `deltas` to the counters in the caller's transaction (does not flush or commit).
+
+    Callers compute the deltas from the row's current bucket, so they must read that row with
+    SELECT ... FOR UPDATE; otherwise two concurrent updates can both apply the same move.
+    """
+    # a fixed (dimension, bucket) order: opposite moves (1 -> 3 and 3 -> 1) lock the same counter rows in
+    # the same order instead of deadlocking on each other
+    rows = [{"dimension": d, "bucket": b, "value": n} for (d, b), n in sorted(deltas.items()) if n]
+    if not rows:
+        return
+    insert = _insert_for(db)
+    stmt = insert(DashboardCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DashboardCounter.dimension, DashboardCounter.bucket],
+        set_={"value": DashboardCounter.value + stmt.excluded.value},
+    )
+    await db.execute(stmt)
+
+
+async def officer_office(db: AsyncSession, officer_id: int | None) -> int | None:
+    """Office of an officer; served from the identity map when the request already loaded the officer."""
+    if officer_id is None:
+        return None
+    officer = await db.get(LROOfficer, officer_id)
+    return officer.assigned_office_id if officer else None
+
+
+def rebuild_statements() -> List[Any]:
+    """DELETE + INSERT ... SELECT statements that recompute every counter; run them in one transaction."""
+    office = func.coalesce(cast(LROOfficer.assigned_office_id, String), UNASSIGNED)
+    sources = [
+        select(literal(STATUS, String), cast(Application.status_id, String), func.count())
+        .group_by(Application.status_id),
+        select(literal(SERVICE, String), cast(Application.service_id, String), func.count())
+        .group_by(Application.service_id),
+        select(literal(OFFICE, String), office, func.count())
+        .select_from(Application)
+        .outerjoin(LROOfficer, Application.assigned_officer_id == LROOfficer.officer_id)
+        .group_by(office),
+        select(literal(DOCUMENT_STATUS, String), cast(UploadedDocuments.verification_status, String), func.count())
+        .group_by(UploadedDocuments.verification_status),
+    ]
+    columns = [DashboardCounter.dimension, DashboardCounter.bucket, DashboardCounter.value]
+    return [delete(DashboardCounter)] + [DashboardCounter.__table__.insert().from_select(columns, src) for src in sources]
+
+
+async def rebuild_counters(db: AsyncSession, commit: bool = True) -> None:
+    for stmt in rebuild_statements():
+        await db.execute(stmt)
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+
+
+async def get_dashboard_stats(db: AsyncSession) -> Dict[str, Any]:
+    """Counters grouped for the dashboard, with names from the reference cache."""
+    r = await db.execute(select(DashboardCounter.dimension, DashboardCounter.bucket, DashboardCounter.value))
+    counts: Dict[str, Dict[str, int]] = {}
+    for dimension, bucket, value in r.all():
+        counts.setdefault(dimension, {})[bucket] = value
+
+    ref = await reference_data(db)
+    status_names = ref.statuses
+    service_names = {sid: svc.service_name for sid, svc in ref.services.items()}
+    office_names = ref.offices
+
+    def _rows(dimension: str, id_field: str, name_field: str, names: Dict[int, str]) -> List[Dict[str, Any]]:
+        rows = []
+        buckets = counts.get(dimension, {})
+        for bucket in sorted(buckets, key=lambda b: (b == UNASSIGNED, int(b) if b != UNASSIGNED else 0)):
+            value = buckets[bucket]
+            ident = None if bucket == UNASSIGNED else int(bucket)
+            rows.append({id_field: ident, name_field: names.get(ident), "count": value})
+        return rows
+
+    documents = counts.get(DOCUMENT_STATUS, {})
+    return {
+        "applications_total": sum(counts.get(STATUS, {}).values()),
+        "by_status": _rows(STATUS, "status_id", "status_name", status_names),
+        "by_service": _rows(SERVICE, "service_id", "service_name", service_names),
+        "by_office": _rows(OFFICE, "office_id", "office_name", office_names),
+        "documents_by_verification_status": {s.value: documents.get(s.value, 0) for s in VerificationStatusEnum},
+        "pending_document_verifications": documents.get(VerificationStatusEnum.PENDING.value, 0),
+    }
@@ -0,0 +1,179 @@
+"""Resumable upload sessions.
+
+A session records what is being uploaded (application, document type, declared size and optional
+checksum) and how many bytes of it are durable in the staging file (`offset`). The bytes themselves are
+handled by tools/minio_storage (open_staging/close_staging/save_file).
+
+Requests that write (PATCH a chunk, finalize) first `claim` the session: one UPDATE that succeeds only at
+the expected offset and when no other request holds an unexpired lease. This works across workers and
+processes with nothing but the database. The holder then `advance`s the offset, `renew`s the lease
+during a long transfer, or `release`s it. Every statement here is a single-row UPDATE/SELECT by primary
+key. The staging file and the offset can disagree only in one direction: bytes past `offset` may exist
+and are dropped by the next write.
+
+Sessions expire UPLOAD_SESSION_TTL_SECONDS (default 24 h) after their last write; `purge_expired` removes
+expired rows, and the caller deletes their staging files.
+"""
+import secrets
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.session import _env_int
+from models.lro_backend_models import UploadSession
+
+UPLOAD_SESSION_TTL_SECONDS = _env_int("UPLOAD_SESSION_TTL_SECONDS", 24 * 3600)
+# a request that stops renewing its lease (crashed worker) blocks the session at most this long
+UPLOAD_SESSION_LEASE_SECONDS = _env_int("UPLOAD_SESSION_LEASE_SECONDS", 120)
+
+
+async def create_session(
+    db: AsyncSession,
+    user_id: int,
+    application_id: int,
+    document_type: str,
+    file_name: str,
+    size: int,
+    content_type: Optional[str] = None,
+    sha256: Optional[str] = None,
+    commit: bool = True,
+) -> UploadSession:
+    now = datetime.utcnow()
+    session = UploadSession(
+        upload_id=secrets.token_hex(16),
+        user_id=user_id,
+        application_id=application_id,
+        document_type=document_type,
+        file_name=file_name,
+        content_type=content_type,
+        size=size,
+        offset=0,
+        sha256=sha256.lower() if sha256 else None,
+        created_at=now,
+        expires_at=now + timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS),
+    )
+    db.add(session)
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+    return session
+
+
+async def get_session(db: AsyncSession, upload_id: str, user_id: int) -> Optional[UploadSession]:
+    """The caller's session, or None when it does not exist, belongs to someone else or has expired."""
+    r = await db.execute(
+        select(UploadSession).where(
+            UploadSession.upload_id == upload_id,
+            UploadSession.user_id == user_id,
+            UploadSession.expires_at > datetime.utcnow(),
+        )
+    )
+    return r.scalars().first()
+
+
+async def claim(db: AsyncSession, upload_id: str, user_id: int, offset: int) -> Optional[str]:
+    """Take the write lease if the session is open, at `offset` and not leased; returns the lease token."""
+    now = datetime.utcnow()
+    token = secrets.token_hex(16)
+    r = await db.execute(
+        update(UploadSession)
+        .where(
+            UploadSession.upload_id == upload_id,
+            UploadSession.user_id == user_id,
+            UploadSession.offset == offset,
+            UploadSession.document_id.is_(None),
+            UploadSession.expires_at > now,
+            (UploadSession.lease_token.is_(None)) | (UploadSession.lease_expires_at < now),
+        )
+        .values(lease_token=token, lease_expires_at=now + timedelta(seconds=UPLOAD_SESSION_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return token if r.rowcount == 1 else None
+
+
+async def renew(db: AsyncSession, upload_id: str, token: str) -> bool:
+    """Extend a held lease; False when it was lost (expired and claimed by another request)."""
+    r = await db.execute(
+        update(UploadSession)
+        .where(UploadSession.upload_id == upload_id, UploadSession.lease_token == token)
+        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=UPLOAD_SESSION_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return r.rowcount == 1
+
+
+async def advance(db: AsyncSession, upload_id: str, token: str, offset: int) -> bool:
+    """Record `offset` as durable, release the lease and push back expiry; False if the lease was lost."""
+    now = datetime.utcnow()
+    r = await db.execute(
+        update(UploadSession)
+        .where(UploadSession.upload_id == upload_id, UploadSession.lease_token == token)
+        .values(offset=offset, lease_token=None, lease_expires_at=None,
+                expires_at=now + timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return r.rowcount == 1
+
+
+async def release(db: AsyncSession, upload_id: str, token: str, reset: bool = False) -> None:
+    """Give up a lease without recording progress; `reset` also rewinds the session to offset 0."""
+    values = {"lease_token": None, "lease_expires_at": None}
+    if reset:
+        values["offset"] = 0
+    await db.execute(
+        update(UploadSession)
+        .where(UploadSession.upload_id == upload_id, UploadSession.lease_token == token)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def complete(db: AsyncSession, upload_id: str, token: str, document_id: int, commit: bool = True) -> bool:
+    """Mark the session finalized with its document, in the caller's transaction (the one that adds the row)."""
+    r = await db.execute(
+        update(UploadSession)
+        .where(UploadSession.upload_id == upload_id, UploadSession.lease_token == token)
+        .values(document_id=document_id, lease_token=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    if commit:
+        await db.commit()
+    return r.rowcount == 1
+
+
+async def delete_session(db: AsyncSession, upload_id: str, user_id: int) -> bool:
+    r = await db.execute(
+        delete(UploadSession).where(UploadSession.upload_id == upload_id, UploadSession.user_id == user_id)
+    )
+    await db.commit()
+    return r.rowcount == 1
+
+
+async def purge_expired(db: AsyncSession, limit: int = 100) -> List[str]:
+    """Delete up to `limit` expired sessions and return their ids so the caller can discard staging files."""
+    r = await db.execute(
+        select(UploadSession.upload_id)
+        .where(UploadSession.expires_at <= datetime.utcnow())
+        .order_by(UploadSession.expires_at)
+        .limit(limit)
+    )
+    ids = list(r.scalars().all())
+    if ids:
+        await db.execute(delete(UploadSession).where(UploadSession.upload_id.in_(ids)))
+        await db.commit()
+    return ids
+
+
+async def existing_ids(db: AsyncSession, upload_ids: List[str]) -> set:
+    """The ids among `upload_ids` that still have a session row (staging files without one are orphans)."""
+    if not upload_ids:
+        return set()
+    r = await db.execute(select(UploadSession.upload_id).where(UploadSession.upload_id.in_(upload_ids)))
+    return set(r.scalars().all())
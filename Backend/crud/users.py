@@ -2,16 +2,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import ProgrammingError
 from models.lro_backend_models import User, UserTypeEnum
+from models.security import hash_password_async
 from typing import Optional
 
 async def _ensure_tables(db: AsyncSession):
     try:
-        # Attempt to create all tables using models helper if available
-        from models.lro_backend_models import create_all_tables
+        # Apply any pending migrations (non-destructive; existing tables and rows are kept)
+        from database.migrations import ensure_schema
         from database.session import get_engine
+        await db.rollback()
         engine = get_engine()
         if engine is not None:
-            await create_all_tables(engine)
+            await ensure_schema(engine)
     except Exception:
         # ignore failures; caller will surface original error if still failing
         pass
@@ -62,8 +64,9 @@ async def create_user(db: AsyncSession, full_name: str, nic_number: str, email:
         address=address,
         user_type=user_type_enum,
     )
-    user.set_password(password)
+    # bcrypt runs on the bounded hashing pool so the event loop keeps serving other requests
+    user.password_hash = await hash_password_async(password)
     db.add(user)
+    # server defaults (created_at, is_active) come back via INSERT ... RETURNING; no refresh round-trip needed
     await db.commit()
-    await db.refresh(user)
     return user
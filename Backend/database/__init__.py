@@ -4,7 +4,13 @@ from .session import (
     get_engine,
     get_sessionmaker,
     get_db,
+    get_read_db,
+    init_read_engine,
+    get_read_sessionmaker,
     dispose_engine,
+    dispose_read_engine,
+    get_pool_settings,
+    get_pool_stats,
 )
 
 # Backwards-compatible names (no engine/async_session exported)
@@ -13,5 +19,11 @@ __all__ = [
     "get_engine",
     "get_sessionmaker",
     "get_db",
+    "get_read_db",
+    "init_read_engine",
+    "get_read_sessionmaker",
     "dispose_engine",
+    "dispose_read_engine",
+    "get_pool_settings",
+    "get_pool_stats",
 ]
@@ -0,0 +1,155 @@
+"""Query-plan inspection for the statements the crud layer issues.
+
+`StatementRecorder(engine)` captures (label, SQL, parameters) for every statement executed on an engine
+while it is active. `explain_statements()` then runs the dialect's EXPLAIN on each captured SELECT/UPDATE/
+DELETE with its original parameters and returns `QueryPlan`s, which flag full table scans and temporary
+sort b-trees. Scans of BOUNDED_TABLES are shown in the plan but not flagged.
+
+Supported dialects:
+- sqlite: `EXPLAIN QUERY PLAN`; a `SCAN <table>` step without `USING ... INDEX` is a full scan.
+- postgresql: `EXPLAIN (FORMAT JSON)` with `enable_seqscan` off for the transaction, so a `Seq Scan` that
+  survives means no usable index exists (small dev tables would otherwise always plan as seq scans).
+
+Used by `tools/explain_crud.py` (report) and `tests/test_query_plans.py` (plan snapshots).
+"""
+import json
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+# Reference/aggregate tables whose size does not grow with usage; scanning them whole is the intended plan
+BOUNDED_TABLES = frozenset({"application_status", "services", "offices", "dashboard_counters"})
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+@dataclass
+class RecordedStatement:
+    label: str
+    sql: str
+    parameters: Any
+
+
+@dataclass
+class QueryPlan:
+    label: str
+    sql: str
+    lines: List[str]
+    full_scans: List[str] = field(default_factory=list)
+    temp_sorts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.full_scans
+
+
+class StatementRecorder:
+    """Context manager recording statements executed on `engine`; wrap each unit of work in `step(label)`.
+
+    Statements issued outside a step are ignored, and identical SQL within one step is kept once.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self._sync_engine = engine.sync_engine
+        self._label: Optional[str] = None
+        self._seen: set[Tuple[str, str]] = set()
+        self.statements: List[RecordedStatement] = []
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if self._label is None or executemany:
+            return
+        if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+            return
+        key = (self._label, statement)
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        self.statements.append(RecordedStatement(self._label, statement, parameters))
+
+    def __enter__(self) -> "StatementRecorder":
+        event.listen(self._sync_engine, "before_cursor_execute", self._before)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self._sync_engine, "before_cursor_execute", self._before)
+
+    @contextmanager
+    def step(self, label: str) -> Iterator[None]:
+        self._label = label
+        try:
+            yield
+        finally:
+            self._label = None
+
+
+def _sqlite_plan(rows) -> Tuple[List[str], List[str], int]:
+    depth: Dict[int, int] = {0: -1}
+    lines, scans, sorts = [], [], 0
+    for node_id, parent, _unused, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+        match = _SQLITE_FULL_SCAN.match(detail)
+        if match and match.group(1) not in BOUNDED_TABLES:
+            scans.append(match.group(1))
+        if detail.startswith("USE TEMP B-TREE"):
+            sorts += 1
+    return lines, scans, sorts
+
+
+def _postgres_plan(document) -> Tuple[List[str], List[str], int]:
+    if isinstance(document, str):
+        document = json.loads(document)
+    lines, scans, sorts = [], [], 0
+
+    def walk(node, depth):
+        nonlocal sorts
+        kind = node["Node Type"]
+        text = kind
+        if "Relation Name" in node:
+            text += f" on {node['Relation Name']}"
+        if "Index Name" in node:
+            text += f" using {node['Index Name']}"
+        lines.append("  " * depth + text)
+        if kind == "Seq Scan" and node.get("Relation Name") not in BOUNDED_TABLES:
+            scans.append(node.get("Relation Name", "?"))
+        if kind in ("Sort", "Incremental Sort"):
+            sorts += 1
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(document[0]["Plan"], 0)
+    return lines, scans, sorts
+
+
+async def explain_statements(engine: AsyncEngine, statements: List[RecordedStatement]) -> List[QueryPlan]:
+    """EXPLAIN each recorded statement on `engine` (never executes it) and classify the plan."""
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise ValueError(f"EXPLAIN is not supported for dialect {dialect!r}")
+    plans = []
+    async with engine.connect() as conn:
+        for stmt in statements:
+            if dialect == "sqlite":
+                rows = (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + stmt.sql, stmt.parameters)).all()
+                lines, scans, sorts = _sqlite_plan(rows)
+            else:
+                async with conn.begin():
+                    await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                    document = (await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + stmt.sql, stmt.parameters)).scalar()
+                lines, scans, sorts = _postgres_plan(document)
+            plans.append(QueryPlan(stmt.label, stmt.sql, lines, scans, sorts))
+    return plans
+
+
+def plan_snapshot(plans: List[QueryPlan]) -> Dict[str, List[str]]:
+    """{'<label>#<n>': plan lines} with n counting explainable statements within the label, starting at 1."""
+    counts: Dict[str, int] = {}
+    snapshot = {}
+    for plan in plans:
+        counts[plan.label] = counts.get(plan.label, 0) + 1
+        snapshot[f"{plan.label}#{counts[plan.label]}"] = plan.lines
+    return snapshot
@@ -0,0 +1,185 @@
+"""Versioned schema migrations.
+
+Migrations live in `database/migrations/versions/vNNNN_<name>.py`. Each module defines
+
+    VERSION = <int>           # contiguous, starting at 1
+    DESCRIPTION = "<text>"
+    def upgrade(conn): ...    # sync Connection, run inside the migration transaction
+
+Applied versions are recorded in the `schema_version` table together with a fingerprint of the model
+metadata. `ensure_schema(engine)` is what startup calls: when the stored fingerprint matches the running
+code it returns after a single SELECT, without reflection or DDL. Otherwise pending migrations are applied
+in order inside one transaction (serialised across workers with an advisory lock on postgres).
+
+Migrations must be idempotent against a database created from current metadata (tests and fresh installs
+create tables via `create_all`), so use the `*_if_missing` helpers below rather than bare DDL.
+
+CLI (from Backend/):
+    python -m database.migrations status
+    python -m database.migrations upgrade
+"""
+import hashlib
+import importlib
+import logging
+import pkgutil
+from datetime import datetime
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from models.lro_backend_models import Base  # registers every model table on Base.metadata
+
+logger = logging.getLogger(__name__)
+
+# Kept off Base.metadata so it is not part of the fingerprint and never dropped by create_all_tables()
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+# Arbitrary constant key for pg_advisory_xact_lock so concurrent workers migrate one at a time
+_PG_LOCK_KEY = 72_011_001
+
+
+def load_migrations() -> List[ModuleType]:
+    """Import every migration module under versions/ ordered by VERSION."""
+    from . import versions
+
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+        if info.name.startswith("v")
+    ]
+    modules.sort(key=lambda m: m.VERSION)
+    expected = list(range(1, len(modules) + 1))
+    if [m.VERSION for m in modules] != expected:
+        raise RuntimeError(f"Migration versions must be contiguous from 1, found {[m.VERSION for m in modules]}")
+    return modules
+
+
+def head_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].VERSION if migrations else 0
+
+
+def schema_fingerprint() -> str:
+    """Stable hash of the model metadata (tables, columns, indexes, constraints) and the migration head."""
+    parts = [f"head={head_version()}"]
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(f"table {table.name}")
+        for col in table.columns:
+            parts.append(f"  col {col.name} {col.type!r} null={col.nullable} pk={col.primary_key}")
+        for idx in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"  idx {idx.name} {[c.name for c in idx.columns]} unique={idx.unique}")
+        for cons in sorted(table.constraints, key=lambda c: (type(c).__name__, c.name or "")):
+            cols = sorted(getattr(cons, "columns", {}).keys()) if hasattr(cons, "columns") else []
+            parts.append(f"  cons {type(cons).__name__} {cons.name} {cols}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+# ---- helpers for migration modules -------------------------------------------------
+
+def create_tables_if_missing(conn: Connection, *table_names: str) -> None:
+    """Create the named tables (or all model tables when none given) from current metadata if absent."""
+    tables = [Base.metadata.tables[n] for n in table_names] if table_names else None
+    Base.metadata.create_all(conn, tables=tables, checkfirst=True)
+
+
+def add_column_if_missing(conn: Connection, table_name: str, column: Column) -> None:
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    if column.name in existing:
+        return
+    col_type = column.type.compile(dialect=conn.dialect)
+    ddl = f'ALTER TABLE {table_name} ADD COLUMN {column.name} {col_type}'
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.execute(text(ddl))
+
+
+def create_index_if_missing(conn: Connection, index: Index) -> None:
+    existing = {i["name"] for i in inspect(conn).get_indexes(index.table.name)}
+    if index.name not in existing:
+        index.create(conn)
+
+
+def drop_index_if_exists(conn: Connection, table_name: str, index_name: str) -> None:
+    existing = {i["name"] for i in inspect(conn).get_indexes(table_name)}
+    if index_name in existing:
+        conn.execute(text(f"DROP INDEX {index_name}"))
+
+
+# ---- runner ---------------------------------------------------------------------------
+
+def _applied_versions(conn: Connection) -> Dict[int, str]:
+    rows = conn.execute(select(schema_version.c.version, schema_version.c.fingerprint)).all()
+    return {v: fp for v, fp in rows}
+
+
+def _read_state(conn: Connection) -> Optional[Dict[str, Any]]:
+    """Return {'version', 'fingerprint'} for the newest applied migration, or None if untracked."""
+    try:
+        row = conn.execute(
+            select(schema_version.c.version, schema_version.c.fingerprint).order_by(schema_version.c.version.desc()).limit(1)
+        ).first()
+    except Exception:
+        return None
+    if row is None:
+        return None
+    return {"version": row[0], "fingerprint": row[1]}
+
+
+def _upgrade(conn: Connection) -> List[int]:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+    _version_metadata.create_all(conn, checkfirst=True)
+    applied = _applied_versions(conn)
+    fingerprint = schema_fingerprint()
+    ran = []
+    for migration in load_migrations():
+        if migration.VERSION in applied:
+            continue
+        logger.info("Applying schema migration %04d: %s", migration.VERSION, migration.DESCRIPTION)
+        migration.upgrade(conn)
+        conn.execute(schema_version.insert().values(
+            version=migration.VERSION,
+            description=migration.DESCRIPTION,
+            fingerprint=fingerprint,
+            applied_at=datetime.utcnow(),
+        ))
+        ran.append(migration.VERSION)
+    if not ran and applied and applied[max(applied)] != fingerprint:
+        # models changed without a new migration: keep the stored fingerprint so schema_status keeps
+        # reporting the drift (and every start re-checks) until a migration records the new one
+        logger.error("Model metadata changed without a new migration; add one under database/migrations/versions")
+    return ran
+
+
+async def schema_status(engine: AsyncEngine) -> Dict[str, Any]:
+    async with engine.connect() as conn:
+        state = await conn.run_sync(_read_state)
+    fingerprint = schema_fingerprint()
+    return {
+        "head": head_version(),
+        "version": state["version"] if state else None,
+        "fingerprint": fingerprint,
+        "current": bool(state and state["fingerprint"] == fingerprint and state["version"] == head_version()),
+    }
+
+
+async def ensure_schema(engine: AsyncEngine) -> List[int]:
+    """Bring the database up to the migration head. Returns the versions applied ([] on the fast path)."""
+    status = await schema_status(engine)
+    if status["current"]:
+        return []
+    async with engine.begin() as conn:
+        return await conn.run_sync(_upgrade)
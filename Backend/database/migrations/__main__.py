@@ -0,0 +1,27 @@
+"""python -m database.migrations [status|upgrade] — run from Backend/ with DATABASE_URL set."""
+import asyncio
+import json
+import sys
+
+from database.session import init_engine, dispose_engine
+from database.migrations import ensure_schema, schema_status
+
+
+async def _main(command: str) -> int:
+    engine = init_engine()
+    try:
+        if command == "status":
+            print(json.dumps(await schema_status(engine)))
+        elif command == "upgrade":
+            applied = await ensure_schema(engine)
+            print(json.dumps({"applied": applied}))
+        else:
+            print(__doc__)
+            return 2
+    finally:
+        await dispose_engine()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "status")))
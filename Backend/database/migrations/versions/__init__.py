@@ -0,0 +1 @@
+# Ordered schema migrations; see database/migrations/__init__.py for the module contract.
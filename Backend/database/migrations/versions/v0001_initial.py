@@ -0,0 +1,30 @@
+"""Baseline schema: every model table plus the reference rows the application relies on."""
+from sqlalchemy import text
+
+from database.migrations import create_tables_if_missing
+
+VERSION = 1
+DESCRIPTION = "initial schema and reference data"
+
+
+def upgrade(conn):
+    # importing the models package registers every table on Base.metadata
+    import models.lro_backend_models  # noqa: F401
+
+    create_tables_if_missing(conn)
+
+    if conn.execute(text("SELECT COUNT(*) FROM application_status")).scalar() == 0:
+        conn.execute(
+            text("INSERT INTO application_status (status_id, status_name) VALUES (:id, :name)"),
+            [
+                {"id": 1, "name": "Pending"},
+                {"id": 2, "name": "Under Review"},
+                {"id": 3, "name": "Approved"},
+                {"id": 4, "name": "Rejected"},
+            ],
+        )
+    if conn.execute(text("SELECT COUNT(*) FROM services")).scalar() == 0:
+        conn.execute(text(
+            "INSERT INTO services (service_id, service_name, service_code, base_fee) "
+            "VALUES (1, 'Land Transfer', 'LT', 1000.00)"
+        ))
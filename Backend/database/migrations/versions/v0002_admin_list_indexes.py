@@ -0,0 +1,27 @@
+"""Composite (filter, timestamp, id) indexes backing keyset pagination of the admin list endpoints."""
+from database.migrations import create_index_if_missing
+
+VERSION = 2
+DESCRIPTION = "admin list keyset pagination indexes"
+
+_INDEXES = {
+    "applications": (
+        "ix_applications_date_id",
+        "ix_applications_status_date_id",
+        "ix_applications_service_date_id",
+        "ix_applications_officer_date_id",
+    ),
+    "uploaded_documents": (
+        "ix_uploaded_documents_uploaded_at_id",
+        "ix_uploaded_documents_status_uploaded_at_id",
+    ),
+}
+
+
+def upgrade(conn):
+    from models.lro_backend_models import Base
+
+    for table_name, index_names in _INDEXES.items():
+        indexes = {i.name: i for i in Base.metadata.tables[table_name].indexes}
+        for name in index_names:
+            create_index_if_missing(conn, indexes[name])
@@ -0,0 +1,23 @@
+"""Indexes for the crud lookups that were full table scans (found with tools/explain_crud.py)."""
+from database.migrations import create_index_if_missing, drop_index_if_exists
+
+VERSION = 3
+DESCRIPTION = "crud lookup indexes"
+
+_INDEXES = {
+    "applications": ("ix_applications_user_date",),
+    "application_log": ("ix_application_log_application_ts",),
+    "uploaded_documents": ("ix_uploaded_documents_application_id",),
+    "payments": ("ix_payments_application_id",),
+}
+
+
+def upgrade(conn):
+    from models.lro_backend_models import Base
+
+    for table_name, index_names in _INDEXES.items():
+        indexes = {i.name: i for i in Base.metadata.tables[table_name].indexes}
+        for name in index_names:
+            create_index_if_missing(conn, indexes[name])
+    # superseded by ix_applications_user_date, which has user_id as its leading column
+    drop_index_if_exists(conn, "applications", "ix_applications_user_id")
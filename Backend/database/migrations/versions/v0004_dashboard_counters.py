@@ -0,0 +1,13 @@
+"""dashboard_counters table for /api/admin/stats, populated from the existing rows."""
+from database.migrations import create_tables_if_missing
+
+VERSION = 4
+DESCRIPTION = "admin dashboard counters"
+
+
+def upgrade(conn):
+    from crud.stats import rebuild_statements
+
+    create_tables_if_missing(conn, "dashboard_counters")
+    for stmt in rebuild_statements():
+        conn.execute(stmt)
@@ -0,0 +1,12 @@
+"""Index for streaming payment exports in (payment_date, payment_id) order."""
+from database.migrations import create_index_if_missing
+
+VERSION = 5
+DESCRIPTION = "payment export index"
+
+
+def upgrade(conn):
+    from models.lro_backend_models import Base
+
+    indexes = {i.name: i for i in Base.metadata.tables["payments"].indexes}
+    create_index_if_missing(conn, indexes["ix_payments_payment_date_id"])
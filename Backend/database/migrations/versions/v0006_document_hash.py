@@ -0,0 +1,13 @@
+"""SHA-256 and size of each uploaded document."""
+from database.migrations import add_column_if_missing
+
+VERSION = 6
+DESCRIPTION = "uploaded document sha256 and size"
+
+
+def upgrade(conn):
+    from models.lro_backend_models import Base
+
+    table = Base.metadata.tables["uploaded_documents"]
+    add_column_if_missing(conn, "uploaded_documents", table.c.sha256)
+    add_column_if_missing(conn, "uploaded_documents", table.c.size_bytes)
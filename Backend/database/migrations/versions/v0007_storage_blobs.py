@@ -0,0 +1,16 @@
+"""storage_blobs reference counts for content-addressed document storage, populated from existing rows."""
+from database.migrations import create_index_if_missing, create_tables_if_missing
+
+VERSION = 7
+DESCRIPTION = "content-addressed storage blobs"
+
+
+def upgrade(conn):
+    from crud.blobs import rebuild_statements
+    from models.lro_backend_models import Base
+
+    create_tables_if_missing(conn, "storage_blobs")
+    indexes = {i.name: i for i in Base.metadata.tables["uploaded_documents"].indexes}
+    create_index_if_missing(conn, indexes["ix_uploaded_documents_sha256"])
+    for stmt in rebuild_statements():
+        conn.execute(stmt)
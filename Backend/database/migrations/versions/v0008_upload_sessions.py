@@ -0,0 +1,9 @@
+"""upload_sessions table for resumable document uploads."""
+from database.migrations import create_tables_if_missing
+
+VERSION = 8
+DESCRIPTION = "resumable upload sessions"
+
+
+def upgrade(conn):
+    create_tables_if_missing(conn, "upload_sessions")
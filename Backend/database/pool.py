@@ -0,0 +1,102 @@
+"""Connection pool instrumentation.
+
+The engine created by `database.session.init_engine` uses `InstrumentedAsyncQueuePool` whenever the
+dialect would otherwise pick a queue pool (postgres, file-backed sqlite). It behaves exactly like
+SQLAlchemy's `AsyncAdaptedQueuePool` but records how long callers waited for a connection, so workers
+can be sized against the database's `max_connections` from real numbers.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Optional
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+# Upper bounds (milliseconds) of the checkout wait-time histogram buckets. The final bucket is open ended.
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+    """Thread-safe counters for connection checkouts and their wait times."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_ms += elapsed_ms
+            if elapsed_ms > self.wait_max_ms:
+                self.wait_max_ms = elapsed_ms
+            self.buckets[bisect_left(WAIT_BUCKETS_MS, elapsed_ms)] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.buckets)}
+            histogram["gt_%dms" % WAIT_BUCKETS_MS[-1]] = self.buckets[-1]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram": histogram,
+            }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every checkout from the pool queue."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait((time.perf_counter() - started) * 1000.0)
+        return conn
+
+    def recreate(self):
+        # keep accumulated stats when the pool is recreated (e.g. after invalidation)
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+def describe_pool(pool: Optional[Pool]) -> Dict[str, Any]:
+    """Return live occupancy figures and (when instrumented) wait statistics for `pool`."""
+    if pool is None:
+        return {"configured": False}
+    info: Dict[str, Any] = {"configured": True, "class": type(pool).__name__}
+    # size/checkedin/checkedout/overflow only exist on queue pools
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            try:
+                info[name] = fn()
+            except Exception:
+                pass
+    timeout = getattr(pool, "timeout", None)
+    if callable(timeout):
+        info["timeout"] = timeout()
+    stats = getattr(pool, "stats", None)
+    if isinstance(stats, PoolStats):
+        info.update(stats.snapshot())
+    return info
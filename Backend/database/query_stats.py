@@ -0,0 +1,132 @@
+"""Per-request SQL statement accounting.
+
+`install_query_stats(engine)` hooks the engine's cursor events. While a `QueryStats` collector is active
+in the current context (see `capture_queries()` and `api.middleware.QueryStatsMiddleware`), every statement
+executed on that engine is counted and timed against it. Outside a capture the hooks are a single
+ContextVar lookup.
+
+Repeated statements within one capture are the usual N+1 signature: a loop issuing the same SELECT/INSERT
+once per row. `QueryStats.repeated()` reports them; the middleware logs any request where a statement
+repeats DB_N_PLUS_ONE_THRESHOLD times or more.
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """Statements, commits and DB time recorded during one request (or one `capture_queries()` block)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.commits = 0
+        self.total_ms = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def round_trips(self) -> int:
+        return self.count + self.commits
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, most frequent first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Count statements issued in this context (and tasks/greenlets it spawns) until the block exits."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _normalize(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def install_query_stats(engine: AsyncEngine) -> None:
+    """Attach the statement counting hooks to `engine`. Called for every engine built by database.session."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is None:
+            return
+        started = conn.info.get("query_stats_started")
+        if started:
+            stats.total_ms += (time.perf_counter() - started.pop()) * 1000.0
+        stats.count += 1
+        stats.statements[_normalize(statement)] += 1
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_stats_started"):
+            conn.info["query_stats_started"].pop()
+
+    @event.listens_for(sync_engine, "commit")
+    def _commit(conn):
+        stats = _current.get()
+        if stats is not None:
+            stats.commits += 1
+
+
+class QueryMetrics:
+    """Process-wide per-route aggregates of request query counts, exposed by the internal metrics router."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, route: str, stats: QueryStats, n_plus_one: bool = False) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0, "queries": 0, "commits": 0, "db_time_ms": 0.0, "max_queries": 0, "n_plus_one": 0,
+            })
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["commits"] += stats.commits
+            entry["db_time_ms"] += stats.total_ms
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            if n_plus_one:
+                entry["n_plus_one"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for route, entry in self._routes.items():
+                requests = entry["requests"] or 1
+                out[route] = dict(
+                    entry,
+                    db_time_ms=round(entry["db_time_ms"], 3),
+                    avg_queries=round(entry["queries"] / requests, 2),
+                )
+            return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+query_metrics = QueryMetrics()
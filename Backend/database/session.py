@@ -1,7 +1,16 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 import os
+import time
+import logging
 from dotenv import load_dotenv
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from .pool import InstrumentedAsyncQueuePool, describe_pool
+from .sqlite_profile import get_sqlite_settings, install_sqlite_profile
+from .query_stats import install_query_stats
 load_dotenv()
 
 # Default used when no DATABASE_URL provided
@@ -16,12 +25,98 @@ _async_session: Optional[async_sessionmaker] = None
 # Keep a module-level DATABASE_URL that reflects what was used to init the engine
 DATABASE_URL: Optional[str] = None
 
+# Optional read replica (DATABASE_READ_URL). When not configured, read sessions use the primary.
+_read_engine: Optional[AsyncEngine] = None
+_read_session: Optional[async_sessionmaker] = None
+READ_DATABASE_URL: Optional[str] = None
+# Last measured replica lag in seconds (None = replica unreachable) and when it was measured (monotonic)
+_replica_lag: Optional[float] = None
+_replica_lag_checked_at: Optional[float] = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def get_pool_settings() -> Dict[str, Any]:
+    """Read connection pool settings from the environment.
+
+    DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT only apply to queue pools (postgres, file-backed sqlite);
+    DB_POOL_PRE_PING, DB_POOL_RECYCLE (seconds, -1 disables) and DB_POOL_USE_LIFO apply to both.
+    Read at init time (not import time) so tests and launchers can adjust the env first.
+    """
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _env_float('DB_POOL_TIMEOUT', 30.0),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_use_lifo': _env_bool('DB_POOL_USE_LIFO', True),
+    }
 
-def init_engine(database_url: Optional[str] = None, echo: Optional[bool] = None) -> AsyncEngine:
+
+def _engine_pool_kwargs(database_url: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate pool settings into create_async_engine kwargs suitable for the URL's dialect."""
+    kwargs: Dict[str, Any] = {
+        'pool_pre_ping': settings['pool_pre_ping'],
+        'pool_recycle': settings['pool_recycle'],
+    }
+    try:
+        url = make_url(database_url)
+        pool_class = url.get_dialect().get_pool_class(url)
+    except Exception:
+        pool_class = None
+    # in-memory sqlite uses a StaticPool which does not accept sizing arguments
+    if pool_class is not None and issubclass(pool_class, QueuePool):
+        kwargs.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings['pool_size'],
+            max_overflow=settings['max_overflow'],
+            pool_timeout=settings['pool_timeout'],
+            pool_use_lifo=settings['pool_use_lifo'],
+        )
+    return kwargs
+
+
+def _create_engine(database_url: str, echo: bool, pool_settings: Optional[Dict[str, Any]], sqlite_profile: Optional[bool] = None) -> AsyncEngine:
+    settings = get_pool_settings()
+    settings.update(pool_settings or {})
+    engine = create_async_engine(database_url, future=True, echo=echo, **_engine_pool_kwargs(database_url, settings))
+    if engine.dialect.name == 'sqlite':
+        sqlite_settings = get_sqlite_settings()
+        if sqlite_profile is not None:
+            sqlite_settings['enabled'] = sqlite_profile
+        if sqlite_settings['enabled']:
+            install_sqlite_profile(engine, database_url, sqlite_settings)
+    install_query_stats(engine)
+    return engine
+
+
+def init_engine(database_url: Optional[str] = None, echo: Optional[bool] = None, pool_settings: Optional[Dict[str, Any]] = None, sqlite_profile: Optional[bool] = None) -> AsyncEngine:
     """Initialize the async engine and sessionmaker. Safe to call multiple times.
     Should be called on the application's running event loop (startup) to avoid cross-event-loop driver issues.
     If database_url is not provided, will read `DATABASE_URL_ASYNC` from the environment and fall back to a sqlite
     default. This allows tests to set the env var before calling init_engine.
+    `pool_settings` overrides individual keys of `get_pool_settings()`; `sqlite_profile` forces the SQLite
+    performance profile on or off regardless of SQLITE_PERFORMANCE_PROFILE.
+    If `DATABASE_READ_URL` is set, the read replica engine is initialised alongside the primary.
     """
     global _engine, _async_session, DATABASE_URL
     if database_url is None:
@@ -33,11 +128,83 @@ def init_engine(database_url: Optional[str] = None, echo: Optional[bool] = None)
         return None
     DATABASE_URL = database_url
     if _engine is None:
-        _engine = create_async_engine(database_url, future=True, echo=echo)
+        _engine = _create_engine(database_url, echo, pool_settings, sqlite_profile)
         _async_session = async_sessionmaker(bind=_engine, expire_on_commit=False)
+    if _read_engine is None and os.getenv('DATABASE_READ_URL'):
+        init_read_engine(echo=echo, pool_settings=pool_settings, sqlite_profile=sqlite_profile)
     return _engine
 
 
+def init_read_engine(read_database_url: Optional[str] = None, echo: Optional[bool] = None, pool_settings: Optional[Dict[str, Any]] = None, sqlite_profile: Optional[bool] = None) -> Optional[AsyncEngine]:
+    """Initialize the read-replica engine and sessionmaker. Safe to call multiple times.
+    If read_database_url is not provided, reads `DATABASE_READ_URL` from the environment; when neither is set
+    no replica is configured and read sessions fall back to the primary.
+    """
+    global _read_engine, _read_session, READ_DATABASE_URL, _replica_lag, _replica_lag_checked_at
+    if read_database_url is None:
+        read_database_url = os.getenv('DATABASE_READ_URL')
+    if echo is None:
+        echo = DATABASE_ECHO
+    if not read_database_url:
+        return None
+    if _read_engine is None:
+        READ_DATABASE_URL = read_database_url
+        _read_engine = _create_engine(read_database_url, echo, pool_settings, sqlite_profile)
+        _read_session = async_sessionmaker(bind=_read_engine, expire_on_commit=False)
+        _replica_lag = None
+        _replica_lag_checked_at = None
+    return _read_engine
+
+
+def get_replica_settings() -> Dict[str, Any]:
+    """Replica lag tolerance. DB_REPLICA_MAX_LAG_SECONDS < 0 disables the lag check entirely;
+    DB_REPLICA_LAG_CHECK_INTERVAL is how long (seconds) a lag measurement is reused."""
+    return {
+        'max_lag_seconds': _env_float('DB_REPLICA_MAX_LAG_SECONDS', 5.0),
+        'lag_check_interval': _env_float('DB_REPLICA_LAG_CHECK_INTERVAL', 10.0),
+    }
+
+
+async def _measure_replica_lag(engine: AsyncEngine) -> Optional[float]:
+    """Return the replica's replay lag in seconds, or None if it could not be measured.
+    Only postgres exposes replay lag; other dialects (e.g. a sqlite file standing in for a replica) report 0.
+    """
+    try:
+        async with engine.connect() as conn:
+            if engine.dialect.name == 'postgresql':
+                r = await conn.execute(text(
+                    "SELECT CASE WHEN pg_is_in_recovery() "
+                    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+                ))
+                return float(r.scalar() or 0.0)
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+    except Exception as exc:
+        logging.warning("Read replica lag check failed (%s); routing reads to primary", exc)
+        return None
+
+
+async def _replica_usable() -> bool:
+    global _replica_lag, _replica_lag_checked_at
+    settings = get_replica_settings()
+    if settings['max_lag_seconds'] < 0:
+        return True
+    now = time.monotonic()
+    if _replica_lag_checked_at is None or now - _replica_lag_checked_at >= settings['lag_check_interval']:
+        _replica_lag = await _measure_replica_lag(_read_engine)
+        _replica_lag_checked_at = now
+    return _replica_lag is not None and _replica_lag <= settings['max_lag_seconds']
+
+
+async def get_read_sessionmaker() -> async_sessionmaker:
+    """Return the replica sessionmaker when a replica is configured and within lag tolerance, else the primary's."""
+    if _read_session is None and os.getenv('DATABASE_READ_URL'):
+        init_read_engine()
+    if _read_session is not None and await _replica_usable():
+        return _read_session
+    return get_sessionmaker()
+
+
 def get_engine() -> Optional[AsyncEngine]:
     """Return the initialized engine or None if not yet initialized.
     If not initialized, will initialize it from environment variables.
@@ -59,6 +226,26 @@ def get_sessionmaker() -> async_sessionmaker:
     return _async_session
 
 
+def get_pool_stats() -> Dict[str, Any]:
+    """Live pool occupancy (checked out, overflow, ...) and checkout wait-time histogram for the engine."""
+    stats = describe_pool(_engine.pool if _engine is not None else None)
+    if _read_engine is not None:
+        stats['replica'] = describe_pool(_read_engine.pool)
+        stats['replica']['lag_seconds'] = _replica_lag
+    return stats
+
+
+async def dispose_read_engine() -> None:
+    global _read_engine, _read_session, READ_DATABASE_URL, _replica_lag, _replica_lag_checked_at
+    if _read_engine is not None:
+        await _read_engine.dispose()
+        _read_engine = None
+        _read_session = None
+        READ_DATABASE_URL = None
+        _replica_lag = None
+        _replica_lag_checked_at = None
+
+
 async def dispose_engine() -> None:
     global _engine, _async_session, DATABASE_URL
     if _engine is not None:
@@ -66,6 +253,7 @@ async def dispose_engine() -> None:
         _engine = None
         _async_session = None
         DATABASE_URL = None
+    await dispose_read_engine()
 
 
 # FastAPI dependency
@@ -76,3 +264,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         raise RuntimeError("Database not configured")
     async with Session() as session:
         yield session
+
+
+# FastAPI dependency for read-only endpoints: routed to the replica when one is configured and fresh enough
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    Session = await get_read_sessionmaker()
+    if Session is None:
+        raise RuntimeError("Database not configured")
+    async with Session() as session:
+        yield session
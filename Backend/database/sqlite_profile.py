@@ -0,0 +1,75 @@
+"""SQLite performance profile.
+
+District offices run the backend on a single SQLite file. With the default rollback journal every commit
+is fsync-bound and concurrent writers fail fast with "database is locked". The profile applied here
+switches the file to WAL (readers no longer block the writer), relaxes fsync to `synchronous=NORMAL`
+(durable at checkpoints, safe against application crashes), and gives writers a busy timeout to queue
+behind each other instead of erroring.
+
+Enable it with SQLITE_PERFORMANCE_PROFILE=1; the individual pragmas can be tuned with the SQLITE_* vars
+read in `get_sqlite_settings()`.
+"""
+import os
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+def get_sqlite_settings() -> Dict[str, Any]:
+    """Read the SQLite profile settings from the environment (at engine init time, not import time)."""
+    def _int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    return {
+        'enabled': os.getenv('SQLITE_PERFORMANCE_PROFILE', 'false').lower() in ('1', 'true', 'yes'),
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        # bytes of the database file mapped into memory (256 MiB)
+        'mmap_size': _int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        # negative values are KiB rather than pages (64 MiB)
+        'cache_size': _int('SQLITE_CACHE_SIZE', -64 * 1024),
+        'busy_timeout_ms': _int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+    }
+
+
+def is_file_database(database_url: str) -> bool:
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite':
+        return False
+    database = url.database or ''
+    return database not in ('', ':memory:') and not database.startswith('file::memory:')
+
+
+def sqlite_pragmas(settings: Dict[str, Any], file_database: bool = True) -> List[str]:
+    """PRAGMA statements for the profile. journal_mode is skipped for in-memory databases."""
+    pragmas = []
+    if file_database:
+        pragmas.append(f"PRAGMA journal_mode={settings['journal_mode']}")
+    pragmas.extend([
+        f"PRAGMA synchronous={settings['synchronous']}",
+        f"PRAGMA mmap_size={int(settings['mmap_size'])}",
+        f"PRAGMA cache_size={int(settings['cache_size'])}",
+        f"PRAGMA busy_timeout={int(settings['busy_timeout_ms'])}",
+        f"PRAGMA temp_store={settings['temp_store']}",
+    ])
+    return pragmas
+
+
+def install_sqlite_profile(engine: AsyncEngine, database_url: str, settings: Dict[str, Any]) -> None:
+    """Run the profile pragmas on every new DBAPI connection of `engine`."""
+    pragmas = sqlite_pragmas(settings, is_file_database(database_url))
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
@@ -2,19 +2,128 @@
 import dotenv
 dotenv.load_dotenv()
 import os
+import time
+import logging
 import uvicorn
-import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.responses import DefaultJSONResponse
+
 # Import endpoint modules (each exposes `router` object)
-from api.v1.endpoints import user_auth, user_applications, user_payments, user_documents, admin_applications, admin_documents, chat
+from api.v1.endpoints import user_auth, user_applications, user_payments, user_documents, user_uploads, admin_applications, admin_documents, admin_stats, admin_exports, chat
+
+logger = logging.getLogger("main")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Single-pass startup: one engine init, schema check, storage check, then serve.
+
+    Each phase is timed into app.state.startup (also logged) and exposed on /health/ready.
+    A DB that is unreachable at startup is logged and reported by readiness rather than swallowed.
+    """
+    from database.session import init_engine, dispose_engine
+    from api.v1.endpoints.health import readiness, uploads_root
+
+    timings = {}
+    # served by /health/ready without authentication: phase names and timings only, errors go to the log
+    startup = {"timings_ms": timings, "schema": None, "failed": []}
+    app.state.startup = startup
+    started = time.perf_counter()
+
+    def _phase_done(name, phase_started):
+        timings[name] = round((time.perf_counter() - phase_started) * 1000.0, 2)
+
+    # engine: dispose any engine created outside this event loop (e.g. at import or by a test harness)
+    # so pooled connections belong to the serving loop, then initialise exactly once.
+    t = time.perf_counter()
+    await dispose_engine()
+    engine = init_engine()
+    from database import session as _session_mod
+    DATABASE_URL = _session_mod.DATABASE_URL
+    _phase_done("engine", t)
+
+    # schema: respect explicit AUTO_CREATE_DB, default to enabled for sqlite so `py main.py` creates the DB file
+    AUTO_CREATE_ENV = os.getenv('AUTO_CREATE_DB', None)
+    if AUTO_CREATE_ENV is not None:
+        AUTO_CREATE = AUTO_CREATE_ENV in ('1', 'true', 'yes')
+    else:
+        AUTO_CREATE = bool(DATABASE_URL and 'sqlite' in DATABASE_URL)
+
+    t = time.perf_counter()
+    if DATABASE_URL and AUTO_CREATE:
+        # Versioned migrations; returns after one SELECT when the stored schema fingerprint matches
+        from database.migrations import ensure_schema
+        try:
+            applied = await ensure_schema(engine)
+            startup["schema"] = {"applied": applied}
+        except Exception as e:
+            err_text = str(e).lower()
+            if 'permission denied' in err_text or 'must be owner' in err_text or 'insufficient privilege' in err_text or 'insufficientprivilege' in err_text:
+                logger.warning("Skipping automatic DB DDL due to insufficient privileges. Run manual migrations: see Backend/database.md for instructions.")
+                app.state.db_migration_skipped = True
+                startup["schema"] = "skipped: insufficient privileges"
+            else:
+                raise
+    else:
+        startup["schema"] = "auto-create disabled"
+    _phase_done("schema", t)
+
+    # reference: load statuses/services/offices into the process-local cache used by the crud write paths
+    t = time.perf_counter()
+    from crud.reference import preload
+    try:
+        await preload(engine)
+    except Exception as exc:
+        # lookups load lazily on first use; the database check below reports an unreachable DB
+        logger.warning("Reference cache not preloaded: %s", exc)
+    _phase_done("reference", t)
+
+    # storage: make sure the upload root exists so the first upload does not pay for it
+    t = time.perf_counter()
+    try:
+        os.makedirs(uploads_root(), exist_ok=True)
+    except OSError as exc:
+        startup["failed"].append("storage")
+        logger.error("Upload storage root unavailable: %s", exc)
+    _phase_done("storage", t)
+
+    # chat: load the model in a background thread; /api/chat/ answers 503 until it is ready
+    t = time.perf_counter()
+    if os.getenv('CHAT_MODEL_PRELOAD', 'true').lower() in ('1', 'true', 'yes'):
+        from api.v1.endpoints.chat import model_loader
+        model_loader.start()
+    _phase_done("chat", t)
+
+    # readiness: one DB round-trip, result primes the /health/ready cache
+    t = time.perf_counter()
+    readiness.invalidate()
+    db_check = (await readiness.get())["checks"]["database"]
+    if not db_check["ok"]:
+        startup["failed"].append("database")
+        logger.error("Database check failed at startup: %s", db_check["error"])
+    _phase_done("db_check", t)
+
+    timings["total"] = round((time.perf_counter() - started) * 1000.0, 2)
+    logger.info("startup complete %s", " ".join(f"{k}={v}ms" for k, v in timings.items()))
+
+    yield
+
+    # Dispose engine cleanly
+    await dispose_engine()
+    from tools.storage import close_storage
+    await close_storage()
+
 
 # Make sure PYTHONPATH includes backend; or run from project root so imports resolve.
 app = FastAPI(
     title="Digital Land Registry Hub", 
     version="0.1.0", 
-    description="Backend API for Digital Land Registry Hub")
+    description="Backend API for Digital Land Registry Hub",
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan)
 
 # CORS configuration (adjust for production)
 app.add_middleware(
@@ -23,118 +132,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Per-request SQL statement counts (X-DB-Query-Count headers and /api/internal/metrics/queries)
+from api.middleware import BodySizeLimitMiddleware, CompressionMiddleware, QueryStatsMiddleware
+app.add_middleware(QueryStatsMiddleware)
+# refuse oversized document uploads from Content-Length (or while streaming) before they are spooled
+from api.v1.endpoints.user_documents import MULTIPART_OVERHEAD_BYTES, UPLOAD_MAX_BYTES
+app.add_middleware(BodySizeLimitMiddleware, limits={
+    "/api/user/documents/upload": UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES,
+    # resumable upload chunks are raw bytes
+    "/api/user/documents/uploads": UPLOAD_MAX_BYTES,
+})
+# gzip/brotli for JSON/NDJSON/CSV bodies above COMPRESSION_MIN_SIZE (added last, so it wraps the others)
+app.add_middleware(CompressionMiddleware)
+
 # include routers (each name here is an APIRouter exported by api.v1.endpoints)
 app.include_router(user_auth, prefix="/api")
 app.include_router(user_applications, prefix="/api")
 app.include_router(user_payments, prefix="/api")
 app.include_router(user_documents, prefix="/api")
+app.include_router(user_uploads, prefix="/api")
 
 app.include_router(admin_applications, prefix="/api")
 app.include_router(admin_documents, prefix="/api")
+app.include_router(admin_stats, prefix="/api")
+app.include_router(admin_exports, prefix="/api")
 app.include_router(chat, prefix="/api")
 
 # mount internal static serving router
 from api.v1.endpoints.internal_static import router as internal_static_router
 app.include_router(internal_static_router, prefix="/api")
+from api.v1.endpoints.internal_metrics import router as internal_metrics_router
+app.include_router(internal_metrics_router, prefix="/api")
 
+# liveness/readiness probes (unprefixed so orchestrators can probe /health/live and /health/ready)
+from api.v1.endpoints.health import router as health_router
+app.include_router(health_router)
 
-# Optional startup event
-@app.on_event("startup")
-async def startup():
-    # Initialize DB engine/sessionmaker early so DATABASE_URL is populated from env or defaults.
-    from database.session import init_engine, dispose_engine, get_engine, DATABASE_URL as _DB_URL
-    import logging
-
-    # Ensure engine is initialized on the running event loop. This sets database.session.DATABASE_URL
-    try:
-        await dispose_engine()
-    except Exception:
-        pass
-    # Initialize engine (reads DATABASE_URL_ASYNC or falls back to sqlite default)
-    try:
-        init_engine()
-    except Exception:
-        # If engine init fails, continue to DDL attempt below which may surface clearer errors
-        logging.exception("init_engine failed during startup")
-
-    # Re-fetch DATABASE_URL after init
-    try:
-        from database import session as _session_mod
-        DATABASE_URL = _session_mod.DATABASE_URL
-    except Exception:
-        DATABASE_URL = None
-
-    # Determine whether to auto-create tables. Respect explicit AUTO_CREATE_DB env, but
-    # default to enabled for local sqlite when no explicit env var is set so running `py main.py`
-    # creates the DB file and tables for developer convenience.
-    AUTO_CREATE_ENV = os.getenv('AUTO_CREATE_DB', None)
-    if AUTO_CREATE_ENV is not None:
-        AUTO_CREATE = AUTO_CREATE_ENV in ('1', 'true', 'yes')
-    else:
-        # If no explicit env, enable auto-create for sqlite URLs
-        AUTO_CREATE = bool(DATABASE_URL and 'sqlite' in DATABASE_URL)
-
-    if DATABASE_URL and AUTO_CREATE:
-        from models.lro_backend_models import create_all_tables_via_url
-        last_exc = None
-        for attempt in range(3):
-            try:
-                await create_all_tables_via_url(DATABASE_URL)
-                last_exc = None
-                break
-            except Exception as e:
-                err_text = str(e).lower()
-                if 'permission denied' in err_text or 'must be owner' in err_text or 'insufficient privilege' in err_text or 'insufficientprivilege' in err_text:
-                    logging.warning("Skipping automatic DB DDL due to insufficient privileges. Run manual migrations: see Backend/database.md for instructions.")
-                    try:
-                        app.state.db_migration_skipped = True
-                    except Exception:
-                        pass
-                    last_exc = None
-                    break
-                last_exc = e
-                await asyncio.sleep(0.5)
-        if last_exc is not None:
-            raise last_exc
-
-    # Initialize DB engine/sessionmaker on the running event loop to avoid cross-event-loop driver issues
-    try:
-        # Dispose any existing engine first to ensure we don't reuse connections that may be in a bad state
-        try:
-            await dispose_engine()
-        except Exception:
-            pass
-        init_engine()
-
-        # Health-check the new engine; if a connection is in an aborted state, dispose and retry once
-        engine = get_engine()
-        if engine is not None:
-            try:
-                from sqlalchemy import text as sa_text
-                async with engine.connect() as conn:
-                    await conn.execute(sa_text("SELECT 1"))
-            except Exception as exc:
-                logging.warning("DB health check failed after engine init (%s). Disposing and retrying init.", exc)
-                try:
-                    await dispose_engine()
-                except Exception:
-                    pass
-                # retry init once
-                init_engine()
-    except Exception:
-        pass
-
-
-@app.on_event("shutdown")
-async def shutdown():
-    # Dispose engine cleanly
-    from database.session import dispose_engine
-    try:
-        await dispose_engine()
-    except Exception:
-        pass
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -18,7 +18,14 @@ class Application(Base):
     __tablename__ = "applications"
     __table_args__ = (
         UniqueConstraint("reference_number", name="uq_applications_reference_number"),
-        Index("ix_applications_user_id", "user_id"),
+        # user dashboard: WHERE user_id = ? ORDER BY application_date DESC (replaces ix_applications_user_id)
+        Index("ix_applications_user_date", "user_id", "application_date"),
+        # keyset pagination for the admin list: every page is a range scan on (application_date, application_id),
+        # optionally behind one equality filter
+        Index("ix_applications_date_id", "application_date", "application_id"),
+        Index("ix_applications_status_date_id", "status_id", "application_date", "application_id"),
+        Index("ix_applications_service_date_id", "service_id", "application_date", "application_id"),
+        Index("ix_applications_officer_date_id", "assigned_officer_id", "application_date", "application_id"),
     )
 
     application_id = Column("application_id", Integer, primary_key=True)
@@ -51,6 +58,9 @@ class Application(Base):
 
 class ApplicationLog(Base):
     __tablename__ = "application_log"
+    __table_args__ = (
+        Index("ix_application_log_application_ts", "application_id", "timestamp"),
+    )
     log_id = Column("log_id", Integer, primary_key=True)
     application_id = Column("application_id", Integer, ForeignKey("applications.application_id", ondelete="CASCADE"), nullable=False)
     officer_id = Column("officer_id", Integer, ForeignKey("lro_officers.officer_id", ondelete="SET NULL"), nullable=True)
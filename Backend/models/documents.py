@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, String, Text
+from sqlalchemy import Column, Integer, BigInteger, DateTime, String, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy import ForeignKey
 from sqlalchemy import Enum as SAEnum
@@ -9,6 +9,14 @@ from .enums import VerificationStatusEnum
 
 class UploadedDocuments(Base):
     __tablename__ = "uploaded_documents"
+    __table_args__ = (
+        # keyset pagination for the admin document list, unfiltered and by verification status
+        Index("ix_uploaded_documents_uploaded_at_id", "uploaded_at", "document_id"),
+        Index("ix_uploaded_documents_status_uploaded_at_id", "verification_status", "uploaded_at", "document_id"),
+        Index("ix_uploaded_documents_application_id", "application_id"),
+        # reference-count rebuilds group by content hash
+        Index("ix_uploaded_documents_sha256", "sha256"),
+    )
     document_id = Column("document_id", Integer, primary_key=True)
     application_id = Column("application_id", Integer, ForeignKey("applications.application_id", ondelete="CASCADE"), nullable=False)
     document_type = Column("document_type", String(128), nullable=False)
@@ -16,8 +24,62 @@ class UploadedDocuments(Base):
     file_path = Column("file_path", String(1024), nullable=False)
     verification_status = Column("verification_status", SAEnum(VerificationStatusEnum, name="verification_status_enum", native_enum=True, values_callable=lambda enum: [e.value for e in enum]), nullable=False, server_default=VerificationStatusEnum.PENDING.value)
     uploaded_at = Column("uploaded_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # hex SHA-256 and byte size of the stored file, computed while it was streamed in; NULL for rows from
+    # before they were recorded
+    sha256 = Column("sha256", String(64), nullable=True)
+    size_bytes = Column("size_bytes", BigInteger, nullable=True)
 
     application = relationship("Application", back_populates="uploaded_documents")
 
     def __repr__(self) -> str:
         return f"<UploadedDocument {self.document_id} {self.file_name}>"
+
+
+class StorageBlob(Base):
+    """One content-addressed file in document storage and how many UploadedDocuments rows point at it.
+
+    Maintained by crud.blobs in the same transaction as the document insert/delete; rebuilt from
+    uploaded_documents by `python scripts/gc_storage.py` before unreferenced blobs are removed.
+    """
+    __tablename__ = "storage_blobs"
+    sha256 = Column("sha256", String(64), primary_key=True)
+    size_bytes = Column("size_bytes", BigInteger, nullable=True)
+    ref_count = Column("ref_count", Integer, nullable=False, server_default="0")
+    created_at = Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<StorageBlob {self.sha256[:12]} refs={self.ref_count}>"
+
+
+class UploadSession(Base):
+    """A resumable upload in progress (see crud/upload_sessions.py and api/v1/endpoints/user_uploads.py).
+
+    The bytes received so far live in uploaded_documents/.staging/<upload_id>; `offset` is how many of them
+    are durable. A PATCH or finalize first claims the session with `lease_token`, so only one request at a
+    time, in any worker, writes to the staging file. `document_id` is set when finalize creates the
+    document row.
+    """
+    __tablename__ = "upload_sessions"
+    __table_args__ = (
+        # expiry sweep
+        Index("ix_upload_sessions_expires_at", "expires_at"),
+    )
+    upload_id = Column("upload_id", String(32), primary_key=True)
+    user_id = Column("user_id", Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    application_id = Column("application_id", Integer, ForeignKey("applications.application_id", ondelete="CASCADE"), nullable=False)
+    document_type = Column("document_type", String(128), nullable=False)
+    file_name = Column("file_name", String(512), nullable=False)
+    content_type = Column("content_type", String(255), nullable=True)
+    size = Column("size", BigInteger, nullable=False)
+    # "offset" is a reserved word in SQL
+    offset = Column("upload_offset", BigInteger, nullable=False, server_default="0")
+    # checksum the client expects, verified at finalize
+    sha256 = Column("sha256", String(64), nullable=True)
+    lease_token = Column("lease_token", String(32), nullable=True)
+    lease_expires_at = Column("lease_expires_at", DateTime(timezone=True), nullable=True)
+    created_at = Column("created_at", DateTime(timezone=True), nullable=False)
+    expires_at = Column("expires_at", DateTime(timezone=True), nullable=False)
+    document_id = Column("document_id", Integer, ForeignKey("uploaded_documents.document_id", ondelete="SET NULL"), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<UploadSession {self.upload_id} {self.offset}/{self.size}>"
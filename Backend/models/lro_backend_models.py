@@ -39,12 +39,16 @@ from models.base import Base
 # Import domain modules so their models are registered on Base
 from . import users  # registers User
 from . import payments  # registers Payments
-from . import documents  # registers UploadedDocuments
+from . import documents  # registers UploadedDocuments, StorageBlob, UploadSession
+from . import stats  # registers DashboardCounter
 
 # Compatibility aliases for code that still imports from models.lro_backend_models
 User = users.User
 Payments = payments.Payments
 UploadedDocuments = documents.UploadedDocuments
+StorageBlob = documents.StorageBlob
+UploadSession = documents.UploadSession
+DashboardCounter = stats.DashboardCounter
 
 # Compatibility aliases for classes moved to models.applications
 ApplicationStatus = None
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Numeric, DateTime, String
+from sqlalchemy import Column, Integer, Numeric, DateTime, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy import ForeignKey
 from sqlalchemy import Enum as SAEnum
@@ -9,6 +9,11 @@ from .enums import PaymentStatusEnum
 
 class Payments(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_application_id", "application_id"),
+        # exports stream payments ordered by (payment_date, payment_id)
+        Index("ix_payments_payment_date_id", "payment_date", "payment_id"),
+    )
     payment_id = Column("payment_id", Integer, primary_key=True)
     application_id = Column("application_id", Integer, ForeignKey("applications.application_id", ondelete="CASCADE"), nullable=False)
     amount = Column("amount", Numeric(12, 2), nullable=False)
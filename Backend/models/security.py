@@ -1,6 +1,36 @@
+"""Password hashing.
+
+bcrypt costs ~2^BCRYPT_ROUNDS iterations (about 250 ms at the default 12), so async code must not call
+`hash_password`/`verify_password` directly: use `hash_password_async`/`verify_password_async`. They run the
+hash on a dedicated bounded thread pool (the bcrypt extension releases the GIL, so threads hash in
+parallel and the event loop keeps serving other requests). At most PASSWORD_HASH_WORKERS hashes run at
+once and at most PASSWORD_HASH_MAX_QUEUE wait behind them; beyond that `PasswordHasherBusy` is raised so
+a registration burst is shed instead of queueing without bound. `password_hasher.stats()` reports queue
+depth, rejections and wait/run times.
+
+Lower BCRYPT_ROUNDS only for tests and local development; existing hashes carry their own cost and
+keep verifying after it changes.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+BCRYPT_ROUNDS = _env_int("BCRYPT_ROUNDS", 12)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 
 def hash_password(plain: str) -> str:
@@ -9,3 +39,95 @@ def hash_password(plain: str) -> str:
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing pool and its queue are full."""
+
+
+class PasswordHasher:
+    """Bounded thread pool for password hashing with queueing metrics."""
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.workers = workers or _env_int("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+        self.max_queue = _env_int("PASSWORD_HASH_MAX_QUEUE", 64) if max_queue is None else max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.run_ms_total = 0.0
+        self.run_ms_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy("password hashing queue is full")
+            self.pending += 1
+            self.submitted += 1
+        submitted_at = time.perf_counter()
+
+        def _job():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                wait_ms = (started - submitted_at) * 1000.0
+                run_ms = (time.perf_counter() - started) * 1000.0
+                with self._lock:
+                    self.completed += 1
+                    self.wait_ms_total += wait_ms
+                    self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+                    self.run_ms_total += run_ms
+                    self.run_ms_max = max(self.run_ms_max, run_ms)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), _job)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+                "in_flight": min(self.pending, self.workers),
+                "queued": max(0, self.pending - self.workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_ms_avg": round(self.wait_ms_total / done, 2),
+                "wait_ms_max": round(self.wait_ms_max, 2),
+                "run_ms_avg": round(self.run_ms_total / done, 2),
+                "run_ms_max": round(self.run_ms_max, 2),
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+async def hash_password_async(plain: str) -> str:
+    return await password_hasher.run(hash_password, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_hasher.run(verify_password, plain, hashed)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String
+
+from .base import Base
+
+
+class DashboardCounter(Base):
+    """Pre-aggregated row counts for the admin dashboard, one row per (dimension, bucket).
+
+    Maintained by crud.stats in the same transaction as the writes it counts; rebuild with
+    `python scripts/rebuild_dashboard_counters.py` if it ever drifts.
+    """
+    __tablename__ = "dashboard_counters"
+    dimension = Column("dimension", String(32), primary_key=True)
+    bucket = Column("bucket", String(64), primary_key=True)
+    value = Column("value", Integer, nullable=False, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"<DashboardCounter {self.dimension}/{self.bucket}={self.value}>"
@@ -1,6 +1,6 @@
 # backend/schemas/admin_schemas.py
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from .common import VerificationStatusEnum
 
@@ -34,6 +34,7 @@ class DocumentAdminResponse(BaseModel):
     file_path: str
     verification_status: VerificationStatusEnum
     uploaded_at: datetime
+    download_url: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -48,3 +49,26 @@ class ApplicationLogResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+class StatusCount(BaseModel):
+    status_id: int
+    status_name: Optional[str]
+    count: int
+
+class ServiceCount(BaseModel):
+    service_id: int
+    service_name: Optional[str]
+    count: int
+
+class OfficeCount(BaseModel):
+    office_id: Optional[int]  # None: applications not yet assigned to an officer with an office
+    office_name: Optional[str]
+    count: int
+
+class DashboardStatsResponse(BaseModel):
+    applications_total: int
+    by_status: List[StatusCount]
+    by_service: List[ServiceCount]
+    by_office: List[OfficeCount]
+    documents_by_verification_status: Dict[str, int]
+    pending_document_verifications: int
@@ -107,8 +107,36 @@ class DocumentResponse(BaseModel):
     file_path: str
     verification_status: VerificationStatusEnum
     uploaded_at: datetime
+    sha256: Optional[str] = None
+    size_bytes: Optional[int] = None
     download_url: Optional[str] = None
 
+class UploadSessionCreateRequest(BaseModel):
+    application_id: int
+    document_type: str
+    file_name: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., gt=0, description="total bytes that will be uploaded")
+    content_type: Optional[str] = None
+    sha256: Optional[str] = Field(None, pattern="^[0-9a-fA-F]{64}$", description="verified at finalize when given")
+
+    @validator("file_name")
+    def _plain_file_name(cls, v):
+        if "/" in v or "\\" in v or v in (".", ".."):
+            raise ValueError("file_name must not contain path separators")
+        return v
+
+class UploadSessionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    upload_id: str
+    application_id: int
+    document_type: str
+    file_name: str
+    size: int
+    offset: int
+    expires_at: datetime
+    document_id: Optional[int] = None
+
 # ---- Payments ----
 class PaymentCreateRequest(BaseModel):
     application_id: int
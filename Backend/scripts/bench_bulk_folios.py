@@ -0,0 +1,76 @@
+"""Benchmark folio insertion: per-row ORM adds versus crud.applications.bulk_insert_folios.
+
+Usage (from Backend/):
+    python scripts/bench_bulk_folios.py [--repeat 20]
+
+For 1, 50 and 500 folios per request, reports the mean time and SQL statements per request for the
+previous per-row `db.add()` loop and for the executemany bulk path.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.session import init_engine, dispose_engine, get_sessionmaker  # noqa: E402
+from database.query_stats import capture_queries  # noqa: E402
+from models.lro_backend_models import AppSearchLandRegisters, SearchRegisterFolios, create_all_tables_via_url  # noqa: E402
+from crud.applications import bulk_insert_folios  # noqa: E402
+
+
+# application_id is unique per register row; the benchmark does not need real applications
+_application_ids = itertools.count(1)
+
+
+async def _per_row(db, register_id, folios):
+    for f in folios:
+        db.add(SearchRegisterFolios(search_register_id=register_id, register_name=f.get('division'), volume_number=f.get('volNo'), folio_number=f.get('folioNo')))
+    await db.flush()
+
+
+async def _bulk(db, register_id, folios):
+    await bulk_insert_folios(db, register_id, folios, 'volNo', 'folioNo')
+
+
+async def _measure(fn, n_folios: int, repeat: int):
+    Session = get_sessionmaker()
+    folios = [{'division': 'D', 'volNo': str(i), 'folioNo': str(i)} for i in range(n_folios)]
+    elapsed = 0.0
+    statements = 0
+    for _ in range(repeat):
+        async with Session() as db:
+            register = AppSearchLandRegisters(application_id=next(_application_ids))
+            db.add(register)
+            await db.flush()
+            started = time.perf_counter()
+            with capture_queries() as stats:
+                await fn(db, register.search_register_id, folios)
+                await db.commit()
+            elapsed += time.perf_counter() - started
+            statements += stats.count
+    return elapsed / repeat * 1000.0, statements / repeat
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.sqlite3')}"
+        await create_all_tables_via_url(url)
+        await dispose_engine()
+        init_engine(url)
+        print(f"{'folios':>6}  {'per-row ms':>10}  {'stmts':>5}  {'bulk ms':>8}  {'stmts':>5}")
+        for n in (1, 50, 500):
+            row_ms, row_stmts = await _measure(_per_row, n, args.repeat)
+            bulk_ms, bulk_stmts = await _measure(_bulk, n, args.repeat)
+            print(f"{n:>6}  {row_ms:>10.2f}  {row_stmts:>5.0f}  {bulk_ms:>8.2f}  {bulk_stmts:>5.0f}")
+        await dispose_engine()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
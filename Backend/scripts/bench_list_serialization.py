@@ -0,0 +1,105 @@
+"""Benchmark serialising a large admin application list: stdlib json vs orjson, and bytes on the wire.
+
+Usage (from Backend/):
+    python scripts/bench_list_serialization.py [--rows 10000] [--repeat 5]
+
+Seeds `rows` applications into a fresh SQLite file, loads them with crud.admin_applications.
+list_all_applications, and then times, in CPU ms per response:
+- Pydantic validation against List[ApplicationReviewResponse] (same in both cases, reported on its own);
+- rendering with Starlette's JSONResponse encoder (before) and with ORJSONResponse (after);
+- gzip and brotli at the CompressionMiddleware defaults, with the compressed size.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+
+from crud.admin_applications import list_all_applications  # noqa: E402
+from database.migrations import ensure_schema  # noqa: E402
+from database.session import _create_engine  # noqa: E402
+from models.lro_backend_models import Application, User  # noqa: E402
+from schemas.admin_schemas import ApplicationReviewResponse  # noqa: E402
+
+
+def _cpu_ms(fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.process_time()
+        result = fn()
+        elapsed = (time.process_time() - started) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+async def _load(rows: int):
+    tmp = tempfile.TemporaryDirectory()
+    engine = _create_engine(f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'bench.sqlite3')}", False, None)
+    await ensure_schema(engine)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as db:
+        user = User(full_name='Bench User', nic_number='BENCH0001V', email='bench@example.com', password_hash='x')
+        db.add(user)
+        await db.flush()
+        base = datetime(2024, 1, 1)
+        await db.execute(insert(Application), [
+            {"user_id": user.user_id, "service_id": 1, "status_id": 1 + i % 4,
+             "reference_number": f"LT-BENCH-{i:06d}", "application_date": base + timedelta(minutes=i)}
+            for i in range(rows)
+        ])
+        await db.commit()
+        data = await list_all_applications(db)
+    await engine.dispose()
+    tmp.cleanup()
+    return data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from api.middleware import CompressionMiddleware
+    from api.middleware import brotli
+
+    rows = asyncio.run(_load(args.rows))
+    adapter = TypeAdapter(List[ApplicationReviewResponse])
+    validate_ms, content = _cpu_ms(lambda: adapter.dump_python(adapter.validate_python(rows), mode="json"), args.repeat)
+    std_ms, std_body = _cpu_ms(lambda: JSONResponse(content).body, args.repeat)
+    orj_ms, orj_body = _cpu_ms(lambda: ORJSONResponse(content).body, args.repeat)
+    assert json.loads(std_body) == json.loads(orj_body)
+
+    settings = CompressionMiddleware(app=None)
+    print(f"{len(rows)} applications")
+    print(f"  {'pydantic validate+dump':<32}{validate_ms:8.1f} ms  (unchanged)")
+    print(f"  {'JSONResponse render (before)':<32}{std_ms:8.1f} ms  {len(std_body):>10,d} bytes")
+    print(f"  {'ORJSONResponse render (after)':<32}{orj_ms:8.1f} ms  {len(orj_body):>10,d} bytes  ({std_ms / max(orj_ms, 0.001):.1f}x faster)")
+
+    def _gzip():
+        c = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 31)
+        return c.compress(orj_body) + c.flush()
+
+    gz_ms, gz_body = _cpu_ms(_gzip, args.repeat)
+    print(f"  {'gzip level ' + str(settings.gzip_level):<32}{gz_ms:8.1f} ms  {len(gz_body):>10,d} bytes  ({len(gz_body) / len(orj_body):.1%} of identity)")
+    if brotli is not None:
+        br_ms, br_body = _cpu_ms(lambda: brotli.compress(orj_body, quality=settings.brotli_quality), args.repeat)
+        print(f"  {'brotli quality ' + str(settings.brotli_quality):<32}{br_ms:8.1f} ms  {len(br_body):>10,d} bytes  ({len(br_body) / len(orj_body):.1%} of identity)")
+    else:
+        print(f"  {'brotli':<32}not installed (pip install brotli)")
+
+
+if __name__ == '__main__':
+    main()
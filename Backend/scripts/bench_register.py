@@ -0,0 +1,112 @@
+"""Benchmark POST /api/user/auth/register throughput and event-loop responsiveness.
+
+Usage (from Backend/):
+    python scripts/bench_register.py [--users 64] [--concurrency 16] [--rounds 12] [--workers 4]
+
+Runs the app in-process (httpx ASGITransport) against a fresh SQLite file twice: once hashing inline on
+the event loop (the old behaviour) and once on the bounded hashing pool. While registrations run, a probe
+task requests /health/live every 20 ms; its p50/max latency shows how long the loop was blocked.
+Registrations shed with 503 (pool queue full) are reported separately.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+async def _run(pooled: bool, users: int, concurrency: int) -> dict:
+    import httpx
+
+    from crud import users as crud_users
+    from database.session import dispose_engine
+    from main import app
+    from models import security
+
+    original = crud_users.hash_password_async
+    if not pooled:
+        async def inline(plain):
+            return security.hash_password(plain)
+        crud_users.hash_password_async = inline
+
+    latencies = []
+    statuses = {}
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                stop = asyncio.Event()
+
+                async def probe():
+                    while not stop.is_set():
+                        # time from when the probe is due until its response arrives, so a blocked loop counts
+                        due = time.perf_counter() + 0.02
+                        await asyncio.sleep(0.02)
+                        await client.get("/health/live")
+                        latencies.append((time.perf_counter() - due) * 1000.0)
+
+                queue = list(range(users))
+
+                async def worker():
+                    while queue:
+                        queue.pop()
+                        suffix = uuid.uuid4().hex[:10]
+                        resp = await client.post("/api/user/auth/register", json={
+                            "full_name": "Bench User", "nic_number": f"B{suffix}V",
+                            "email": f"bench+{suffix}@example.com", "password": "bench-password",
+                        })
+                        statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+                probe_task = asyncio.create_task(probe())
+                started = time.perf_counter()
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+                elapsed = time.perf_counter() - started
+                stop.set()
+                await probe_task
+    finally:
+        crud_users.hash_password_async = original
+        await dispose_engine()
+    created = statuses.get(201, 0)
+    return {
+        "pooled": pooled, "created": created, "shed": statuses.get(503, 0), "statuses": statuses,
+        "seconds": elapsed, "per_sec": created / elapsed,
+        "probe_p50": statistics.median(latencies) if latencies else 0.0,
+        "probe_max": max(latencies) if latencies else 0.0,
+        "hasher": security.password_hasher.stats() if pooled else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=12, help='BCRYPT_ROUNDS for the run')
+    parser.add_argument('--workers', type=int, default=4, help='PASSWORD_HASH_WORKERS for the run')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'bench.sqlite3')}"
+    os.environ['BCRYPT_ROUNDS'] = str(args.rounds)
+    os.environ['PASSWORD_HASH_WORKERS'] = str(args.workers)
+    os.environ.setdefault('CHAT_MODEL_PRELOAD', 'false')
+    # every registration comes from one client address; measure hashing, not the auth rate limiter
+    os.environ['AUTH_RATE_LIMIT_ENABLED'] = 'false'
+    try:
+        for pooled in (False, True):
+            r = await _run(pooled, args.users, args.concurrency)
+            print(f"hashing={'pool  ' if r['pooled'] else 'inline'}  created={r['created']:4d}  shed={r['shed']:3d}  "
+                  f"{r['seconds']:.2f}s  {r['per_sec']:.1f} registrations/sec  "
+                  f"live probe p50={r['probe_p50']:.1f}ms max={r['probe_max']:.1f}ms")
+            if r['hasher']:
+                print(f"  pool: {r['hasher']}")
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
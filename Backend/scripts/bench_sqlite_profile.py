@@ -0,0 +1,73 @@
+"""Benchmark crud.applications.create_application writes/sec with the SQLite profile on and off.
+
+Usage (from Backend/):
+    python scripts/bench_sqlite_profile.py [--writes 400] [--concurrency 8]
+
+Each run uses a fresh temporary database file. `concurrency` tasks share the engine's pool and insert
+applications in parallel, which is what surfaces "database is locked" without the profile's busy timeout.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.session import init_engine, dispose_engine, get_sessionmaker  # noqa: E402
+from models.lro_backend_models import create_all_tables_via_url  # noqa: E402
+from models.seed_data import seed_initial_data  # noqa: E402
+from models.users import User  # noqa: E402
+from crud.applications import create_application  # noqa: E402
+
+
+async def _run(profile: bool, writes: int, concurrency: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.sqlite3')}"
+        await create_all_tables_via_url(url)
+        await dispose_engine()
+        init_engine(url, sqlite_profile=profile, pool_settings={'pool_size': concurrency, 'max_overflow': 0})
+        Session = get_sessionmaker()
+        async with Session() as session:
+            await seed_initial_data(session)
+            user = User(full_name='Bench', nic_number=uuid.uuid4().hex[:12], email=f"{uuid.uuid4().hex}@bench", password_hash='x')
+            session.add(user)
+            await session.commit()
+            user_id = user.user_id
+
+        errors = 0
+        per_task = writes // concurrency
+
+        async def worker():
+            nonlocal errors
+            async with Session() as session:
+                for _ in range(per_task):
+                    try:
+                        await create_application(session, user_id, 1, None)
+                    except Exception:
+                        errors += 1
+                        await session.rollback()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        await dispose_engine()
+        done = per_task * concurrency - errors
+        return {'profile': profile, 'writes': done, 'errors': errors, 'seconds': elapsed, 'writes_per_sec': done / elapsed}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writes', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+    for profile in (False, True):
+        r = await _run(profile, args.writes, args.concurrency)
+        print(f"profile={'on ' if r['profile'] else 'off'}  writes={r['writes']:5d}  errors={r['errors']:3d}  "
+              f"{r['seconds']:.2f}s  {r['writes_per_sec']:.1f} writes/sec")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""Remove stored documents and blobs that no UploadedDocuments row references.
+
+Usage (from Backend/, where uploaded_documents/ lives):
+    python scripts/gc_storage.py --dry-run     # list what would be removed (expired sessions excepted)
+    python scripts/gc_storage.py --grace 3600  # remove; keep anything changed in the last hour
+
+Expired resumable upload sessions are deleted first, with their staging files, along with staging files
+whose session row is gone. Blob reference counts are then rebuilt from uploaded_documents in one transaction, so rows removed by
+ON DELETE CASCADE or manual SQL are accounted for. Then object keys that no row's file_path names are
+removed, followed by blobs with no references and no remaining key links, and finally temporary files
+left by interrupted uploads. The grace period protects uploads whose rows have not been committed yet.
+
+Key and blob collection applies to the local backend only, and the counts are rebuilt only while
+STORAGE_CONTENT_ADDRESSED is on (blobs stored before it was turned off are still collected once their
+count drops to zero). With STORAGE_BACKEND=s3 only the upload sessions and their (always local) staging
+files are cleaned up; S3 objects are not content-addressed, so there are no shared blobs to count, and
+leftover objects are best removed with a bucket lifecycle rule.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from crud import upload_sessions  # noqa: E402
+from crud.blobs import forget, rebuild_refcounts, referenced_blobs  # noqa: E402
+from database.session import dispose_engine, get_sessionmaker, init_engine  # noqa: E402
+from models.lro_backend_models import UploadedDocuments  # noqa: E402
+from tools.minio_storage import collect_garbage, discard_staging, iter_blobs, iter_staging  # noqa: E402
+from tools.storage import LocalStorage, get_storage  # noqa: E402
+
+
+async def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--grace', type=float, default=3600.0, help='seconds; newer files are kept (default 3600)')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    init_engine()
+    try:
+        async with get_sessionmaker()() as db:
+            sessions = []
+            if not args.dry_run:
+                while True:
+                    expired = await upload_sessions.purge_expired(db, limit=500)
+                    if not expired:
+                        break
+                    sessions.extend(expired)
+            staged = await asyncio.to_thread(lambda: [(i, st.st_ctime) for i, st in iter_staging()])
+            live = await upload_sessions.existing_ids(db, [i for i, _ in staged])
+            cutoff = time.time() - args.grace
+            purged = set(sessions)
+            sessions += [i for i, ctime in staged if i not in live and i not in purged and ctime < cutoff]
+            if not args.dry_run:
+                for upload_id in sessions:
+                    await asyncio.to_thread(discard_staging, upload_id)
+
+            removed = {"keys": [], "blobs": [], "temp": []}
+            storage = get_storage()
+            if not isinstance(storage, LocalStorage):
+                print("STORAGE_BACKEND is not local: skipping key and blob collection")
+            else:
+                if storage.content_addressed:
+                    # a dry run rebuilds the counts too, then rolls them back; no transaction is held while
+                    # the filesystem is walked
+                    await rebuild_refcounts(db, commit=not args.dry_run)
+                keys = set((await db.execute(select(UploadedDocuments.file_path))).scalars().all())
+                on_disk = await asyncio.to_thread(lambda: [sha256 for sha256, _ in iter_blobs()])
+                blobs = await referenced_blobs(db, on_disk)
+                await db.rollback()
+                removed = await asyncio.to_thread(collect_garbage, keys, blobs, args.grace, args.dry_run)
+                if not args.dry_run:
+                    await forget(db, removed["blobs"])
+                    await db.commit()
+        removed["sessions"] = sessions
+        verb = "would remove" if args.dry_run else "removed"
+        for kind, label in (("sessions", "upload session"), ("keys", "key"), ("blobs", "blob"), ("temp", "temp file")):
+            for name in removed[kind]:
+                print(f"{verb} {label} {name}")
+        print(f"{verb} {len(sessions)} upload sessions, {len(removed['keys'])} keys, {len(removed['blobs'])} blobs, "
+              f"{len(removed['temp'])} temp files")
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
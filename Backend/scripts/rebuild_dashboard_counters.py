@@ -0,0 +1,36 @@
+"""Recompute the admin dashboard counters from the source tables.
+
+Usage (from Backend/):
+    python scripts/rebuild_dashboard_counters.py
+
+The counters are kept in step by the crud write paths; run this after writes that bypassed crud
+(manual SQL, bulk imports, restores) or whenever /api/admin/stats disagrees with the data.
+Runs in one transaction, so readers see either the old or the rebuilt counts.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from database.session import init_engine, dispose_engine, get_sessionmaker  # noqa: E402
+from crud.stats import rebuild_counters, get_dashboard_stats  # noqa: E402
+
+
+async def main() -> None:
+    load_dotenv()
+    init_engine()
+    try:
+        async with get_sessionmaker()() as db:
+            await rebuild_counters(db)
+            result = await get_dashboard_stats(db)
+        print(f"rebuilt: {result['applications_total']} applications, "
+              f"{result['pending_document_verifications']} documents pending verification")
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
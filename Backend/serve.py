@@ -0,0 +1,269 @@
+"""Production launcher: pre-forked uvicorn workers sharing one listening socket.
+
+Usage (from Backend/):
+    python serve.py                          # settings from the environment / .env
+    python serve.py --workers 8 --port 8080  # flags override the environment
+
+`uvicorn main:app --reload` (see `main.py`) stays the development entry point. This launcher:
+- binds the socket once in the supervisor with SERVER_BACKLOG, then forks SERVER_WORKERS processes that
+  all accept on it; a worker that exits (crash, or SERVER_MAX_REQUESTS reached) is replaced;
+- runs each worker on uvloop and httptools when they are installed, and falls back to asyncio and h11;
+- with SERVER_PRELOAD on (the default), imports the app in the supervisor before forking. When
+  CHAT_MODEL_PRELOAD is also on, it loads the chat tokenizer and weights there too. It then calls
+  `gc.freeze()`, so workers share those pages copy-on-write instead of each loading their own copy. The
+  warm-up inference is left to each worker: running it before the fork would start torch's thread pools,
+  which the forked workers would inherit in a broken state.
+
+Pending schema migrations are applied once in the supervisor, with an engine that is disposed before
+the fork. Nothing that holds a connection survives into the workers: each worker's lifespan still
+initialises its own DB engine, reference cache and rate-limit file mapping.
+
+Settings come from the same environment / .env as the database settings. Each worker opens up to
+DB_POOL_SIZE + DB_MAX_OVERFLOW connections, and a warning is logged when workers times that exceeds
+DB_MAX_CONNECTIONS.
+
+Platforms without fork (Windows) fall back to uvicorn's own multi-process mode, without preloading.
+"""
+import argparse
+import gc
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, Optional
+
+import dotenv
+
+dotenv.load_dotenv()
+
+import uvicorn  # noqa: E402
+
+from database.session import _env_bool, _env_int, get_pool_settings  # noqa: E402
+
+logger = logging.getLogger("serve")
+
+# a worker that dies sooner than this after starting is respawned only after a pause, so a crash on
+# startup (bad config, DB down) does not turn into a fork loop
+MIN_WORKER_UPTIME_SECONDS = 5.0
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+def get_server_settings() -> Dict[str, Any]:
+    """Read launcher settings from the environment."""
+    return {
+        'host': os.getenv('SERVER_HOST', '0.0.0.0'),
+        'port': _env_int('SERVER_PORT', 8000),
+        'workers': max(1, _env_int('SERVER_WORKERS', _env_int('WEB_CONCURRENCY', os.cpu_count() or 1))),
+        'backlog': _env_int('SERVER_BACKLOG', 2048),
+        'keepalive': _env_int('SERVER_KEEPALIVE_SECONDS', 5),
+        'limit_concurrency': _env_int('SERVER_LIMIT_CONCURRENCY', 0) or None,
+        'max_requests': _env_int('SERVER_MAX_REQUESTS', 0) or None,
+        'max_requests_jitter': _env_int('SERVER_MAX_REQUESTS_JITTER', 0),
+        'graceful_timeout': _env_int('SERVER_GRACEFUL_TIMEOUT_SECONDS', 30),
+        'preload': _env_bool('SERVER_PRELOAD', True),
+        'proxy_headers': _env_bool('SERVER_PROXY_HEADERS', False),
+        'access_log': _env_bool('SERVER_ACCESS_LOG', True),
+    }
+
+
+def event_loop_and_http() -> tuple[str, str]:
+    """Fastest available event loop and HTTP parser: uvloop/httptools when installed."""
+    loop = 'uvloop' if importlib.util.find_spec('uvloop') and sys.platform != 'win32' else 'asyncio'
+    http = 'httptools' if importlib.util.find_spec('httptools') else 'h11'
+    return loop, http
+
+
+def check_connection_budget(workers: int) -> Optional[str]:
+    """Warning text when every worker's full pool would exceed DB_MAX_CONNECTIONS, else None."""
+    limit = _env_int('DB_MAX_CONNECTIONS', 0)
+    pool = get_pool_settings()
+    per_worker = pool['pool_size'] + pool['max_overflow']
+    if limit and workers * per_worker > limit:
+        return (f"{workers} workers x (DB_POOL_SIZE {pool['pool_size']} + DB_MAX_OVERFLOW {pool['max_overflow']}) "
+                f"= {workers * per_worker} connections exceeds DB_MAX_CONNECTIONS={limit}")
+    return None
+
+
+def uvicorn_options(settings: Dict[str, Any]) -> Dict[str, Any]:
+    loop, http = event_loop_and_http()
+    return dict(
+        host=settings['host'],
+        port=settings['port'],
+        loop=loop,
+        http=http,
+        lifespan='on',
+        backlog=settings['backlog'],
+        timeout_keep_alive=settings['keepalive'],
+        limit_concurrency=settings['limit_concurrency'],
+        limit_max_requests=settings['max_requests'],
+        limit_max_requests_jitter=settings['max_requests_jitter'],
+        timeout_graceful_shutdown=settings['graceful_timeout'],
+        proxy_headers=settings['proxy_headers'],
+        access_log=settings['access_log'],
+    )
+
+
+def build_config(app: Any, settings: Dict[str, Any]) -> uvicorn.Config:
+    return uvicorn.Config(app, **uvicorn_options(settings))
+
+
+def migrate_before_fork() -> None:
+    """Apply pending migrations once, with a throwaway engine, so workers do not race to migrate.
+
+    Same condition as the app lifespan: AUTO_CREATE_DB if set, else only for SQLite. The engine is
+    disposed before returning, so no connection is inherited by the workers.
+    """
+    import asyncio
+    from database import session as db_session
+    from database.migrations import ensure_schema
+
+    url = os.getenv('DATABASE_URL') or db_session.DEFAULT_DATABASE_URL
+    auto_create = os.getenv('AUTO_CREATE_DB')
+    if not (auto_create.lower() in ('1', 'true', 'yes') if auto_create is not None else 'sqlite' in url):
+        return
+
+    async def _migrate():
+        engine = db_session._create_engine(url, False, None)
+        try:
+            return await ensure_schema(engine)
+        finally:
+            await engine.dispose()
+
+    try:
+        logger.info("schema migrations before fork: %s", asyncio.run(_migrate()))
+    except Exception as exc:
+        # each worker's lifespan retries and reports the failure on /health/ready
+        logger.warning("schema migration before fork failed: %s", exc)
+
+
+def preload() -> Any:
+    """Import the app (and load the chat model if CHAT_MODEL_PRELOAD is on) in the supervisor."""
+    started = time.perf_counter()
+    import main
+    if _env_bool('CHAT_MODEL_PRELOAD', True):
+        from api.v1.endpoints.chat import model_loader
+        model_loader.start(warmup=False)
+        state = model_loader.wait()
+        logger.info("chat model %s before fork", state)
+    # move everything loaded so far out of the collector's generations; otherwise the first collection in
+    # each worker writes to every object header and un-shares the pages
+    gc.collect()
+    gc.freeze()
+    logger.info("preloaded app in %.0fms", (time.perf_counter() - started) * 1000.0)
+    return main.app
+
+
+def reset_after_fork() -> None:
+    """In a new worker: drop the supervisor's loader thread and let a failed chat model load be retried."""
+    chat = sys.modules.get('api.v1.endpoints.chat')
+    if chat is not None:
+        chat.model_loader.after_fork()
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """Forks workers on a shared socket, replaces the ones that exit and stops them on SIGTERM/SIGINT."""
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.children: Dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                reset_after_fork()
+                uvicorn.Server(self.config).run(sockets=[self.sock])
+            except BaseException:
+                logger.exception("worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info("started worker %s", pid)
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self.spawn()
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = self.children.pop(pid, None)
+            if started is None:
+                continue
+            logger.info("worker %s exited with status %s", pid, os.waitstatus_to_exitcode(status))
+            if not self.stopping:
+                if time.monotonic() - started < MIN_WORKER_UPTIME_SECONDS:
+                    time.sleep(RESPAWN_DELAY_SECONDS)
+                self.spawn()
+        self.sock.close()
+        return 0
+
+
+def main(argv=None) -> int:
+    settings = get_server_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=settings['host'])
+    parser.add_argument('--port', type=int, default=settings['port'])
+    parser.add_argument('--workers', type=int, default=settings['workers'])
+    parser.add_argument('--no-preload', dest='preload', action='store_false', default=settings['preload'])
+    args = parser.parse_args(argv)
+    settings.update(host=args.host, port=args.port, workers=max(1, args.workers), preload=args.preload)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    loop, http = event_loop_and_http()
+    logger.info("serving on %s:%s with %s workers (loop=%s http=%s keepalive=%ss backlog=%s)",
+                settings['host'], settings['port'], settings['workers'], loop, http, settings['keepalive'], settings['backlog'])
+    warning = check_connection_budget(settings['workers'])
+    if warning:
+        logger.warning(warning)
+
+    if not hasattr(os, 'fork'):
+        # uvicorn spawns (not forks) its workers here, so each one imports the app itself
+        uvicorn.run('main:app', workers=settings['workers'], **uvicorn_options(settings))
+        return 0
+
+    migrate_before_fork()
+    app = preload() if settings['preload'] else 'main:app'
+    config = build_config(app, settings)
+    sock = bind_socket(settings['host'], settings['port'], settings['backlog'])
+    if settings['workers'] == 1:
+        uvicorn.Server(config).run(sockets=[sock])
+        return 0
+    return Supervisor(config, sock, settings['workers']).run()
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
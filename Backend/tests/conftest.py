@@ -1,6 +1,10 @@
 import os
 # Ensure any early imports that read DATABASE_URL_ASYNC pick a sqlite default during test collection
 os.environ.setdefault('DATABASE_URL', 'sqlite+aiosqlite:///./db.sqlite3')
+# Minimum bcrypt cost keeps registration-heavy tests fast; production defaults to 12
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+# Per-process auth rate-limit buckets, so runs do not share state through /dev/shm
+os.environ.setdefault('AUTH_RATE_LIMIT_BACKEND', 'memory')
 
 import asyncio
 import pytest
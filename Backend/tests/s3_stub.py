@@ -0,0 +1,132 @@
+"""In-process stand-in for an S3 service, for tests of tools/s3_storage.py.
+
+An ASGI app that keeps objects in memory and answers the calls S3Storage makes: PUT/GET/HEAD/DELETE
+object (GET with Range), and Create/UploadPart/Complete/Abort multipart upload, with S3-style XML errors.
+Use it through `httpx.ASGITransport(app=S3Stub())`, so no network is involved. Requests must carry a
+SigV4 Authorization header or presigned query; signatures themselves are checked against the AWS test
+vectors in tests/test_storage_backends.py, not here.
+"""
+import asyncio
+import hashlib
+import secrets
+import xml.etree.ElementTree as ET
+from email.utils import formatdate
+from urllib.parse import parse_qsl
+
+
+def _error(status: int, code: str, message: str = ""):
+    body = f"<Error><Code>{code}</Code><Message>{message}</Message></Error>".encode()
+    return status, {"content-type": "application/xml"}, body
+
+
+class S3Stub:
+    def __init__(self, min_part_size: int = 0, part_delay: float = 0.0):
+        self.min_part_size = min_part_size
+        self.part_delay = part_delay
+        self.objects = {}  # (bucket, key) -> {"body", "etag", "headers", "last_modified"}
+        self.uploads = {}  # upload id -> {"bucket", "key", "headers", "parts": {number: (etag, body)}}
+        self.requests = []  # (method, path, query dict)
+        self.fail_parts = {}  # part number -> how many times to answer 500
+        self.parts_in_flight = 0
+        self.max_parts_in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        headers = {k.decode().lower(): v.decode() for k, v in scope["headers"]}
+        query = dict(parse_qsl(scope["query_string"].decode(), keep_blank_values=True))
+        self.requests.append((scope["method"], scope["path"], query))
+        if "authorization" not in headers and "X-Amz-Signature" not in query:
+            status, out_headers, out = _error(403, "AccessDenied")
+        else:
+            bucket, _, key = scope["path"].lstrip("/").partition("/")
+            status, out_headers, out = await self._handle(scope["method"], bucket, key, query, headers, body)
+        out_headers.setdefault("content-length", str(len(out)))
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(k.encode(), v.encode()) for k, v in out_headers.items()]})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else out})
+
+    async def _handle(self, method, bucket, key, query, headers, body):
+        if method == "POST" and "uploads" in query:
+            upload_id = secrets.token_urlsafe(16)
+            self.uploads[upload_id] = {"bucket": bucket, "key": key, "headers": headers, "parts": {}}
+            xml = f'<InitiateMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/"><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>'
+            return 200, {}, xml.encode()
+        if "uploadId" in query:
+            upload = self.uploads.get(query["uploadId"])
+            if upload is None:
+                return _error(404, "NoSuchUpload")
+            if method == "PUT":
+                return await self._upload_part(upload, int(query["partNumber"]), body)
+            if method == "DELETE":
+                del self.uploads[query["uploadId"]]
+                return 204, {}, b""
+            if method == "POST":
+                return self._complete(query["uploadId"], upload, body)
+        if method == "PUT":
+            self._store(bucket, key, body, headers)
+            return 200, {"etag": self.objects[(bucket, key)]["etag"]}, b""
+        obj = self.objects.get((bucket, key))
+        if method == "DELETE":
+            self.objects.pop((bucket, key), None)
+            return 204, {}, b""
+        if obj is None:
+            return _error(404, "NoSuchKey")
+        out_headers = {"etag": obj["etag"], "last-modified": obj["last_modified"], **obj["headers"]}
+        data = obj["body"]
+        if method == "GET" and "range" in headers:
+            first, _, last = headers["range"].removeprefix("bytes=").partition("-")
+            start, end = int(first), (int(last) + 1 if last else len(data))
+            if start >= len(data):
+                return _error(416, "InvalidRange")
+            end = min(end, len(data))
+            out_headers["content-range"] = f"bytes {start}-{end - 1}/{len(data)}"
+            return 206, out_headers, data[start:end]
+        return 200, out_headers, data
+
+    def _store(self, bucket, key, body, headers, etag=None):
+        kept = {k: v for k, v in headers.items() if k.startswith("x-amz-meta-") or k == "content-type"}
+        self.objects[(bucket, key)] = {
+            "body": body,
+            "etag": etag or f'"{hashlib.md5(body).hexdigest()}"',
+            "headers": kept,
+            "last_modified": formatdate(usegmt=True),
+        }
+
+    async def _upload_part(self, upload, number, body):
+        if self.fail_parts.get(number):
+            self.fail_parts[number] -= 1
+            return _error(500, "InternalError")
+        self.parts_in_flight += 1
+        self.max_parts_in_flight = max(self.max_parts_in_flight, self.parts_in_flight)
+        try:
+            await asyncio.sleep(self.part_delay)
+        finally:
+            self.parts_in_flight -= 1
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        upload["parts"][number] = (etag, body)
+        return 200, {"etag": etag}, b""
+
+    def _complete(self, upload_id, upload, body):
+        listed = [
+            (int(part.findtext("PartNumber")), part.findtext("ETag"))
+            for part in ET.fromstring(body).iter("Part")
+        ]
+        if [n for n, _ in listed] != sorted(upload["parts"]):
+            return _error(400, "InvalidPart")
+        for i, (number, etag) in enumerate(listed):
+            stored_etag, data = upload["parts"][number]
+            if etag != stored_etag:
+                return _error(400, "InvalidPart")
+            if i < len(listed) - 1 and len(data) < self.min_part_size:
+                return _error(400, "EntityTooSmall")
+        data = b"".join(upload["parts"][n][1] for n, _ in listed)
+        digests = b"".join(bytes.fromhex(upload["parts"][n][0].strip('"')) for n, _ in listed)
+        self._store(upload["bucket"], upload["key"], data, upload["headers"],
+                    etag=f'"{hashlib.md5(digests).hexdigest()}-{len(listed)}"')
+        del self.uploads[upload_id]
+        return 200, {}, b"<CompleteMultipartUploadResult><ETag>x</ETag></CompleteMultipartUploadResult>"
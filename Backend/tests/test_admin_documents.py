@@ -3,6 +3,7 @@ from types import SimpleNamespace
 import pytest
 import importlib
 
+from fastapi import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from models.lro_backend_models import UploadedDocuments, LROOfficer, Application, ApplicationLog
 
@@ -35,7 +36,7 @@ async def test_list_documents_db(db: AsyncSession):
     await db.commit()
 
     # Call the endpoint function directly
-    result = await admin_documents.list_documents(db=db, officer=officer)
+    result = await admin_documents.list_documents(response=Response(), db=db, officer=officer)
     assert isinstance(result, list)
     assert len(result) >= 2
 
@@ -0,0 +1,114 @@
+import importlib
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud.admin_applications import list_applications_page
+from crud.documents import list_documents_page
+from crud.pagination import decode_cursor, encode_cursor
+from database import session as db_session
+from models.lro_backend_models import Application, ApplicationStatus, Services, UploadedDocuments, User, create_all_tables_via_url
+
+admin_applications = importlib.import_module('api.v1.endpoints.admin_applications')
+
+BASE = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest_asyncio.fixture
+async def session(tmp_path):
+    """Isolated database with 25 applications; applications 10-14 share one timestamp to exercise tie-breaks."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pages.sqlite3'}"
+    await create_all_tables_via_url(url)
+    engine = db_session._create_engine(url, False, None)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as s:
+        s.add_all([ApplicationStatus(status_id=1, status_name='Pending'), ApplicationStatus(status_id=2, status_name='Approved')])
+        s.add_all([Services(service_id=1, service_name='A', service_code='A', base_fee=0), Services(service_id=2, service_name='B', service_code='B', base_fee=0)])
+        s.add(User(user_id=1, full_name='U', nic_number='1V', email='u@example.com', password_hash='x'))
+        await s.flush()
+        for i in range(1, 26):
+            when = BASE + timedelta(minutes=10) if 10 <= i <= 14 else BASE + timedelta(minutes=i)
+            s.add(Application(application_id=i, user_id=1, service_id=1 + i % 2, status_id=2 if i % 5 == 0 else 1,
+                              reference_number=f'REF-{i}', application_date=when))
+            s.add(UploadedDocuments(document_id=i, application_id=i, document_type='Deed', file_name='f', file_path='p',
+                                    verification_status='Verified' if i % 3 == 0 else 'Pending', uploaded_at=when))
+        await s.commit()
+        yield s
+    await engine.dispose()
+
+
+async def _walk(fetch, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = await fetch(limit, cursor)
+        ids.extend(rows)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(BASE, 42)) == (BASE, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_application_pages_cover_every_row_once(session):
+    async def fetch(limit, cursor):
+        rows, nxt = await list_applications_page(session, limit=limit, cursor=cursor)
+        return [r['application_id'] for r in rows], nxt
+
+    ids, pages = await _walk(fetch, 4)
+    assert pages == 7
+    assert sorted(ids) == list(range(1, 26))
+    # newest first, ties on application_date broken by id descending
+    assert ids[ids.index(14):ids.index(10) + 1] == [14, 13, 12, 11, 10]
+
+
+@pytest.mark.asyncio
+async def test_application_filters_and_ascending_order(session):
+    async def fetch(limit, cursor):
+        rows, nxt = await list_applications_page(session, limit=limit, cursor=cursor, descending=False,
+                                                 status_id=1, service_id=2,
+                                                 date_from=BASE + timedelta(minutes=5), date_to=BASE + timedelta(minutes=20))
+        return [r['application_id'] for r in rows], nxt
+
+    ids, _ = await _walk(fetch, 2)
+    assert ids == [7, 9, 11, 13, 17, 19]
+
+
+@pytest.mark.asyncio
+async def test_document_pages_filter_by_verification_status(session):
+    async def fetch(limit, cursor):
+        docs, nxt = await list_documents_page(session, limit=limit, cursor=cursor, verification_status='Verified')
+        return [d.document_id for d in docs], nxt
+
+    ids, pages = await _walk(fetch, 3)
+    assert ids == [24, 21, 18, 15, 12, 9, 6, 3]
+    assert pages == 3
+
+
+@pytest.mark.asyncio
+async def test_endpoint_sets_next_cursor_header_and_rejects_bad_cursor(session):
+    response = Response()
+    rows = await admin_applications.list_all_applications_endpoint(response=response, limit=10, db=session, current_officer=None)
+    assert len(rows) == 10
+    assert decode_cursor(response.headers['x-next-cursor'])[1] == rows[-1]['application_id']
+
+    with pytest.raises(HTTPException) as exc:
+        await admin_applications.list_all_applications_endpoint(response=Response(), cursor='garbage', db=session, current_officer=None)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_page_query_uses_keyset_index(session):
+    stmt = text("EXPLAIN QUERY PLAN SELECT application_id FROM applications WHERE status_id = 1 "
+                "AND application_date <= :d ORDER BY application_date DESC, application_id DESC LIMIT 5")
+    plan = " ".join(str(row[-1]) for row in (await session.execute(stmt, {"d": BASE})).all())
+    assert "ix_applications_status_date_id" in plan
+    assert "TEMP B-TREE" not in plan
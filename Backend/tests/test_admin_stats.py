@@ -0,0 +1,106 @@
+import importlib
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud import stats
+from crud.admin_applications import update_application_status
+from crud.applications import add_document, create_application
+from crud.documents import set_document_verification
+from crud.users import create_user
+from database import session as db_session
+from database.migrations import ensure_schema
+from database.query_stats import capture_queries
+from models.lro_backend_models import LROOfficer, Offices
+
+admin_stats = importlib.import_module('api.v1.endpoints.admin_stats')
+
+
+@pytest_asyncio.fixture
+async def session(tmp_path):
+    """Migrated database (statuses 1-4 and service 1 seeded) with one officer in office 5."""
+    engine = db_session._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'stats.sqlite3'}", False, None)
+    await ensure_schema(engine)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as s:
+        user = await create_user(s, 'Officer', '900000000V', 'officer@example.com', 'pw')
+        s.add(Offices(office_id=5, office_name='Colombo'))
+        s.add(LROOfficer(officer_id=7, user_id=user.user_id, employee_id='E7', assigned_office_id=5))
+        await s.commit()
+        s.info['user_id'] = user.user_id
+        yield s
+    await engine.dispose()
+
+
+def _by(rows, key):
+    return {r[key]: r['count'] for r in rows}
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_crud_writes_and_match_rebuild(session):
+    user_id = session.info['user_id']
+    apps = [await create_application(session, user_id, 1, None) for _ in range(3)]
+    doc_ids = [(await add_document(session, apps[0].application_id, 'Deed', f'{i}.pdf', f'p/{i}')).document_id for i in range(2)]
+    await update_application_status(session, apps[0].application_id, 3, officer_id=7)
+    await set_document_verification(session, doc_ids[0], 'Verified', officer_id=7)
+
+    result = await admin_stats.get_stats_endpoint(db=session, officer=None)
+    assert result['applications_total'] == 3
+    assert _by(result['by_status'], 'status_id') == {1: 2, 3: 1}
+    assert _by(result['by_service'], 'service_id') == {1: 3}
+    assert _by(result['by_office'], 'office_id') == {5: 1, None: 2}
+    assert result['by_status'][0]['status_name'] == 'Pending'
+    assert result['pending_document_verifications'] == 1
+    assert result['documents_by_verification_status'] == {'Pending': 1, 'Verified': 1, 'Rejected': 0}
+
+    await stats.rebuild_counters(session)
+    assert await stats.get_dashboard_stats(session) == result
+
+
+@pytest.mark.asyncio
+async def test_counter_update_is_one_statement_in_the_write_transaction(session):
+    with capture_queries() as q:
+        await create_application(session, session.info['user_id'], 1, None)
+    assert q.commits == 1
+    assert sum(n for sql, n in q.statements.items() if 'dashboard_counters' in sql) == 1
+
+
+@pytest.mark.asyncio
+async def test_rebuild_repairs_drift(session):
+    await create_application(session, session.info['user_id'], 1, None)
+    await stats.apply_deltas(session, {(stats.STATUS, '1'): 40})
+    await session.commit()
+    await stats.rebuild_counters(session)
+    result = await stats.get_dashboard_stats(session)
+    assert _by(result['by_status'], 'status_id') == {1: 1}
+
+
+@pytest.mark.asyncio
+async def test_status_writes_lock_the_row_and_counters_in_a_fixed_order(session, monkeypatch):
+    from sqlalchemy.dialects import postgresql
+
+    app = await create_application(session, session.info['user_id'], 1, None)
+    doc = await add_document(session, app.application_id, 'Deed', 'a.pdf', 'p/a')
+    executed = []
+    execute = session.execute
+
+    async def recording(stmt, *args, **kwargs):
+        executed.append(stmt)
+        return await execute(stmt, *args, **kwargs)
+
+    monkeypatch.setattr(session, 'execute', recording)
+    await update_application_status(session, app.application_id, 3, officer_id=7)
+    await set_document_verification(session, doc.document_id, 'Verified', officer_id=7)
+
+    selects = [str(s.compile(dialect=postgresql.dialect())) for s in executed if getattr(s, 'is_select', False)]
+    assert any('FROM applications' in s and s.rstrip().endswith('FOR UPDATE') for s in selects)
+    assert any('FROM uploaded_documents' in s and s.rstrip().endswith('FOR UPDATE') for s in selects)
+
+    # multi-row upserts list counter rows sorted by (dimension, bucket)
+    upserts = [s for s in executed if getattr(s, 'table', None) is not None and s.table.name == 'dashboard_counters']
+    assert upserts
+    for stmt in upserts:
+        params = stmt.compile().params
+        keys = [(params[f'dimension_m{i}'], params[f'bucket_m{i}']) for i in range(len(params) // 3)]
+        assert len(keys) > 1 and keys == sorted(keys)
@@ -1,8 +1,15 @@
 from fastapi.testclient import TestClient
+import importlib
 from main import app
 import os
 
-def test_chat_endpoint():
+def test_chat_endpoint(monkeypatch):
+    chat = importlib.import_module('api.v1.endpoints.chat')
+    loader = chat.ChatModelLoader(load_fn=lambda: (lambda system, history, user: f"Echo: {user}"))
+    monkeypatch.setattr(chat, 'model_loader', loader)
+    loader.start()
+    assert loader.wait(5) == 'ready'
+
     client = TestClient(app)
     resp = client.post('/api/chat', json={'user': 'hello'})
     assert resp.status_code == 200
@@ -10,6 +17,46 @@ def test_chat_endpoint():
     assert body.get('reply') == 'Echo: hello'
 
 
+def test_chat_returns_503_until_model_ready(monkeypatch):
+    import threading
+    chat = importlib.import_module('api.v1.endpoints.chat')
+    release = threading.Event()
+
+    def slow_load():
+        release.wait(5)
+        return lambda system, history, user: "ok"
+
+    loader = chat.ChatModelLoader(load_fn=slow_load)
+    monkeypatch.setattr(chat, 'model_loader', loader)
+    client = TestClient(app)
+
+    # first request starts loading and is told to retry
+    resp = client.post('/api/chat', json={'user': 'hello'})
+    assert resp.status_code == 503
+    assert resp.headers['retry-after'] == str(chat.CHAT_RETRY_AFTER_SECONDS)
+    assert loader.state == 'loading'
+
+    release.set()
+    assert loader.wait(5) == 'ready'
+    assert loader.warmup_ms is not None
+    assert client.post('/api/chat', json={'user': 'hello'}).json() == {'reply': 'ok'}
+
+
+def test_chat_failed_model_is_503(monkeypatch):
+    chat = importlib.import_module('api.v1.endpoints.chat')
+
+    def broken():
+        raise FileNotFoundError('best.pkl')
+
+    loader = chat.ChatModelLoader(load_fn=broken)
+    monkeypatch.setattr(chat, 'model_loader', loader)
+    loader.start()
+    assert loader.wait(5) == 'failed'
+    resp = TestClient(app).post('/api/chat', json={'user': 'hello'})
+    assert resp.status_code == 503
+    assert 'retry-after' not in resp.headers
+
+
 def test_internal_static_serving(tmp_path):
     # create sample file under uploaded_documents/123/file.txt
     uploads = tmp_path / 'uploaded_documents' / '123'
@@ -22,13 +69,58 @@ def test_internal_static_serving(tmp_path):
     try:
         os.chdir(tmp_path)
         client = TestClient(app)
-        # authorized header (matches user id in path)
-        resp = client.get('/api/internal/static/123/file.txt', headers={'X-User-Id': '123'})
+        from tools.minio_storage import generate_presigned_url
+        url = '/api' + generate_presigned_url('123/file.txt')
+        resp = client.get(url)
         assert resp.status_code == 200
         assert resp.text == 'content'
 
-        # forbidden when header doesn't match
-        resp2 = client.get('/api/internal/static/123/file.txt', headers={'X-User-Id': '999'})
-        assert resp2.status_code == 403
+        # no signature, a signature for another key, or an expired one: refused before touching storage
+        assert client.get('/api/internal/static/123/file.txt', headers={'X-User-Id': '123'}).status_code == 403
+        query = url.split('?')[1]
+        assert client.get(f'/api/internal/static/123/other.txt?{query}').status_code == 403
+        expired = '/api' + generate_presigned_url('123/file.txt', expires=-120)
+        assert client.get(expired).status_code == 403
+
+        # content-addressed blobs are only reachable through their object keys
+        blobs = tmp_path / 'uploaded_documents' / '.cas' / 'ab' / 'cd'
+        blobs.mkdir(parents=True)
+        (blobs / ('abcd' + '0' * 60)).write_text('content')
+        from tools.minio_storage import _url_signature
+        key, expires_at = '.cas/ab/cd/abcd' + '0' * 60, 2 ** 40
+        signed = f'/api/internal/static/{key}?expires={expires_at}&signature={_url_signature(key, expires_at)}'
+        assert client.get(signed).status_code == 404
     finally:
         os.chdir(cwd)
+
+
+def test_preloaded_model_warms_up_in_the_worker():
+    chat = importlib.import_module('api.v1.endpoints.chat')
+    calls = []
+    loader = chat.ChatModelLoader(load_fn=lambda: (lambda system, history, user: calls.append(user) or "ok"))
+    # supervisor: weights only, no inference before the fork
+    loader.start(warmup=False)
+    assert loader.wait(5) == 'ready'
+    assert calls == [] and loader.warmup_ms is None
+    # worker lifespan
+    loader.after_fork()
+    loader.start()
+    loader.wait(5)
+    assert calls == ['hello'] and loader.warmup_ms is not None
+
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError('disk busy')
+        return lambda system, history, user: "ok"
+
+    loader = chat.ChatModelLoader(load_fn=flaky)
+    loader.start(warmup=False)
+    assert loader.wait(5) == 'failed'
+    # a load that failed in the supervisor is retried by each worker
+    loader.after_fork()
+    assert loader.state == 'idle' and loader.error is None
+    loader.start()
+    assert loader.wait(5) == 'ready'
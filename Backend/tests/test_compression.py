@@ -0,0 +1,124 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from api import middleware
+from api.middleware import CompressionMiddleware, negotiate_encoding, parse_accept_encoding
+from api.responses import DefaultJSONResponse
+
+
+def _app():
+    app = FastAPI(default_response_class=DefaultJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/rows")
+    def rows():
+        return [{"application_id": i, "status_name": "Pending"} for i in range(200)]
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/pdf")
+    def pdf():
+        return Response(b"%PDF" + b"x" * 5000, media_type="application/pdf")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((json.dumps({"n": i}) + "\n" for i in range(500)), media_type="application/x-ndjson")
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse("a" * 2000)
+
+    @app.get("/file")
+    def file():
+        return PlainTextResponse("b" * 2000, headers={"ETag": '"abc"', "Accept-Ranges": "bytes"})
+
+    return app
+
+
+def test_negotiation():
+    assert parse_accept_encoding("gzip;q=0.5, br") == {"gzip": 0.5, "br": 1.0}
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("*") in ("br", "gzip")
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+
+
+def test_large_json_is_gzipped():
+    client = TestClient(_app())
+    resp = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert int(resp.headers["content-length"]) < 1000
+    assert resp.json()[199] == {"application_id": 199, "status_name": "Pending"}
+
+
+def test_compressed_response_has_weak_etag_and_no_ranges():
+    client = TestClient(_app())
+    resp = client.get("/file", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["etag"] == 'W/"abc"'
+    assert "accept-ranges" not in resp.headers
+    plain = client.get("/file", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["etag"] == '"abc"' and plain.headers["accept-ranges"] == "bytes"
+
+
+def test_small_unaccepted_and_binary_responses_pass_through():
+    client = TestClient(_app())
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/rows", headers={"Accept-Encoding": "identity"}).headers
+    pdf = client.get("/pdf", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pdf.headers
+    assert pdf.content.startswith(b"%PDF")
+
+
+def test_streamed_body_is_compressed_per_chunk():
+    client = TestClient(_app())
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "content-length" not in resp.headers
+        raw = b"".join(resp.iter_raw())
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert len(lines) == 500 and json.loads(lines[-1]) == {"n": 499}
+
+
+@pytest.mark.skipif(middleware.brotli is None, reason="brotli not installed")
+def test_brotli_preferred_when_available():
+    resp = TestClient(_app()).get("/text", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["content-encoding"] == "br"
+
+
+def test_app_uses_fast_json_response():
+    from main import app
+    assert app.router.default_response_class is DefaultJSONResponse
+
+
+def test_pathsend_bodies_pass_through_with_their_start(tmp_path):
+    import asyncio
+
+    from starlette.responses import FileResponse
+
+    path = tmp_path / "rows.csv"
+    path.write_text("a,b\n" * 1000)
+    sent = []
+
+    async def app(scope, receive, send):
+        await FileResponse(str(path), media_type="text/csv")(scope, receive, send)
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "method": "GET", "path": "/rows.csv", "headers": [(b"accept-encoding", b"gzip")],
+             "extensions": {"http.response.pathsend": {}}}
+    asyncio.run(CompressionMiddleware(app, minimum_size=500)(scope, receive, send))
+    assert [m["type"] for m in sent] == ["http.response.start", "http.response.pathsend"]
+    assert b"content-encoding" not in dict(sent[0]["headers"])
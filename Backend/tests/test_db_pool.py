@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+from database import session as db_session
+from database.pool import InstrumentedAsyncQueuePool, PoolStats, WAIT_BUCKETS_MS
+
+
+def test_pool_settings_from_env(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '12')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '3')
+    monkeypatch.setenv('DB_POOL_USE_LIFO', 'false')
+    settings = db_session.get_pool_settings()
+    assert settings['pool_size'] == 12
+    assert settings['max_overflow'] == 3
+    assert settings['pool_use_lifo'] is False
+
+
+def test_queue_pool_kwargs_only_for_queue_pools():
+    settings = db_session.get_pool_settings()
+    file_kwargs = db_session._engine_pool_kwargs('sqlite+aiosqlite:///./some.sqlite3', settings)
+    assert file_kwargs['poolclass'] is InstrumentedAsyncQueuePool
+    assert file_kwargs['pool_size'] == settings['pool_size']
+
+    memory_kwargs = db_session._engine_pool_kwargs('sqlite+aiosqlite:///:memory:', settings)
+    assert 'poolclass' not in memory_kwargs
+    assert 'pool_size' not in memory_kwargs
+    assert memory_kwargs['pool_pre_ping'] == settings['pool_pre_ping']
+
+
+def test_pool_stats_histogram():
+    stats = PoolStats()
+    stats.record_wait(0.5)
+    stats.record_wait(30)
+    stats.record_wait(WAIT_BUCKETS_MS[-1] + 1)
+    snap = stats.snapshot()
+    assert snap['checkouts'] == 3
+    assert snap['wait_histogram']['le_1ms'] == 1
+    assert snap['wait_histogram']['le_50ms'] == 1
+    assert snap['wait_histogram']['gt_%dms' % WAIT_BUCKETS_MS[-1]] == 1
+
+
+@pytest.mark.asyncio
+async def test_live_pool_stats_track_checkouts():
+    engine = db_session.get_engine()
+    assert isinstance(engine.pool, InstrumentedAsyncQueuePool)
+    before = db_session.get_pool_stats()['checkouts']
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        during = db_session.get_pool_stats()
+        assert during['checkedout'] >= 1
+    after = db_session.get_pool_stats()
+    assert after['checkouts'] == before + 1
+    assert sum(after['wait_histogram'].values()) == after['checkouts']
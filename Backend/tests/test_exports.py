@@ -0,0 +1,106 @@
+import csv
+import importlib
+import io
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud.exports import EXPORTS, export_batches, export_chunks, stream_rows
+from database import session as db_session
+from database.migrations import ensure_schema
+from models.lro_backend_models import Application, Payments, UploadedDocuments, User
+
+admin_exports = importlib.import_module('api.v1.endpoints.admin_exports')
+
+BASE = datetime(2025, 3, 1, 9, 0, 0)
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    """Migrated database with 7 applications, one document and one payment each."""
+    engine = db_session._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'exports.sqlite3'}", False, None)
+    await ensure_schema(engine)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as s:
+        s.add(User(user_id=1, full_name='Export, "Quoted" User', nic_number='EXP1V', email='exp@example.com', password_hash='x'))
+        await s.flush()
+        for i in range(1, 8):
+            when = BASE + timedelta(hours=i)
+            s.add(Application(application_id=i, user_id=1, service_id=1, status_id=3 if i % 2 else 1, reference_number=f'LT-{i}', application_date=when))
+            s.add(UploadedDocuments(document_id=i, application_id=i, document_type='Deed', file_name=f'd{i}.pdf', file_path='p', uploaded_at=when))
+            s.add(Payments(payment_id=i, application_id=i, amount=Decimal('1500.50'), payment_method='card', payment_status='Completed', payment_date=when))
+        await s.commit()
+    yield engine
+    await engine.dispose()
+
+
+async def _collect(engine, kind, fmt, **filters):
+    async with async_sessionmaker(engine)() as db:
+        return b"".join([chunk async for chunk in export_chunks(db, kind, fmt, batch_size=3, **filters)]).decode()
+
+
+@pytest.mark.asyncio
+async def test_rows_are_fetched_in_batches(engine):
+    async with async_sessionmaker(engine)() as db:
+        batches = [batch async for batch in stream_rows(db, EXPORTS["applications"].query(), batch_size=3)]
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert [row[0] for b in batches for row in b] == [7, 6, 5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_applications_with_filters(engine):
+    lines = (await _collect(engine, "applications", "ndjson", status_id=3, descending=False)).splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [r["application_id"] for r in rows] == [1, 3, 5, 7]
+    assert rows[0]["status_name"] == "Approved"
+    assert rows[0]["application_date"].startswith("2025-03-01T10:00:00")
+    assert list(rows[0]) == list(EXPORTS["applications"].fields)
+
+
+@pytest.mark.asyncio
+async def test_csv_payments_keep_exact_amounts(engine):
+    rows = list(csv.reader(io.StringIO(await _collect(engine, "payments", "csv", application_id=2))))
+    assert rows[0] == list(EXPORTS["payments"].fields)
+    assert len(rows) == 2
+    record = dict(zip(rows[0], rows[1]))
+    assert record["amount"] == "1500.50" and record["payment_status"] == "Completed"
+    assert record["transaction_reference"] == ""
+
+
+@pytest.mark.asyncio
+async def test_csv_quotes_user_names(engine):
+    rows = list(csv.reader(io.StringIO(await _collect(engine, "applications", "csv"))))
+    assert rows[1][2] == 'Export, "Quoted" User'
+    assert len(rows) == 8
+
+
+@pytest.mark.asyncio
+async def test_endpoint_streams_from_its_own_session(engine, monkeypatch):
+    async def sessionmaker():
+        return async_sessionmaker(engine)
+
+    monkeypatch.setattr(admin_exports, "get_read_sessionmaker", sessionmaker)
+    response = await admin_exports.export_documents(format="csv", verification_status=None, officer=None)
+    assert response.media_type.startswith("text/csv")
+    assert response.headers["content-disposition"].startswith('attachment; filename="documents-')
+    body = b"".join([chunk async for chunk in response.body_iterator]).decode()
+    assert body.splitlines()[0].startswith("document_id,application_id,document_type")
+    assert len(body.splitlines()) == 8
+
+
+@pytest.mark.asyncio
+async def test_csv_neutralises_formulas_and_counts_rows_per_batch(engine):
+    async with async_sessionmaker(engine)() as db:
+        (await db.get(UploadedDocuments, 1)).file_name = '=HYPERLINK("http://x","a\nb")'
+        (await db.get(UploadedDocuments, 2)).file_name = '-2+3.pdf'
+        await db.commit()
+        counts = [n async for _, n in export_batches(db, "documents", "csv", batch_size=3)]
+    assert counts == [0, 3, 3, 1]
+    rows = list(csv.reader(io.StringIO(await _collect(engine, "documents", "csv"))))
+    names = {row[0]: row[rows[0].index("file_name")] for row in rows[1:]}
+    assert names["1"] == '\'=HYPERLINK("http://x","a\nb")'
+    assert names["2"] == "'-2+3.pdf" and names["3"] == "d3.pdf"
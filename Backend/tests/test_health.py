@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+
+import main
+from api.v1.endpoints import health
+
+
+def test_live_does_no_io():
+    with TestClient(main.app) as client:
+        resp = client.get('/health/live')
+    assert resp.status_code == 200
+    assert resp.json() == {'status': 'ok'}
+    assert resp.headers['x-db-query-count'] == '0'
+
+
+def test_ready_reports_checks_and_startup_timings():
+    with TestClient(main.app) as client:
+        resp = client.get('/health/ready')
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body['status'] == 'ready'
+        assert set(body['checks']) >= {'database', 'storage', 'chat'}
+        assert body['checks']['database']['ok'] is True
+        timings = body['startup']['timings_ms']
+        assert set(timings) >= {'engine', 'schema', 'storage', 'db_check', 'total'}
+
+        # startup primed the cache, so probes within the TTL cost no DB round-trip
+        again = client.get('/health/ready')
+        assert again.headers['x-db-query-count'] == '0'
+
+
+def test_ready_fails_when_critical_check_fails(monkeypatch):
+    async def _db_down():
+        return {'ok': False, 'error': 'OperationalError: password authentication failed for user "lro"'}
+
+    with TestClient(main.app) as client:
+        monkeypatch.setitem(health.READINESS_CHECKS, 'database', (_db_down, True))
+        health.readiness.invalidate()
+        resp = client.get('/health/ready')
+    health.readiness.invalidate()
+    assert resp.status_code == 503
+    body = resp.json()
+    assert body['status'] == 'not_ready'
+    # the public probe says what failed, not why
+    assert body['checks']['database'] == {'ok': False, 'critical': True}
+    assert 'password' not in resp.text
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from database import migrations
+from database import session as db_session
+from database.query_stats import capture_queries
+from models.lro_backend_models import create_all_tables_via_url
+
+
+@pytest.fixture
+def engine_factory(tmp_path):
+    def _make(name="migrate.sqlite3"):
+        return db_session._create_engine(f"sqlite+aiosqlite:///{tmp_path / name}", False, None)
+    return _make
+
+
+def test_migrations_are_contiguous():
+    versions = [m.VERSION for m in migrations.load_migrations()]
+    assert versions == list(range(1, len(versions) + 1))
+    assert migrations.head_version() == versions[-1]
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_migrates_then_takes_fast_path(engine_factory):
+    engine = engine_factory()
+    try:
+        applied = await migrations.ensure_schema(engine)
+        assert applied == list(range(1, migrations.head_version() + 1))
+        async with engine.connect() as conn:
+            tables = await conn.run_sync(lambda c: set(inspect(c).get_table_names()))
+            statuses = (await conn.execute(text("SELECT COUNT(*) FROM application_status"))).scalar()
+        assert {"schema_version", "applications", "users"} <= tables
+        assert statuses == 4
+
+        # second start: a single SELECT on schema_version, no reflection or DDL
+        with capture_queries() as stats:
+            assert await migrations.ensure_schema(engine) == []
+        assert stats.count == 1
+        assert (await migrations.schema_status(engine))["current"] is True
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_existing_create_all_database_is_adopted(engine_factory):
+    engine = engine_factory("existing.sqlite3")
+    await create_all_tables_via_url(str(engine.url))
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("INSERT INTO services (service_id, service_name, service_code, base_fee) VALUES (7, 'Kept', 'KEEP', 0)"))
+        await migrations.ensure_schema(engine)
+        async with engine.connect() as conn:
+            names = (await conn.execute(text("SELECT service_code FROM services"))).scalars().all()
+        # migration is non-destructive and does not re-seed populated tables
+        assert names == ["KEEP"]
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_changed_fingerprint_without_migration_stays_reported(engine_factory, monkeypatch):
+    engine = engine_factory("changed.sqlite3")
+    try:
+        await migrations.ensure_schema(engine)
+        monkeypatch.setattr(migrations, "schema_fingerprint", lambda: "f" * 64)
+        assert (await migrations.schema_status(engine))["current"] is False
+        assert await migrations.ensure_schema(engine) == []
+        # the drift is not papered over: the stored fingerprint is left as it was
+        assert (await migrations.schema_status(engine))["current"] is False
+    finally:
+        await engine.dispose()
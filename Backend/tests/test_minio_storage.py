@@ -16,4 +16,188 @@ def test_upload_and_presign(monkeypatch, tmp_path):
     assert stored.exists()
 
     url = minio_storage.generate_presigned_url("applications/1/file.pdf")
-    assert url == "/internal/static/applications/1/file.pdf"
+    assert url.startswith("/internal/static/applications/1/file.pdf?expires=")
+
+
+def test_presigned_urls_are_signed_and_expire(monkeypatch):
+    monkeypatch.setattr(minio_storage.time, "time", lambda: 1_000_000)
+    url = minio_storage.generate_presigned_url("applications/1/my deed.pdf", expires=300)
+    path, query = url.split("?")
+    assert path == "/internal/static/applications/1/my%20deed.pdf"
+    params = dict(p.split("=") for p in query.split("&"))
+    expires_at, signature = int(params["expires"]), params["signature"]
+    # rounded up to the step, so URLs issued within a minute are identical (and cacheable)
+    assert expires_at % minio_storage.PRESIGNED_URL_EXPIRY_STEP == 0 and 1_000_300 <= expires_at < 1_000_360
+
+    assert minio_storage.verify_presigned("applications/1/my deed.pdf", expires_at, signature)
+    assert not minio_storage.verify_presigned("applications/2/my deed.pdf", expires_at, signature)
+    assert not minio_storage.verify_presigned("applications/1/my deed.pdf", expires_at + 60, signature)
+    assert not minio_storage.verify_presigned("applications/1/my deed.pdf", expires_at, signature[:-1] + "A")
+    assert not minio_storage.verify_presigned("applications/1/my deed.pdf", expires_at, "ü")
+    assert not minio_storage.verify_presigned("applications/1/my deed.pdf", expires_at, signature, now=expires_at)
+
+    urls = minio_storage.generate_presigned_urls(["a.pdf", "b.pdf", ".cas/x"])
+    assert urls[0].split("expires=")[1][:7] == urls[1].split("expires=")[1][:7] and urls[2] == ""
+
+
+class _CountingReader:
+    """File-like source that records the size of every read."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+        self.reads = []
+
+    def read(self, n=-1):
+        chunk = self._data[self._pos:self._pos + n]
+        self._pos += len(chunk)
+        self.reads.append(n)
+        return chunk
+
+
+def test_save_stream_hashes_in_fixed_chunks(monkeypatch, tmp_path):
+    import hashlib
+
+    monkeypatch.chdir(tmp_path)
+    data = bytes(range(256)) * 40  # 10240 bytes
+    source = _CountingReader(data)
+
+    stored = minio_storage.save_stream("applications/2/scan.pdf", source, max_bytes=len(data), chunk_size=4096)
+
+    assert stored == minio_storage.StoredObject("applications/2/scan.pdf", len(data), hashlib.sha256(data).hexdigest())
+    assert set(source.reads) == {4096}
+    target = tmp_path / 'uploaded_documents' / 'applications' / '2'
+    assert (target / 'scan.pdf').read_bytes() == data
+    assert [p.name for p in target.iterdir()] == ['scan.pdf']
+
+
+def test_save_stream_over_limit_leaves_nothing(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(minio_storage.UploadTooLarge):
+        minio_storage.save_stream("applications/3/big.pdf", _CountingReader(b"x" * 10000), max_bytes=5000, chunk_size=1024)
+
+    assert list((tmp_path / 'uploaded_documents' / 'applications' / '3').iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_runs_off_the_event_loop(monkeypatch, tmp_path):
+    import threading
+
+    monkeypatch.chdir(tmp_path)
+    loop_thread = threading.get_ident()
+    seen = []
+
+    class Source(_CountingReader):
+        def read(self, n=-1):
+            seen.append(threading.get_ident())
+            return super().read(n)
+
+    stored = await minio_storage.upload_stream("applications/4/a.pdf", Source(b"abc"))
+
+    assert stored.size == 3
+    assert seen and loop_thread not in seen
+
+
+def test_duplicate_content_is_stored_once(monkeypatch, tmp_path):
+    import hashlib
+    import io
+    import os
+
+    monkeypatch.chdir(tmp_path)
+    data = b"title deed scan" * 100
+    sha = hashlib.sha256(data).hexdigest()
+
+    first = minio_storage.save_stream("applications/5/deed.pdf", io.BytesIO(data), content_addressed=True)
+    second = minio_storage.save_stream("applications/6/deed.pdf", io.BytesIO(data), content_addressed=True)
+
+    assert (first.deduplicated, second.deduplicated) == (False, True)
+    blob = minio_storage.blob_path(sha)
+    assert blob.endswith(os.path.join('.cas', sha[:2], sha[2:4], sha))
+    root = tmp_path / 'uploaded_documents'
+    inodes = {os.stat(p).st_ino for p in (blob, root / 'applications/5/deed.pdf', root / 'applications/6/deed.pdf')}
+    assert len(inodes) == 1 and os.stat(blob).st_nlink == 3
+    assert (root / 'applications/6/deed.pdf').read_bytes() == data
+    assert os.listdir(root / '.cas' / 'tmp') == []
+    # keys are the only public names: blobs are not addressable
+    assert minio_storage.generate_presigned_url("applications/6/deed.pdf").startswith("/internal/static/applications/6/deed.pdf?")
+    assert minio_storage.generate_presigned_url(f".cas/{sha[:2]}/{sha[2:4]}/{sha}") == ""
+    with pytest.raises(ValueError):
+        minio_storage.save_stream(".cas/x", io.BytesIO(b"x"))
+
+
+def test_plain_mode_writes_keys_directly(monkeypatch, tmp_path):
+    import io
+
+    monkeypatch.chdir(tmp_path)
+    stored = minio_storage.save_stream("applications/7/a.pdf", io.BytesIO(b"abc"), content_addressed=False)
+
+    assert stored.deduplicated is False
+    assert (tmp_path / 'uploaded_documents' / 'applications' / '7' / 'a.pdf').read_bytes() == b"abc"
+    assert not (tmp_path / 'uploaded_documents' / '.cas').exists()
+
+
+def test_collect_garbage_keeps_referenced_and_recent(monkeypatch, tmp_path):
+    import hashlib
+    import io
+
+    monkeypatch.chdir(tmp_path)
+    shared, orphan = b"shared", b"orphan"
+    for key, data in (("a/1.pdf", shared), ("b/1.pdf", shared), ("c/1.pdf", orphan)):
+        minio_storage.save_stream(key, io.BytesIO(data), content_addressed=True)
+    shared_sha, orphan_sha = hashlib.sha256(shared).hexdigest(), hashlib.sha256(orphan).hexdigest()
+
+    # inside the grace period nothing is touched
+    assert minio_storage.collect_garbage({"a/1.pdf"}, {shared_sha}) == {"keys": [], "blobs": [], "temp": []}
+
+    # b/1.pdf and c/1.pdf have no row; only the orphan blob loses its last link
+    preview = minio_storage.collect_garbage({"a/1.pdf"}, {shared_sha}, grace_seconds=-1, dry_run=True)
+    assert sorted(preview["keys"]) == ["b/1.pdf", "c/1.pdf"] and preview["blobs"] == [orphan_sha]
+    assert (tmp_path / 'uploaded_documents' / 'c' / '1.pdf').exists()
+
+    removed = minio_storage.collect_garbage({"a/1.pdf"}, {shared_sha}, grace_seconds=-1)
+    assert removed == preview
+    assert [name for name, _ in minio_storage.iter_objects()] == ["a/1.pdf"]
+    assert [sha for sha, _ in minio_storage.iter_blobs()] == [shared_sha]
+
+    # a blob whose count dropped to zero but that is still linked from a key is kept
+    assert minio_storage.collect_garbage({"a/1.pdf"}, set(), grace_seconds=-1)["blobs"] == []
+
+
+def test_save_file_links_staging_without_copying(monkeypatch, tmp_path):
+    import hashlib
+    import os
+
+    monkeypatch.chdir(tmp_path)
+    f = minio_storage.open_staging("u1", 0)
+    f.write(b"scanned pages")
+    minio_storage.close_staging(f)
+
+    with pytest.raises(minio_storage.ChecksumMismatch):
+        minio_storage.save_file("applications/8/a.pdf", minio_storage.staging_path("u1"), expected_sha256="0" * 64)
+    stored = minio_storage.save_file("applications/8/a.pdf", minio_storage.staging_path("u1"), content_addressed=True)
+
+    sha = hashlib.sha256(b"scanned pages").hexdigest()
+    assert stored.sha256 == sha
+    assert os.stat(minio_storage.staging_path("u1")).st_ino == os.stat(minio_storage.blob_path(sha)).st_ino
+    # rewriting the staging file must not touch the shared blob
+    f = minio_storage.open_staging("u1", 3)
+    f.write(b"XX")
+    minio_storage.close_staging(f)
+    assert open(minio_storage.blob_path(sha), 'rb').read() == b"scanned pages"
+    # staging files are neither object keys nor blobs
+    assert [name for name, _ in minio_storage.iter_objects()] == ["applications/8/a.pdf"]
+    assert [i for i, _ in minio_storage.iter_staging()] == ["u1"]
+
+
+def test_object_keys_are_canonical_and_stay_in_the_uploads_root(monkeypatch, tmp_path):
+    import io
+    monkeypatch.chdir(tmp_path)
+    for key in ("x/../../../.cas/ab/cd/" + "a" * 64, "../outside.pdf", "/etc/passwd", "a\\b.pdf", "a/./b.pdf",
+                "a//b.pdf", "a/", "", ".", "./.cas/x", ".staging/u", "a\x00b"):
+        assert not minio_storage.is_valid_key(key), key
+        with pytest.raises(ValueError):
+            minio_storage.save_stream(key, io.BytesIO(b"attacker"))
+        assert minio_storage.generate_presigned_url(key) == ""
+    assert minio_storage.is_valid_key("applications/1/..deed.pdf")
+    assert not (tmp_path / "outside.pdf").exists()
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from models import security
+from models.security import PasswordHasher, PasswordHasherBusy
+
+
+def test_bcrypt_rounds_come_from_env():
+    # conftest lowers the cost for speed; the hash records the cost it was made with
+    assert security.BCRYPT_ROUNDS == 4
+    assert security.hash_password("pw").startswith("$2b$04$")
+
+
+@pytest.mark.asyncio
+async def test_async_hash_roundtrip_and_stats():
+    hasher = PasswordHasher(workers=2, max_queue=4)
+    try:
+        hashed = await hasher.run(security.hash_password, "secret")
+        assert await hasher.run(security.verify_password, "secret", hashed)
+        assert not await hasher.run(security.verify_password, "wrong", hashed)
+        stats = hasher.stats()
+        assert stats["submitted"] == stats["completed"] == 3
+        assert stats["rejected"] == 0
+        assert stats["in_flight"] == stats["queued"] == 0
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.create_task(hasher.run(release.wait, 5))
+        queued = asyncio.create_task(hasher.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        stats = hasher.stats()
+        assert stats["in_flight"] == 1 and stats["queued"] == 1
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run(release.wait, 5)
+        release.set()
+        await asyncio.gather(running, queued)
+        assert hasher.stats()["rejected"] == 1
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_during_hash():
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    try:
+        await hasher.run(time.sleep, 0.2)
+        assert ticks >= 5
+    finally:
+        task.cancel()
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_register_returns_503_when_hasher_is_busy(db, monkeypatch):
+    import importlib
+    import uuid
+    from fastapi import HTTPException
+    from schemas.user_schemas import UserRegisterRequest
+    from tests.utils import make_request
+    user_auth = importlib.import_module('api.v1.endpoints.user_auth')
+
+    async def busy(plain):
+        raise PasswordHasherBusy("full")
+
+    monkeypatch.setattr("crud.users.hash_password_async", busy)
+    suffix = uuid.uuid4().hex[:8]
+    payload = UserRegisterRequest(full_name="Busy User", nic_number=f"BUSY{suffix}V", email=f"busy+{suffix}@example.com", password="pw")
+    with pytest.raises(HTTPException) as exc:
+        await user_auth.register(payload, make_request(), db)
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
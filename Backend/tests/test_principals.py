@@ -0,0 +1,118 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import update
+
+from api.principals import PrincipalCache, get_current_officer, get_current_user, invalidate_principal, principal_cache
+from api.v1.endpoints.user_auth import create_access_token
+from database.query_stats import capture_queries
+from models.lro_backend_models import LROOfficer, User
+from tests.utils import create_user
+
+
+async def _credentials(user_id: int) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=await create_access_token(str(user_id)))
+
+
+@pytest.mark.asyncio
+async def test_user_is_resolved_once_then_served_from_cache(db):
+    user = await create_user(db)
+    creds = await _credentials(user.user_id)
+    with capture_queries() as first:
+        principal = await get_current_user(creds, db)
+    with capture_queries() as second:
+        again = await get_current_user(creds, db)
+    assert principal.user_id == user.user_id and principal.officer is None
+    assert again is principal
+    assert first.count == 1
+    assert second.count == 0
+
+
+@pytest.mark.asyncio
+async def test_officer_profile_and_deactivation_invalidate_through_orm(db):
+    user = await create_user(db)
+    creds = await _credentials(user.user_id)
+    with pytest.raises(HTTPException) as exc:
+        await get_current_officer(creds, db)
+    assert exc.value.status_code == 403
+
+    officer = LROOfficer(user_id=user.user_id, employee_id=f"E-{uuid.uuid4().hex[:6]}", role="registrar")
+    db.add(officer)
+    await db.commit()
+    resolved = await get_current_officer(creds, db)
+    assert resolved.officer_id == officer.officer_id and resolved.role == "registrar"
+
+    user_row = await db.get(User, user.user_id)
+    user_row.is_active = False
+    await db.commit()
+    with pytest.raises(HTTPException) as exc:
+        await get_current_officer(creds, db)
+    assert exc.value.detail == "Inactive user"
+
+
+@pytest.mark.asyncio
+async def test_entries_cached_before_commit_and_old_officer_holders_are_dropped(db):
+    first = await create_user(db)
+    second = await create_user(db)
+    officer = LROOfficer(user_id=first.user_id, employee_id=f"E-{uuid.uuid4().hex[:6]}", role="registrar")
+    db.add(officer)
+    await db.commit()
+    first_creds, second_creds = await _credentials(first.user_id), await _credentials(second.user_id)
+    assert (await get_current_officer(first_creds, db)).user_id == first.user_id
+    with pytest.raises(HTTPException):
+        await get_current_officer(second_creds, db)
+
+    officer.user_id = second.user_id
+    await db.flush()
+    # another request re-caches the committed (pre-change) rows between this flush and the commit
+    principal_cache.put(first.user_id, (await get_current_user(first_creds, db)))
+    principal_cache.put(second.user_id, None)
+    await db.commit()
+
+    assert principal_cache.get(first.user_id) == (False, None)
+    assert principal_cache.get(second.user_id) == (False, None)
+    with pytest.raises(HTTPException):
+        await get_current_officer(first_creds, db)
+    assert (await get_current_officer(second_creds, db)).officer_id == officer.officer_id
+
+
+@pytest.mark.asyncio
+async def test_core_updates_need_explicit_invalidation(db):
+    user = await create_user(db)
+    creds = await _credentials(user.user_id)
+    await get_current_user(creds, db)
+
+    await db.execute(update(User).where(User.user_id == user.user_id).values(is_active=False))
+    await db.commit()
+    # a Core UPDATE bypasses the mapper events, so the cached principal is still served
+    assert (await get_current_user(creds, db)).is_active
+    invalidate_principal(user.user_id)
+    with pytest.raises(HTTPException):
+        await get_current_user(creds, db)
+
+
+@pytest.mark.asyncio
+async def test_bad_tokens_are_rejected_without_queries(db):
+    with capture_queries() as q:
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials="not-a-jwt"), db)
+    assert exc.value.status_code == 401
+    assert q.count == 0
+
+
+def test_cache_is_bounded_lru_with_ttl(monkeypatch):
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    for uid in (1, 2):
+        cache.put(uid, None)
+    cache.get(1)
+    cache.put(3, None)
+    assert cache.get(2) == (False, None)
+    assert cache.get(1) == (True, None)
+    assert len(cache) == 2
+
+    import api.principals as principals
+    now = principals.time.monotonic()
+    monkeypatch.setattr(principals.time, "monotonic", lambda: now + 61)
+    assert cache.get(1) == (False, None)
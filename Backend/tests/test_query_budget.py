@@ -0,0 +1,135 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.middleware import QueryStatsMiddleware
+from crud import reference
+from database.query_stats import capture_queries, query_metrics
+from database.session import get_db
+from tests.utils import assert_query_budget, create_application, create_user, ensure_service, query_budget
+
+
+@pytest.mark.asyncio
+async def test_capture_counts_statements_and_commits(db):
+    with capture_queries() as stats:
+        await db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
+        await db.commit()
+    assert stats.count == 2
+    assert stats.commits == 1
+    assert stats.repeated() == [("SELECT 1", 2)]
+    # nothing is recorded outside a capture
+    await db.execute(text("SELECT 1"))
+    assert stats.count == 2
+
+
+@pytest.mark.asyncio
+async def test_create_application_query_budget(db):
+    user = await create_user(db)
+    svc = await ensure_service(db)
+    await reference.reference_data(db)
+    # application + log INSERTs and the dashboard counter upsert; the service check is served from the reference cache
+    with query_budget(3, max_commits=1):
+        await create_application(db, user.user_id, svc.service_id)
+
+
+@pytest.mark.asyncio
+async def test_query_budget_fails_when_exceeded(db):
+    with pytest.raises(pytest.fail.Exception, match="query budget exceeded"):
+        with query_budget(1):
+            for _ in range(3):
+                await db.execute(text("SELECT 1"))
+
+
+def test_middleware_reports_headers_and_metrics():
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=3)
+
+    @app.get("/loop/{n}")
+    async def loop(n: int, db: AsyncSession = Depends(get_db)):
+        for _ in range(n):
+            await db.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    query_metrics.reset()
+    with TestClient(app) as client:
+        resp = client.get("/loop/4")
+    assert resp.headers["x-db-query-count"] == "4"
+    assert float(resp.headers["x-db-time-ms"]) >= 0
+    assert_query_budget(resp, 4)
+    with pytest.raises(pytest.fail.Exception):
+        assert_query_budget(resp, 3)
+    entry = query_metrics.snapshot()["GET /loop/{n}"]
+    assert entry["requests"] == 1
+    assert entry["max_queries"] == 4
+    assert entry["n_plus_one"] == 1
+
+
+@pytest.mark.asyncio
+async def test_write_paths_commit_once(db):
+    from crud.applications import add_document
+    from crud.admin_applications import update_application_status
+    from crud.documents import set_document_verification
+    from models.lro_backend_models import ApplicationStatus, LROOfficer
+
+    if await db.get(ApplicationStatus, 2) is None:
+        db.add(ApplicationStatus(status_id=2, status_name="Under Review"))
+    user = await create_user(db)
+    svc = await ensure_service(db)
+    app_obj = await create_application(db, user.user_id, svc.service_id)
+    officer = LROOfficer(user_id=user.user_id, employee_id=f"E-{user.user_id}")
+    db.add(officer)
+    await db.commit()
+
+    # each write path also issues one dashboard counter upsert
+    with query_budget(3, max_commits=1):
+        doc = await add_document(db, app_obj.application_id, "Sales Agreement", "f.pdf", "applications/x/f.pdf")
+    with query_budget(4, max_commits=1):
+        await update_application_status(db, app_obj.application_id, 2, officer.officer_id, "ok")
+    with query_budget(4, max_commits=1):
+        await set_document_verification(db, doc.document_id, "Verified", officer.officer_id)
+
+
+@pytest.mark.asyncio
+async def test_folios_and_document_association_are_single_statements(db):
+    from sqlalchemy.future import select
+    from crud.applications import add_document, associate_documents_with_application, create_search_land_registers_details
+    from models.lro_backend_models import SearchRegisterFolios, UploadedDocuments
+
+    user = await create_user(db)
+    svc = await ensure_service(db)
+    app_obj = await create_application(db, user.user_id, svc.service_id)
+    other = await create_application(db, user.user_id, svc.service_id)
+
+    payload = {
+        'property_details': {'village': 'V'},
+        'registered_to_search': [{'division': 'D', 'volNo': str(i), 'folioNo': str(i)} for i in range(50)],
+    }
+    # register INSERT + one executemany for all 50 folios
+    with query_budget(2, max_commits=1):
+        sr = await create_search_land_registers_details(db, app_obj.application_id, payload)
+    r = await db.execute(select(SearchRegisterFolios).where(SearchRegisterFolios.search_register_id == sr.search_register_id))
+    assert len(r.scalars().all()) == 50
+
+    docs = [await add_document(db, other.application_id, "Sales Agreement", f"{i}.pdf", f"p/{i}.pdf") for i in range(3)]
+    with query_budget(1, max_commits=1):
+        updated = await associate_documents_with_application(db, app_obj.application_id, [d.document_id for d in docs])
+    assert updated == 3
+    r = await db.execute(select(UploadedDocuments.application_id).where(UploadedDocuments.document_id.in_([d.document_id for d in docs])))
+    assert set(r.scalars().all()) == {app_obj.application_id}
+
+
+def test_internal_metrics_require_an_officer():
+    from api.principals import get_current_officer
+    from main import app
+
+    with TestClient(app) as client:
+        assert client.get('/api/internal/metrics/queries').status_code in (401, 403)
+        app.dependency_overrides[get_current_officer] = lambda: object()
+        try:
+            for name in ('db-pool', 'queries', 'password-hashing', 'rate-limit'):
+                assert client.get(f'/api/internal/metrics/{name}').status_code == 200
+        finally:
+            app.dependency_overrides.pop(get_current_officer, None)
@@ -0,0 +1,73 @@
+"""Plan snapshots for every statement issued by crud/* (workload in tools/explain_crud.py).
+
+A crud or model change that alters a plan fails here; after checking the new plans with
+`python tools/explain_crud.py`, refresh the snapshot with `UPDATE_QUERY_PLANS=1 pytest tests/test_query_plans.py`.
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from database import session as db_session
+from database.explain import _postgres_plan, _sqlite_plan, plan_snapshot
+from database.migrations import ensure_schema
+from tools.explain_crud import collect_plans
+
+SNAPSHOT = Path(__file__).parent / "query_plans" / "sqlite.json"
+
+
+@pytest_asyncio.fixture
+async def plans(tmp_path):
+    engine = db_session._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'plans.sqlite3'}", False, None)
+    try:
+        await ensure_schema(engine)
+        yield await collect_plans(engine)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_crud_queries_have_no_full_scans(plans):
+    scans = {p.label: p.full_scans for p in plans if p.full_scans}
+    assert scans == {}
+
+
+@pytest.mark.asyncio
+async def test_crud_query_plans_match_snapshot(plans):
+    current = plan_snapshot(plans)
+    if os.getenv("UPDATE_QUERY_PLANS"):
+        SNAPSHOT.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n")
+    expected = json.loads(SNAPSHOT.read_text())
+    assert current == expected
+
+
+def test_sqlite_plan_classification():
+    rows = [
+        (2, 0, 0, "SCAN payments"),
+        (5, 0, 0, "SEARCH applications USING INTEGER PRIMARY KEY (rowid=?)"),
+        (9, 0, 0, "SCAN uploaded_documents USING INDEX ix_uploaded_documents_uploaded_at_id"),
+        (12, 0, 0, "USE TEMP B-TREE FOR ORDER BY"),
+    ]
+    lines, scans, sorts = _sqlite_plan(rows)
+    assert scans == ["payments"]
+    assert sorts == 1
+    assert lines[0] == "SCAN payments"
+
+
+def test_postgres_plan_classification():
+    document = [{"Plan": {
+        "Node Type": "Sort",
+        "Plans": [{
+            "Node Type": "Nested Loop",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "payments"},
+                {"Node Type": "Index Scan", "Relation Name": "applications", "Index Name": "applications_pkey"},
+            ],
+        }],
+    }}]
+    lines, scans, sorts = _postgres_plan(json.dumps(document))
+    assert scans == ["payments"]
+    assert sorts == 1
+    assert lines == ["Sort", "  Nested Loop", "    Seq Scan on payments", "    Index Scan on applications using applications_pkey"]
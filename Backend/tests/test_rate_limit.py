@@ -0,0 +1,144 @@
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from api.rate_limit import AuthRateLimiter, MemoryBackend, Rule, SharedMemoryBackend, parse_rule
+from schemas.user_schemas import UserLoginRequest
+from tests.utils import make_request
+
+
+def test_parse_rule():
+    assert parse_rule("30/60") == Rule(30.0, 0.5)
+    assert parse_rule("5") == Rule(5.0, 5.0)
+    assert parse_rule("off") is None and parse_rule("0") is None
+    with pytest.raises(ValueError):
+        parse_rule("-1/10")
+
+
+def test_bucket_empties_and_refills():
+    backend = MemoryBackend()
+    rule = Rule(2, 0.5)
+    assert backend.take(["k"], [rule], 100.0) == [0.0]
+    assert backend.take(["k"], [rule], 100.0) == [0.0]
+    assert backend.take(["k"], [rule], 100.0) == [2.0]
+    assert backend.take(["k"], [rule], 101.0) == [1.0]
+    assert backend.take(["k"], [rule], 102.0) == [0.0]
+
+
+def test_rejected_attempt_takes_no_tokens():
+    backend = MemoryBackend()
+    ip, email = Rule(1, 0.1), Rule(5, 0.1)
+    assert not any(backend.take(["ip", "email"], [ip, email], 0.0))
+    waits = backend.take(["ip", "email"], [ip, email], 0.0)
+    assert waits[0] > 0 and waits[1] == 0.0
+    # the email bucket still holds its remaining 4 tokens
+    assert [backend.take(["email"], [email], 0.0) for _ in range(5)][-1][0] > 0
+
+
+def test_limiter_counts_and_normalises_keys():
+    limiter = AuthRateLimiter(MemoryBackend(), limits={("login", "email"): Rule(1, 0.01)}, enabled=True)
+    assert limiter.check("login", email="A@Example.com") == 0.0
+    assert limiter.check("login", email=" a@example.COM ") > 0
+    stats = limiter.stats()
+    assert stats["allowed"]["login"] == 1
+    assert stats["rejected"]["login"] == 1
+    assert stats["limited"]["login"]["email"] == 1
+
+
+def test_shared_memory_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "buckets")
+    a, b = SharedMemoryBackend(path, slots=64), SharedMemoryBackend(path, slots=64)
+    rule = Rule(3, 0.001)
+    try:
+        assert a.take(["k"], [rule], 0.0) == [0.0]
+        assert b.take(["k"], [rule], 0.0) == [0.0]
+        assert a.take(["k"], [rule], 0.0) == [0.0]
+        assert b.take(["k"], [rule], 0.0)[0] > 0
+        # many keys in a small table: lookups still find their own bucket or reuse an old one
+        for i in range(200):
+            a.take([f"key-{i}"], [rule], float(i))
+    finally:
+        a.close()
+        b.close()
+
+
+def test_shared_memory_tables_are_per_slot_count_and_never_shrunk(tmp_path):
+    import os
+
+    path = str(tmp_path / "buckets")
+    small, large = SharedMemoryBackend(path, slots=64), SharedMemoryBackend(path, slots=128)
+    rule = Rule(1, 0.001)
+    try:
+        assert small.take(["k"], [rule], 0.0) == [0.0]
+        # another slot count opens its own table instead of resetting this one
+        assert large.take(["k"], [rule], 0.0) == [0.0]
+        assert small.take(["k"], [rule], 0.0)[0] > 0
+        assert small.path != large.path
+    finally:
+        small.close()
+        large.close()
+
+    # a table file that is longer than expected or has a stale header is reused at its size
+    with open(path + ".64", "r+b") as f:
+        f.write(b"OLDMAGIC")
+        f.truncate(small.size + 4096)
+    again = SharedMemoryBackend(path, slots=64)
+    try:
+        assert again.take(["k"], [rule], 0.0) == [0.0]
+        assert os.path.getsize(path + ".64") == small.size + 4096
+    finally:
+        again.close()
+
+
+def test_shared_memory_backend_across_processes(tmp_path):
+    path = tmp_path / "buckets"
+    script = (
+        "import sys\n"
+        "from api.rate_limit import Rule, SharedMemoryBackend\n"
+        "b = SharedMemoryBackend(sys.argv[1], slots=64)\n"
+        "print(sum(1 for _ in range(50) if not any(b.take(['ip:1.2.3.4'], [Rule(60, 0.0001)], 0.0))))\n"
+    )
+    backend_dir = Path(__file__).resolve().parents[1]
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, str(path)], cwd=backend_dir, stdout=subprocess.PIPE, text=True)
+        for _ in range(3)
+    ]
+    allowed = sum(int(p.communicate(timeout=60)[0].strip()) for p in procs)
+    assert allowed == 60
+
+
+@pytest.mark.asyncio
+async def test_login_returns_429_with_retry_after(db, monkeypatch):
+    user_auth = importlib.import_module('api.v1.endpoints.user_auth')
+    limiter = AuthRateLimiter(MemoryBackend(), limits={("login", "email"): Rule(2, 0.1)}, enabled=True)
+    monkeypatch.setattr(user_auth, "auth_rate_limiter", limiter)
+    payload = UserLoginRequest(email="nobody-ratelimit@example.com")
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            await user_auth.login(payload, make_request("10.0.0.1"), db)
+        assert exc.value.status_code == 401
+    with pytest.raises(HTTPException) as exc:
+        await user_auth.login(payload, make_request("10.0.0.2"), db)
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "10"
+
+
+@pytest.mark.asyncio
+async def test_login_is_limited_per_client_ip(db, monkeypatch):
+    user_auth = importlib.import_module('api.v1.endpoints.user_auth')
+    limiter = AuthRateLimiter(MemoryBackend(), limits={("login", "ip"): Rule(1, 0.1)}, enabled=True)
+    monkeypatch.setattr(user_auth, "auth_rate_limiter", limiter)
+    with pytest.raises(HTTPException) as exc:
+        await user_auth.login(UserLoginRequest(email="first-ip@example.com"), make_request("10.0.0.3"), db)
+    assert exc.value.status_code == 401
+    # a different account from the same address spends the same per-IP bucket
+    with pytest.raises(HTTPException) as exc:
+        await user_auth.login(UserLoginRequest(email="second-ip@example.com"), make_request("10.0.0.3"), db)
+    assert exc.value.status_code == 429
+    with pytest.raises(HTTPException) as exc:
+        await user_auth.login(UserLoginRequest(email="second-ip@example.com"), make_request("10.0.0.4"), db)
+    assert exc.value.status_code == 401
@@ -0,0 +1,74 @@
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.future import select
+
+from database import session as db_session
+from models.lro_backend_models import create_all_tables_via_url
+from models.services import Services
+
+
+async def _service_codes(session):
+    r = await session.execute(select(Services.service_code))
+    return set(r.scalars().all())
+
+
+@pytest_asyncio.fixture
+async def replica(tmp_path):
+    """Second SQLite file standing in for a read replica of the test DB."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'replica.sqlite3'}"
+    await create_all_tables_via_url(url)
+    db_session.init_read_engine(url)
+    code = f"REPL{uuid.uuid4().hex[:8]}"
+    Session = db_session._read_session
+    async with Session() as session:
+        session.add(Services(service_name="Replica only", service_code=code, base_fee=0))
+        await session.commit()
+    yield code
+    await db_session.dispose_read_engine()
+
+
+async def _read_codes():
+    gen = db_session.get_read_db()
+    session = await gen.__anext__()
+    try:
+        return await _service_codes(session)
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_falls_back_to_primary_without_replica():
+    assert db_session._read_engine is None
+    assert await db_session.get_read_sessionmaker() is db_session.get_sessionmaker()
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_uses_replica(replica):
+    assert replica in await _read_codes()
+    # the primary never saw the replica-only row
+    async with db_session.get_sessionmaker()() as primary:
+        assert replica not in await _service_codes(primary)
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_routes_to_primary(replica, monkeypatch):
+    async def _lagging(engine):
+        return 60.0
+
+    monkeypatch.setenv('DB_REPLICA_MAX_LAG_SECONDS', '5')
+    monkeypatch.setattr(db_session, '_measure_replica_lag', _lagging)
+    db_session._replica_lag_checked_at = None
+    assert replica not in await _read_codes()
+    assert db_session.get_pool_stats()['replica']['lag_seconds'] == 60.0
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_routes_to_primary(replica, monkeypatch):
+    async def _down(engine):
+        return None
+
+    monkeypatch.setattr(db_session, '_measure_replica_lag', _down)
+    db_session._replica_lag_checked_at = None
+    assert await db_session.get_read_sessionmaker() is db_session.get_sessionmaker()
@@ -0,0 +1,80 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud import reference
+from database import session as db_session
+from database.migrations import ensure_schema
+from database.query_stats import capture_queries
+from models.lro_backend_models import Services
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = db_session._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'ref.sqlite3'}", False, None)
+    await ensure_schema(engine)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_served_from_cache_after_preload(engine):
+    data = await reference.preload(engine)
+    assert data.statuses[1] == 'Pending'
+    async with async_sessionmaker(engine)() as db:
+        with capture_queries() as q:
+            assert await reference.get_status_name(db, 4) == 'Rejected'
+            assert (await reference.get_service(db, 1)).service_code == 'LT'
+            assert await reference.get_office_name(db, 99) is None
+        assert q.count == 0
+
+
+@pytest.mark.asyncio
+async def test_orm_writes_invalidate_and_bump_version(engine):
+    first = await reference.preload(engine)
+    async with async_sessionmaker(engine)() as db:
+        db.add(Services(service_id=2, service_name='Search', service_code='SR', base_fee=0))
+        await db.commit()
+        svc = await reference.get_service(db, 2)
+        assert svc is not None and svc.service_name == 'Search'
+        assert (await reference.reference_data(db)).version > first.version
+
+
+@pytest.mark.asyncio
+async def test_miss_reload_is_throttled_and_ttl_expires(engine, monkeypatch):
+    cache = reference.cache_for(engine)
+    await reference.preload(engine)
+    loads = cache.loads
+    async with async_sessionmaker(engine)() as db:
+        for _ in range(5):
+            assert await reference.get_service(db, 12345) is None
+        # snapshot is younger than MISS_RELOAD_SECONDS, so unknown ids do not trigger reloads
+        assert cache.loads == loads
+
+        monkeypatch.setattr(reference, 'MISS_RELOAD_SECONDS', 0.0)
+        assert await reference.get_service(db, 12345) is None
+        assert cache.loads == loads + 1
+
+        monkeypatch.setattr(cache, 'ttl', 0.0)
+        await reference.reference_data(db)
+        assert cache.loads == loads + 2
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_reference_rows_are_not_shared(engine):
+    await reference.preload(engine)
+    cache = reference.cache_for(engine)
+    Session = async_sessionmaker(engine)
+    async with Session() as writer:
+        writer.add(Services(service_id=3, service_name='Draft', service_code='DR', base_fee=0))
+        await writer.flush()
+        # the writing transaction sees its own row, but the snapshot it loaded is not cached
+        assert (await reference.get_service(writer, 3)).service_name == 'Draft'
+        assert cache._data is None
+        async with Session() as reader:
+            assert await reference.get_service(reader, 3) is None
+        # the reader cached the committed state; the rollback drops that snapshot too
+        await writer.rollback()
+        assert cache._data is None
+    async with Session() as reader:
+        assert await reference.get_service(reader, 3) is None
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import importlib
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from crud import upload_sessions
+from database.session import get_sessionmaker
+from main import app
+from models.lro_backend_models import UploadSession
+from tools import minio_storage
+
+user_uploads = importlib.import_module('api.v1.endpoints.user_uploads')
+
+DATA = os.urandom(300_000)
+
+
+def _create_user_and_app():
+    async def _inner():
+        Session = get_sessionmaker()
+        async with Session() as session:
+            from models.services import Services
+            svc = await session.get(Services, 1)
+            if svc is None:
+                svc = Services(service_name='Test Service', service_code='TEST', base_fee=0)
+                session.add(svc)
+                await session.commit()
+                await session.refresh(svc)
+
+            from crud.users import create_user
+            from crud.applications import create_application
+            suffix = uuid.uuid4().hex[:8]
+            user = await create_user(session, 'Resumable User', f"123456{suffix}V", f"resume+{suffix}@example.com", 'password', '0712345678')
+            app_obj = await create_application(session, user.user_id, svc.service_id, None)
+            return user, app_obj
+    return asyncio.run(_inner())
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    from api.v1.endpoints.user_auth import get_current_user
+    monkeypatch.chdir(tmp_path)
+    user, app_obj = _create_user_and_app()
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        c = TestClient(app)
+        c.user, c.app_obj = user, app_obj
+        yield c
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+def _create(client, data=DATA, **extra):
+    body = {
+        'application_id': client.app_obj.application_id,
+        'document_type': 'Sales Agreement',
+        'file_name': 'deed.pdf',
+        'size': len(data),
+        **extra,
+    }
+    return client.post('/api/user/documents/uploads', json=body)
+
+
+def test_resumable_upload_round_trip(client, tmp_path):
+    resp = _create(client, sha256=hashlib.sha256(DATA).hexdigest())
+    assert resp.status_code == 201
+    upload_id = resp.json()['upload_id']
+    url = f'/api/user/documents/uploads/{upload_id}'
+
+    resp = client.patch(url, content=DATA[:100_000], headers={'Upload-Offset': '0'})
+    assert resp.status_code == 200 and resp.json()['offset'] == 100_000
+
+    # a retried chunk at a stale offset is refused with the resume point
+    resp = client.patch(url, content=DATA[:100_000], headers={'Upload-Offset': '0'})
+    assert resp.status_code == 409
+    assert resp.headers['Upload-Offset'] == '100000' and resp.json()['detail']['offset'] == 100_000
+
+    resp = client.get(url)
+    assert resp.headers['Upload-Offset'] == '100000'
+    assert client.post(f'{url}/finalize').status_code == 409
+
+    resp = client.patch(url, content=DATA[100_000:], headers={'Upload-Offset': '100000'})
+    assert resp.json()['offset'] == len(DATA)
+
+    resp = client.post(f'{url}/finalize')
+    assert resp.status_code == 200, resp.text
+    doc = resp.json()
+    assert doc['sha256'] == hashlib.sha256(DATA).hexdigest() and doc['size_bytes'] == len(DATA)
+    assert (tmp_path / 'uploaded_documents' / doc['file_path']).read_bytes() == DATA
+    assert not os.path.exists(minio_storage.staging_path(upload_id))
+
+    # finalize is idempotent; further chunks are refused
+    assert client.post(f'{url}/finalize').json()['document_id'] == doc['document_id']
+    assert client.patch(url, content=b'x', headers={'Upload-Offset': str(len(DATA))}).status_code == 409
+
+
+def test_limits_and_checksum(client):
+    limit = user_uploads.DOCUMENT_TYPE_LIMITS['Photo ID (Buyer & Seller)']
+    assert _create(client, document_type='Photo ID (Buyer & Seller)', size=limit + 1).status_code == 413
+    assert _create(client, file_name='../x.pdf').status_code == 422
+
+    upload_id = _create(client, data=b'abc', sha256='0' * 64).json()['upload_id']
+    url = f'/api/user/documents/uploads/{upload_id}'
+    assert client.patch(url, content=b'abcd', headers={'Upload-Offset': '0'}).status_code == 413
+    assert client.get(url).json()['offset'] == 0
+    assert client.patch(url, content=b'abc', headers={'Upload-Offset': '0'}).json()['offset'] == 3
+
+    resp = client.post(f'{url}/finalize')
+    assert resp.status_code == 422
+    # the bad upload is discarded and the session starts over
+    assert client.get(url).json()['offset'] == 0
+
+    assert client.delete(url).status_code == 204
+    assert client.get(url).status_code == 404
+
+
+def test_dropped_connection_keeps_received_bytes(client):
+    upload_id = _create(client).json()['upload_id']
+    messages = [
+        {'type': 'http.request', 'body': DATA[:70_000], 'more_body': True},
+        {'type': 'http.request', 'body': DATA[70_000:120_000], 'more_body': True},
+        {'type': 'http.disconnect'},
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    async def _call():
+        request = Request({'type': 'http', 'method': 'PATCH', 'headers': []}, receive)
+        async with get_sessionmaker()() as db:
+            return await user_uploads.append_chunk(upload_id, request, Response(), upload_offset=0, db=db, current_user=client.user)
+
+    assert asyncio.run(_call()).offset == 120_000
+    resp = client.patch(f'/api/user/documents/uploads/{upload_id}', content=DATA[120_000:], headers={'Upload-Offset': '120000'})
+    assert resp.json()['offset'] == len(DATA)
+    assert client.post(f'/api/user/documents/uploads/{upload_id}/finalize').json()['sha256'] == hashlib.sha256(DATA).hexdigest()
+
+
+def test_lease_and_expiry(client):
+    upload_id = _create(client).json()['upload_id']
+    user_id = client.user.user_id
+
+    async def _run():
+        async with get_sessionmaker()() as db:
+            token = await upload_sessions.claim(db, upload_id, user_id, 0)
+            assert token is not None
+            # one writer at a time, whichever worker the second request lands on
+            assert await upload_sessions.claim(db, upload_id, user_id, 0) is None
+            assert await upload_sessions.renew(db, upload_id, token)
+            await upload_sessions.release(db, upload_id, token)
+            assert not await upload_sessions.renew(db, upload_id, token)
+
+            f = minio_storage.open_staging(upload_id, 0)
+            f.write(b'partial')
+            minio_storage.close_staging(f)
+            session = await db.get(UploadSession, upload_id)
+            session.expires_at = datetime.utcnow() - timedelta(seconds=1)
+            await db.commit()
+            assert await upload_sessions.get_session(db, upload_id, user_id) is None
+
+    asyncio.run(_run())
+    # creating a session sweeps expired ones and their staging data
+    _create(client)
+    assert not os.path.exists(minio_storage.staging_path(upload_id))
+    assert client.get(f'/api/user/documents/uploads/{upload_id}').status_code == 404
@@ -13,8 +13,11 @@ def test_expected_routes_present():
         "/api/user/applications",
         "/api/user/payments",
         "/api/user/documents",
+        "/api/user/documents/uploads",
         "/api/admin/applications",
         "/api/admin/documents",
+        "/api/admin/stats",
+        "/api/admin/exports",
     ]
     for p in expected_prefixes:
         assert any(path.startswith(p) for path in paths), f"Expected route starting with {p} not found"
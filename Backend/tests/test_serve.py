@@ -0,0 +1,33 @@
+import importlib.util
+
+import serve
+
+
+def test_server_settings_from_env(monkeypatch):
+    monkeypatch.setenv("SERVER_WORKERS", "3")
+    monkeypatch.setenv("SERVER_BACKLOG", "4096")
+    monkeypatch.setenv("SERVER_KEEPALIVE_SECONDS", "75")
+    monkeypatch.setenv("SERVER_MAX_REQUESTS", "0")
+    settings = serve.get_server_settings()
+    assert settings["workers"] == 3
+    assert settings["max_requests"] is None
+    options = serve.uvicorn_options(settings)
+    assert options["backlog"] == 4096
+    assert options["timeout_keep_alive"] == 75
+    assert options["lifespan"] == "on"
+
+
+def test_prefers_uvloop_and_httptools_when_installed():
+    loop, http = serve.event_loop_and_http()
+    assert (loop == "uvloop") == bool(importlib.util.find_spec("uvloop"))
+    assert (http == "httptools") == bool(importlib.util.find_spec("httptools"))
+
+
+def test_connection_budget_warning(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "10")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "5")
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "100")
+    assert serve.check_connection_budget(6) is None
+    assert "105" in serve.check_connection_budget(7)
+    monkeypatch.delenv("DB_MAX_CONNECTIONS")
+    assert serve.check_connection_budget(64) is None
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import text
+
+from database import session as db_session
+from database.sqlite_profile import get_sqlite_settings, is_file_database, sqlite_pragmas
+
+
+def test_pragmas_skip_journal_mode_for_memory():
+    settings = get_sqlite_settings()
+    assert is_file_database('sqlite+aiosqlite:///./db.sqlite3')
+    assert not is_file_database('sqlite+aiosqlite:///:memory:')
+    assert any(p.startswith('PRAGMA journal_mode') for p in sqlite_pragmas(settings, True))
+    assert not any(p.startswith('PRAGMA journal_mode') for p in sqlite_pragmas(settings, False))
+
+
+@pytest.mark.asyncio
+async def test_profile_applied_to_every_connection(tmp_path, monkeypatch):
+    monkeypatch.setenv('SQLITE_BUSY_TIMEOUT_MS', '7000')
+    url = f"sqlite+aiosqlite:///{tmp_path / 'profile.sqlite3'}"
+    engine = db_session._create_engine(url, False, None, sqlite_profile=True)
+    try:
+        async with engine.connect() as conn1, engine.connect() as conn2:
+            for conn in (conn1, conn2):
+                assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == 'wal'
+                # NORMAL == 1
+                assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+                assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 7000
+                # MEMORY == 2
+                assert (await conn.execute(text("PRAGMA temp_store"))).scalar() == 2
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_profile_disabled_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv('SQLITE_PERFORMANCE_PROFILE', raising=False)
+    url = f"sqlite+aiosqlite:///{tmp_path / 'plain.sqlite3'}"
+    engine = db_session._create_engine(url, False, None)
+    try:
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == 'delete'
+    finally:
+        await engine.dispose()
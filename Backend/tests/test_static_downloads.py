@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import importlib
+import io
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.responses import StoredFileResponse
+from main import app
+from tools import minio_storage
+
+internal_static = importlib.import_module('api.v1.endpoints.internal_static')
+
+DATA = bytes(range(256)) * 400
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    minio_storage.save_stream('applications/7/deed.pdf', io.BytesIO(DATA))
+    return TestClient(app)
+
+
+URL = '/api' + minio_storage.generate_presigned_url('applications/7/deed.pdf')
+
+
+def test_etag_and_conditional_requests(client):
+    resp = client.get(URL)
+    assert resp.status_code == 200 and resp.content == DATA
+    etag = resp.headers['etag']
+    assert etag == f'"{hashlib.sha256(DATA).hexdigest()}"'
+    # never cached past the link's expiry
+    max_age = int(resp.headers['cache-control'].split('max-age=')[1])
+    assert resp.headers['cache-control'].startswith('private') and 0 < max_age <= 360
+    assert resp.headers['accept-ranges'] == 'bytes'
+
+    assert client.get(URL, headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(URL, headers={'If-None-Match': f'W/{etag}'}).status_code == 304
+    assert client.get(URL, headers={'If-Modified-Since': resp.headers['last-modified']}).status_code == 304
+    assert client.get(URL, headers={'If-None-Match': '"other"'}).status_code == 200
+    assert client.get(URL, headers={'If-Match': '"other"'}).status_code == 412
+    assert client.get(URL, headers={'If-Match': etag}).status_code == 200
+
+    head = client.head(URL)
+    assert head.status_code == 200 and head.content == b'' and head.headers['content-length'] == str(len(DATA))
+
+
+def test_range_requests(client):
+    etag = client.get(URL).headers['etag']
+
+    resp = client.get(URL, headers={'Range': 'bytes=1000-1999'})
+    assert resp.status_code == 206 and resp.content == DATA[1000:2000]
+    assert resp.headers['content-range'] == f'bytes 1000-1999/{len(DATA)}'
+
+    resp = client.get(URL, headers={'Range': 'bytes=0-9,-10'})
+    assert resp.status_code == 206
+    assert resp.headers['content-type'].startswith('multipart/byteranges')
+    assert DATA[:10] in resp.content and DATA[-10:] in resp.content
+
+    # If-Range: the range only applies while the client's copy is current
+    assert client.get(URL, headers={'Range': 'bytes=0-9', 'If-Range': etag}).status_code == 206
+    resp = client.get(URL, headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert resp.status_code == 200 and resp.content == DATA
+
+    assert client.get(URL, headers={'Range': f'bytes={len(DATA)}-'}).status_code == 416
+
+
+def test_multi_range_headers_already_in_place_are_left_alone(monkeypatch, tmp_path):
+    from starlette.responses import FileResponse
+
+    async def well_formed(self, send, ranges, file_size, send_header_only):
+        await send({"type": "http.response.start", "status": 206,
+                    "headers": [(b"content-type", b"multipart/byteranges; boundary=x")]})
+
+    monkeypatch.setattr(FileResponse, "_handle_multiple_ranges", well_formed)
+    path = tmp_path / 'f'
+    path.write_bytes(DATA)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(StoredFileResponse(str(path))._handle_multiple_ranges(send, [(0, 1), (5, 6)], len(DATA), False))
+    assert sent[0]["headers"] == [(b"content-type", b"multipart/byteranges; boundary=x")]
+
+
+def test_files_without_recorded_hash_get_stat_etag(client, tmp_path):
+    legacy = tmp_path / 'uploaded_documents' / 'applications' / '7' / 'old.pdf'
+    legacy.write_bytes(b'old')
+    st = os.stat(legacy)
+    resp = client.get('/api' + minio_storage.generate_presigned_url('applications/7/old.pdf'))
+    assert resp.headers['etag'] == f'"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"'
+    assert client.get('/api' + minio_storage.generate_presigned_url('applications/7')).status_code == 404
+
+
+def test_proxy_offload(client, monkeypatch):
+    monkeypatch.setattr(internal_static, 'STATIC_OFFLOAD', 'x-accel-redirect')
+    resp = client.get(URL)
+    assert resp.status_code == 200 and resp.content == b''
+    assert resp.headers['x-accel-redirect'] == '/protected-uploads/applications/7/deed.pdf'
+    assert resp.headers['etag'] == f'"{hashlib.sha256(DATA).hexdigest()}"'
+    # conditional requests are still answered here
+    assert client.get(URL, headers={'If-None-Match': resp.headers['etag']}).status_code == 304
+
+    monkeypatch.setattr(internal_static, 'STATIC_OFFLOAD', 'x-sendfile')
+    resp = client.get(URL)
+    assert resp.headers['x-sendfile'] == os.path.abspath(os.path.join('uploaded_documents', 'applications', '7', 'deed.pdf'))
+
+
+def test_zerocopy_extension_is_used_when_offered(client, tmp_path):
+    path = str(tmp_path / 'uploaded_documents' / 'applications' / '7' / 'deed.pdf')
+    sent = []
+
+    async def send(message):
+        if message['type'] == 'http.response.zerocopy':
+            message = dict(message, body=os.pread(message['file'].fileno(), message['count'], message['offset']))
+        sent.append(message)
+
+    async def receive():
+        return {'type': 'http.disconnect'}
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': '/', 'headers': [(b'range', b'bytes=10-19')],
+        'extensions': {'http.response.zerocopy': {}},
+    }
+    asyncio.run(StoredFileResponse(path)(scope, receive, send))
+    assert sent[0]['status'] == 206
+    assert sent[1]['type'] == 'http.response.zerocopy' and sent[1]['body'] == DATA[10:20]
@@ -0,0 +1,60 @@
+import hashlib
+import io
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud import blobs
+from crud.applications import add_document, create_application
+from crud.documents import delete_document
+from crud.users import create_user
+from database import session as db_session
+from database.migrations import ensure_schema
+from models.lro_backend_models import StorageBlob, UploadedDocuments
+from tools import minio_storage
+
+
+@pytest_asyncio.fixture
+async def sessionmaker(tmp_path):
+    engine = db_session._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'blobs.sqlite3'}", False, None)
+    await ensure_schema(engine)
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+async def _ref_counts(db):
+    r = await db.execute(select(StorageBlob.sha256, StorageBlob.ref_count))
+    return dict(r.all())
+
+
+@pytest.mark.asyncio
+async def test_document_rows_count_blob_references(sessionmaker, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    data = b"same NIC scan"
+    sha = hashlib.sha256(data).hexdigest()
+    async with sessionmaker() as db:
+        user = await create_user(db, "Blob User", "991234567V", "blob@example.com", "pw", "0711111111")
+        apps = [await create_application(db, user.user_id, 1, None) for _ in range(2)]
+        docs = []
+        for app in apps:
+            key = f"applications/{app.application_id}/nic.pdf"
+            stored = minio_storage.save_stream(key, io.BytesIO(data), content_addressed=True)
+            docs.append(await add_document(db, app.application_id, "Photo ID (Buyer & Seller)", "nic.pdf", key, sha256=stored.sha256, size_bytes=stored.size))
+        assert await _ref_counts(db) == {sha: 2}
+
+        await delete_document(db, docs[0].document_id)
+        assert minio_storage.delete_object(docs[0].file_path)
+        assert await _ref_counts(db) == {sha: 1}
+        assert await blobs.referenced_blobs(db, [sha]) == {sha}
+
+        # plain SQL (or ON DELETE CASCADE from applications) bypasses crud; the rebuild recounts from uploaded_documents
+        await db.execute(delete(UploadedDocuments).where(UploadedDocuments.document_id == docs[1].document_id))
+        await db.commit()
+        assert await _ref_counts(db) == {sha: 1}
+        await blobs.rebuild_refcounts(db)
+        assert await _ref_counts(db) == {}
+        assert await blobs.referenced_blobs(db, [sha]) == set()
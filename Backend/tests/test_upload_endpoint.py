@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 from main import app
+import hashlib
 import io
 import importlib
 import datetime
@@ -66,6 +67,111 @@ def test_upload_endpoint_db(monkeypatch, tmp_path):
     assert body.get('file_name') == 'file.pdf'
     assert body.get('document_type') == 'Sales Agreement'
     assert 'download_url' in body
+    assert body.get('sha256') == hashlib.sha256(b'hello world').hexdigest()
+    assert body.get('size_bytes') == 11
 
     # cleanup override
     app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_upload_over_type_limit_is_rejected(monkeypatch, tmp_path):
+    from api.v1.endpoints.user_auth import get_current_user
+    user_documents = importlib.import_module('api.v1.endpoints.user_documents')
+
+    client = TestClient(app)
+    user, app_obj = _create_user_and_app()
+    app.dependency_overrides[get_current_user] = lambda: user
+    monkeypatch.chdir(tmp_path)
+    limit = user_documents.DOCUMENT_TYPE_LIMITS['Photo ID (Buyer & Seller)']
+    try:
+        resp = client.post(
+            '/api/user/documents/upload',
+            data={'application_id': str(app_obj.application_id), 'document_type': 'Photo ID (Buyer & Seller)'},
+            files={'file': ('id.jpg', io.BytesIO(b'x' * (limit + 1)), 'image/jpeg')},
+        )
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+    assert resp.status_code == 413
+    stored = tmp_path / 'uploaded_documents' / 'applications' / str(app_obj.application_id)
+    assert not stored.exists() or list(stored.iterdir()) == []
+
+
+
+def test_upload_file_name_cannot_escape_the_application_folder(monkeypatch, tmp_path):
+    from api.v1.endpoints.user_auth import get_current_user
+
+    client = TestClient(app)
+    user, app_obj = _create_user_and_app()
+    app.dependency_overrides[get_current_user] = lambda: user
+    monkeypatch.chdir(tmp_path)
+    victim = tmp_path / 'uploaded_documents' / '.cas' / 'ab' / 'cd' / ('abcd' + '0' * 60)
+    victim.parent.mkdir(parents=True)
+    victim.write_bytes(b'victim')
+    try:
+        resp = client.post(
+            '/api/user/documents/upload',
+            data={'application_id': str(app_obj.application_id), 'document_type': 'Sales Agreement'},
+            files={'file': ('x/../../../.cas/ab/cd/abcd' + '0' * 60, io.BytesIO(b'attacker'), 'application/pdf')},
+        )
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body['file_name'] == 'abcd' + '0' * 60
+        assert body['file_path'].startswith(f'applications/{app_obj.application_id}/')
+        assert victim.read_bytes() == b'victim'
+
+        resp = client.post(
+            '/api/user/documents/upload',
+            data={'application_id': str(app_obj.application_id), 'document_type': 'Sales Agreement'},
+            files={'file': ('..', io.BytesIO(b'x'), 'application/pdf')},
+        )
+        assert resp.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+def test_body_size_limit_middleware():
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from api.middleware import BodySizeLimitMiddleware
+
+    async def echo(request: Request):
+        return PlainTextResponse(str(len(await request.body())))
+
+    inner = Starlette(routes=[Route('/upload', echo, methods=['POST']), Route('/other', echo, methods=['POST'])])
+    client = TestClient(BodySizeLimitMiddleware(inner, limits={'/upload': 100}))
+
+    assert client.post('/upload', content=b'x' * 100).text == '100'
+    # declared Content-Length over the limit: refused without reading the body
+    assert client.post('/upload', content=b'x' * 101).status_code == 413
+    # no Content-Length (chunked): refused once the streamed bytes pass the limit
+    resp = client.post('/upload', content=iter([b'x' * 60, b'x' * 60]))
+    assert resp.status_code == 413
+    assert client.post('/other', content=b'x' * 1000).text == '1000'
+
+
+def test_download_url_only_for_the_owner(monkeypatch, tmp_path):
+    from api.v1.endpoints.user_auth import get_current_user
+
+    client = TestClient(app)
+    owner, app_obj = _create_user_and_app()
+    other, _ = _create_user_and_app()
+    monkeypatch.chdir(tmp_path)
+    try:
+        app.dependency_overrides[get_current_user] = lambda: owner
+        doc = client.post(
+            '/api/user/documents/upload',
+            data={'application_id': str(app_obj.application_id), 'document_type': 'Sales Agreement'},
+            files={'file': ('deed.pdf', io.BytesIO(b'deed'), 'application/pdf')},
+        ).json()
+        resp = client.get(f"/api/user/documents/{doc['document_id']}/download")
+        assert resp.status_code == 200 and resp.json()['download_url'].startswith('/internal/static/')
+        listed = client.get(f'/api/user/applications/{app_obj.application_id}/documents')
+        assert listed.status_code == 200 and listed.json()[0]['download_url']
+
+        # another user learns nothing, and gets no signed URL
+        app.dependency_overrides[get_current_user] = lambda: other
+        assert client.get(f"/api/user/documents/{doc['document_id']}/download").status_code == 404
+        assert client.get(f'/api/user/applications/{app_obj.application_id}/documents').status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
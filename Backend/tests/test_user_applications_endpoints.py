@@ -55,3 +55,36 @@ def test_create_and_get_application():
 
     # cleanup override
     app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_create_application_with_details_commits_once():
+    client = TestClient(app)
+    user, svc = _create_user_and_service()
+
+    from api.v1.endpoints.user_auth import get_current_user
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        payload = {
+            'service_id': svc.service_id,
+            'seller': {'fullName': 'Seller One', 'id': '111V'},
+            'buyer': {'fullName': 'Buyer Two', 'id': '222V'},
+        }
+        resp = client.post('/api/user/applications/', json=payload)
+        assert resp.status_code == 201
+        # application, its log row and the land-transfer details share one transaction
+        assert resp.headers['x-db-commit-count'] == '1'
+        app_id = resp.json()['application_id']
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    async def _load():
+        from sqlalchemy.future import select
+        from models.lro_backend_models import AppLandTransfer, ApplicationLog
+        async with get_sessionmaker()() as session:
+            lt = (await session.execute(select(AppLandTransfer).where(AppLandTransfer.application_id == app_id))).scalars().first()
+            logs = (await session.execute(select(ApplicationLog).where(ApplicationLog.application_id == app_id))).scalars().all()
+            return lt, logs
+
+    lt, logs = asyncio.run(_load())
+    assert lt is not None and lt.seller_full_name == 'Seller One'
+    assert len(logs) == 1
@@ -1,4 +1,6 @@
 import asyncio
+import hashlib
+import io
 from types import SimpleNamespace
 import importlib
 
@@ -14,6 +16,7 @@ class DummyUploadFile:
         self.filename = filename
         self.content_type = content_type
         self._content = content
+        self.file = io.BytesIO(content)
 
     async def read(self):
         return self._content
@@ -64,3 +67,5 @@ def test_upload_document_db(monkeypatch, tmp_path):
     # UploadedDocuments uses 'file_name' column; assert that instead of legacy 'name'
     assert result.file_name == "file.pdf"
     assert getattr(result, 'download_url', None) is not None
+    assert result.sha256 == hashlib.sha256(b"hello world").hexdigest()
+    assert result.size_bytes == len(b"hello world")
@@ -4,11 +4,16 @@ Provide small async wrappers so tests can create users and services consistently
 without duplicating the same UUID suffix logic across files.
 """
 import uuid
+from contextlib import contextmanager
 from typing import Optional
 
+import pytest
+from starlette.requests import Request
+
 from crud.users import create_user as crud_create_user
 from crud.applications import create_application as crud_create_application
 from database.session import get_sessionmaker
+from database.query_stats import capture_queries
 from sqlalchemy.future import select
 
 
@@ -52,4 +57,40 @@ async def create_application(db, user_id: int, service_id: int, reference_number
     """Create an application using the CRUD helper. Generates a unique reference if none provided."""
     if reference_number is None:
         reference_number = f"REF-{uuid.uuid4().hex[:12]}"
-    return await crud_create_application(db, user_id, service_id, reference_number=reference_number, **kwargs)
\ No newline at end of file
+    return await crud_create_application(db, user_id, service_id, reference_number=reference_number, **kwargs)
+
+
+def make_request(client_ip: str = "127.0.0.1", method: str = "POST") -> Request:
+    """A bare Request from `client_ip`, for calling endpoints that take one directly."""
+    return Request({"type": "http", "method": method, "path": "/", "headers": [], "client": (client_ip, 50000)})
+
+
+@contextmanager
+def query_budget(max_queries: int, max_commits: Optional[int] = None):
+    """Fail the test if the enclosed block issues more than `max_queries` SQL statements
+    (or more than `max_commits` commits). Yields the QueryStats collector for extra assertions.
+
+    Usage:
+        with query_budget(3):
+            await crud_create_application(db, user.user_id, svc.service_id)
+    """
+    with capture_queries() as stats:
+        yield stats
+    _check_budget(stats.count, stats.commits, max_queries, max_commits, stats.repeated())
+
+
+def assert_query_budget(response, max_queries: int, max_commits: Optional[int] = None):
+    """Fail the test if an HTTP response (TestClient) reports more statements than `max_queries`.
+    Relies on the X-DB-Query-Count / X-DB-Commit-Count headers added by QueryStatsMiddleware.
+    """
+    count = int(response.headers["x-db-query-count"])
+    commits = int(response.headers["x-db-commit-count"])
+    _check_budget(count, commits, max_queries, max_commits, [])
+
+
+def _check_budget(count, commits, max_queries, max_commits, repeated):
+    if count > max_queries:
+        detail = "".join(f"\n  {n}x {sql[:120]}" for sql, n in repeated)
+        pytest.fail(f"query budget exceeded: {count} statements > {max_queries}{detail}")
+    if max_commits is not None and commits > max_commits:
+        pytest.fail(f"commit budget exceeded: {commits} commits > {max_commits}")
@@ -0,0 +1,211 @@
+"""Run EXPLAIN on every query the crud layer issues and report full table scans.
+
+Usage (from Backend/):
+    python tools/explain_crud.py                       # throwaway SQLite file, migrated to head
+    python tools/explain_crud.py --database-url URL    # sqlite or postgres; the workload INSERTs rows,
+                                                       # so point it at a scratch database
+    python tools/explain_crud.py --json                # machine-readable output
+
+`run_workload()` calls each crud function once against a small seeded dataset, labelling the statements
+it issues `<module>.<function>[variant]`. The same workload backs tests/test_query_plans.py, so a crud
+function added without a workload entry is neither reported nor snapshotted — add one here.
+
+Exit status is 1 when any plan contains a full scan.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker  # noqa: E402
+
+from crud import admin_applications, applications, blobs, documents, exports, payments, reference, stats, upload_sessions, users  # noqa: E402
+from crud.pagination import encode_cursor  # noqa: E402
+from database.explain import QueryPlan, StatementRecorder, explain_statements  # noqa: E402
+
+
+async def run_workload(engine: AsyncEngine, recorder: StatementRecorder) -> None:
+    """Seed one user/application/document/payment and call every crud read and write path once."""
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    step = recorder.step
+    suffix = uuid.uuid4().hex[:8]
+    since = datetime.utcnow() - timedelta(days=1)
+
+    async with Session() as db:
+        with step("users.create_user"):
+            user = await users.create_user(db, "Plan User", f"PLAN{suffix}V", f"plan+{suffix}@example.com", "pw", f"07{suffix[:8]}")
+        with step("users.get_user_by_email"):
+            await users.get_user_by_email(db, user.email)
+        with step("users.get_user_by_id"):
+            await users.get_user_by_id(db, user.user_id)
+        with step("users.get_user_by_nic_and_phone"):
+            await users.get_user_by_nic_and_phone(db, user.nic_number, user.phone_number)
+        # later steps read reference rows from the warm cache, as they do after startup
+        with step("reference.load"):
+            await reference.cache_for(db).get(db, reload=True)
+
+        with step("applications.create_application"):
+            app = await applications.create_application(db, user.user_id, 1, None)
+        with step("applications.get_application"):
+            await applications.get_application(db, app.application_id, user.user_id)
+        with step("applications.list_user_applications"):
+            await applications.list_user_applications(db, user.user_id)
+        with step("applications.add_document"):
+            doc = await applications.add_document(db, app.application_id, "Deed", "plan.pdf", "applications/plan.pdf", sha256="0" * 64, size_bytes=1)
+        with step("applications.list_application_documents"):
+            await applications.list_application_documents(db, app.application_id)
+        with step("applications.associate_documents_with_application"):
+            await applications.associate_documents_with_application(db, app.application_id, [doc.document_id])
+
+        with step("documents.list_user_documents"):
+            await documents.list_user_documents(db, user.user_id)
+        with step("documents.get_document_by_id"):
+            await documents.get_document_by_id(db, doc.document_id)
+        with step("documents.get_user_document"):
+            await documents.get_user_document(db, doc.document_id, user.user_id)
+        with step("documents.set_document_verification"):
+            await documents.set_document_verification(db, doc.document_id, "Verified", None)
+        with step("documents.list_documents_page"):
+            await documents.list_documents_page(db)
+        with step("documents.list_documents_page[cursor]"):
+            await documents.list_documents_page(db, cursor=encode_cursor(datetime.utcnow(), 2**31))
+        with step("documents.list_documents_page[verification_status]"):
+            await documents.list_documents_page(db, verification_status="Verified")
+        with step("documents.list_documents_page[application_id]"):
+            await documents.list_documents_page(db, application_id=app.application_id)
+        with step("documents.list_documents_page[uploaded_range]"):
+            await documents.list_documents_page(db, uploaded_from=since)
+
+        with step("admin_applications.list_applications_page"):
+            await admin_applications.list_applications_page(db)
+        with step("admin_applications.list_applications_page[cursor]"):
+            await admin_applications.list_applications_page(db, cursor=encode_cursor(datetime.utcnow(), 2**31))
+        with step("admin_applications.list_applications_page[status_id]"):
+            await admin_applications.list_applications_page(db, status_id=1)
+        with step("admin_applications.list_applications_page[service_id]"):
+            await admin_applications.list_applications_page(db, service_id=1)
+        with step("admin_applications.list_applications_page[assigned_officer_id]"):
+            await admin_applications.list_applications_page(db, assigned_officer_id=1)
+        with step("admin_applications.list_applications_page[date_range]"):
+            await admin_applications.list_applications_page(db, date_from=since)
+        with step("admin_applications.get_application_detail"):
+            await admin_applications.get_application_detail(db, app.application_id)
+        with step("admin_applications.update_application_status"):
+            await admin_applications.update_application_status(db, app.application_id, 2, None)
+        with step("admin_applications.get_application_logs"):
+            await admin_applications.get_application_logs(db, app.application_id)
+
+        with step("payments.create_payment_for_application"):
+            payment = SimpleNamespace(application_id=app.application_id, amount=100, payment_method="card", transaction_reference=f"TX-{suffix}")
+            await payments.create_payment_for_application(db, payment, user.user_id)
+        with step("payments.list_payments_for_application"):
+            await payments.list_payments_for_application(db, app.application_id, user.user_id)
+
+        with step("stats.get_dashboard_stats"):
+            await stats.get_dashboard_stats(db)
+
+        with step("blobs.referenced_blobs"):
+            await blobs.referenced_blobs(db, ["0" * 64, "f" * 64])
+        with step("blobs.rebuild_refcounts"):
+            await blobs.rebuild_refcounts(db)
+        with step("blobs.forget"):
+            await blobs.forget(db, ["f" * 64])
+
+        for kind, filters in (
+            ("applications", {}),
+            ("applications", {"status_id": 1}),
+            ("documents", {}),
+            ("documents", {"verification_status": "Verified"}),
+            ("payments", {}),
+            ("payments", {"application_id": app.application_id}),
+        ):
+            label = f"exports.export_chunks[{kind}{',' + ','.join(filters) if filters else ''}]"
+            with step(label):
+                async for _ in exports.export_chunks(db, kind, "ndjson", **filters):
+                    pass
+
+        with step("upload_sessions.create_session"):
+            upload = await upload_sessions.create_session(db, user.user_id, app.application_id, "Deed", "big.pdf", 10)
+        with step("upload_sessions.get_session"):
+            await upload_sessions.get_session(db, upload.upload_id, user.user_id)
+        with step("upload_sessions.claim"):
+            token = await upload_sessions.claim(db, upload.upload_id, user.user_id, 0)
+        with step("upload_sessions.renew"):
+            await upload_sessions.renew(db, upload.upload_id, token)
+        with step("upload_sessions.advance"):
+            await upload_sessions.advance(db, upload.upload_id, token, 10)
+        token = await upload_sessions.claim(db, upload.upload_id, user.user_id, 10)
+        with step("upload_sessions.release"):
+            await upload_sessions.release(db, upload.upload_id, token)
+        token = await upload_sessions.claim(db, upload.upload_id, user.user_id, 10)
+        with step("upload_sessions.complete"):
+            await upload_sessions.complete(db, upload.upload_id, token, doc.document_id)
+        with step("upload_sessions.existing_ids"):
+            await upload_sessions.existing_ids(db, [upload.upload_id])
+        with step("upload_sessions.purge_expired"):
+            await upload_sessions.purge_expired(db)
+        with step("upload_sessions.delete_session"):
+            await upload_sessions.delete_session(db, upload.upload_id, user.user_id)
+
+        with step("applications.add_document[duplicate]"):
+            extra = await applications.add_document(db, app.application_id, "Deed", "extra.pdf", "applications/extra.pdf", sha256="0" * 64, size_bytes=1)
+        with step("documents.delete_document"):
+            await documents.delete_document(db, extra.document_id)
+
+
+async def collect_plans(engine: AsyncEngine) -> List[QueryPlan]:
+    with StatementRecorder(engine) as recorder:
+        await run_workload(engine, recorder)
+    return await explain_statements(engine, recorder.statements)
+
+
+def _print_report(plans: List[QueryPlan]) -> None:
+    for plan in plans:
+        marker = "FULL SCAN" if plan.full_scans else ("sort" if plan.temp_sorts else "ok")
+        print(f"[{marker:>9}] {plan.label}")
+        for line in plan.lines:
+            print(f"            {line}")
+    bad = [p for p in plans if p.full_scans]
+    print(f"\n{len(plans)} statements explained, {len(bad)} with full scans")
+
+
+async def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    from database.migrations import ensure_schema
+    from database.session import _create_engine
+
+    tmp = None
+    url = args.database_url
+    if url is None:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'explain.sqlite3')}"
+    engine = _create_engine(url, False, None)
+    try:
+        await ensure_schema(engine)
+        plans = await collect_plans(engine)
+    finally:
+        await engine.dispose()
+        if tmp is not None:
+            tmp.cleanup()
+
+    if args.json:
+        print(json.dumps([{"label": p.label, "sql": p.sql, "plan": p.lines, "full_scans": p.full_scans, "temp_sorts": p.temp_sorts} for p in plans], indent=2))
+    else:
+        _print_report(plans)
+    return 1 if any(p.full_scans for p in plans) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -1,5 +1,17 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import io
 import os
-from typing import IO
+import posixpath
+import secrets
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlencode
 
 """Local filesystem storage shim.
 
@@ -8,51 +20,450 @@ has no dependency on MinIO or other external SDKs.
 
 Functions:
 - upload_file_to_minio(object_name, data, content_type) -> object_key
-- generate_presigned_url(object_name, expires) -> str
+- upload_stream(object_name, source, max_bytes) -> StoredObject  (async, chunked, off the event loop)
+- generate_presigned_url(object_name, expires) -> str, generate_presigned_urls(object_names, expires)
+- verify_presigned(object_name, expires_at, signature) -> bool
+- delete_object(object_name), collect_garbage(referenced_keys, referenced_blobs)
+- open_staging / close_staging / save_file / discard_staging: staging files for resumable uploads
+
+Content-addressed mode (STORAGE_CONTENT_ADDRESSED, on by default): file contents are stored once per
+SHA-256 under uploaded_documents/.cas/<aa>/<bb>/<sha256>, and each object key
+(uploaded_documents/<object_name>) is a hard link to its blob. Callers keep using object keys; uploading
+content that is already stored only adds a link, and reading a key is reading the blob. Stored files are
+never modified in place (every write goes to a new file that is renamed over the key), so shared blobs
+cannot change under another key. Where hard links are unsupported the blob is copied to the key instead.
+How many UploadedDocuments rows use each blob is counted in `storage_blobs` (crud/blobs.py); blobs are
+removed only by `collect_garbage`.
+
+Download URLs are signed: /internal/static/<object_name>?expires=<unix time>&signature=<HMAC-SHA256 of
+the expiry and key>. Signing and verifying need only STORAGE_URL_SECRET (no database, no disk), so the
+endpoint that serves them trusts the signature instead of looking up the caller, and a page of documents
+gets its URLs for the cost of one HMAC each. Changing the secret revokes every outstanding URL.
+
+Endpoints use this module through tools/storage.py (`LocalStorage`, the default backend), which runs
+these blocking functions on worker threads.
 
 Note: function names retain the historical "minio" name for compatibility with
 existing imports; the implementation is local filesystem-based.
 """
 
+try:
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+except ValueError:
+    UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-def upload_file_to_minio(object_name: str, data: bytes | IO, content_type: str) -> str:
-    """Save the provided bytes or file-like to uploaded_documents/<object_name>.
+CONTENT_ADDRESSED = os.getenv('STORAGE_CONTENT_ADDRESSED', 'true').strip().lower() in ('1', 'true', 'yes', 'on')
 
-    Returns the object_name which should be persisted in the DB as the object's key.
+# signing key for download URLs, derived from the secret so the raw (possibly shared JWT) secret is not reused
+_URL_SIGNING_KEY = hmac.digest(
+    (os.getenv('STORAGE_URL_SECRET') or os.getenv('JWT_SECRET') or 'CHANGE_ME').encode(),
+    b'lro download url', 'sha256',
+)
+# expiry times are rounded up to this many seconds, so URLs for a file issued within one step are
+# identical and the browser cache (see /internal/static) keeps working across page loads
+PRESIGNED_URL_EXPIRY_STEP = 60
+
+# extended attribute holding the hex SHA-256 of a stored file; set on the inode, so every key linked to a
+# blob carries it (used for strong ETags without a database lookup)
+SHA256_XATTR = 'user.lro.sha256'
+
+# blob and resumable-upload staging directories inside the uploads root; object keys may not start with them
+CAS_DIR = '.cas'
+STAGING_DIR = '.staging'
+_RESERVED_DIRS = (CAS_DIR, STAGING_DIR)
+_TMP_PREFIXES = ('.upload-', '.link-')
+
+
+class UploadTooLarge(ValueError):
+    """The source exceeded max_bytes; nothing was stored."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class ChecksumMismatch(ValueError):
+    """The content's SHA-256 differs from the one the client declared; nothing was stored."""
+
+    def __init__(self, expected: str, actual: str):
+        super().__init__(f"sha256 mismatch: expected {expected}, got {actual}")
+        self.expected = expected
+        self.actual = actual
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    key: str
+    size: int
+    sha256: str
+    # the content was already stored: only the key link was written
+    deduplicated: bool = False
+
+
+def _uploads_root() -> str:
+    return os.path.join(os.getcwd(), 'uploaded_documents')
+
+
+def is_reserved_key(object_name: str) -> bool:
+    """True for names inside the blob store or staging area, which are not addressable as object keys."""
+    first = posixpath.normpath(object_name.replace('\\', '/')).lstrip('/').split('/', 1)[0]
+    return first in _RESERVED_DIRS
+
+
+def is_valid_key(object_name: str) -> bool:
+    """True for a canonical relative key ("a/b/c.pdf") that names a file under the uploads root and outside
+    the blob store and staging area: no absolute path, backslash, NUL, empty, "." or ".." segment."""
+    if not object_name or '\\' in object_name or '\x00' in object_name or object_name.startswith('/'):
+        return False
+    if posixpath.normpath(object_name) != object_name or '..' in object_name.split('/'):
+        return False
+    if is_reserved_key(object_name):
+        return False
+    root = os.path.abspath(_uploads_root())
+    return os.path.abspath(os.path.join(root, object_name)).startswith(root + os.sep)
+
+
+def _check_key(object_name: str) -> None:
+    if not is_valid_key(object_name):
+        raise ValueError(
+            f"invalid object name {object_name!r}: must be a relative path without '..' outside {CAS_DIR}/ and {STAGING_DIR}/"
+        )
+
+
+def blob_path(sha256: str) -> str:
+    """Path of the blob for a hex SHA-256, fanned out over two directory levels (65536 leaf directories)."""
+    return os.path.join(_uploads_root(), CAS_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def _copy_to_temp(source: IO[bytes], tmp_dir: str, max_bytes: Optional[int], chunk_size: int) -> Tuple[str, int, str]:
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        source.seek(0)
+    except Exception:
+        pass
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(prefix='.upload-', dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        _unlink(tmp_path)
+        raise
+    return tmp_path, size, digest.hexdigest()
+
+
+def _unlink(path: str) -> bool:
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _tag_sha256(path: str, sha256: str) -> None:
+    """Record the content hash on the file's inode where the filesystem supports user xattrs."""
+    try:
+        os.setxattr(path, SHA256_XATTR, sha256.encode('ascii'))
+    except (AttributeError, OSError):
+        pass
+
+
+def stored_sha256(path: str) -> Optional[str]:
+    """The SHA-256 recorded when `path` was stored, or None (older file, or no xattr support)."""
+    try:
+        value = os.getxattr(path, SHA256_XATTR).decode('ascii')
+    except (AttributeError, OSError, UnicodeDecodeError):
+        return None
+    return value if len(value) == 64 else None
+
+
+def _link_or_copy(src: str, dest: str) -> None:
+    """Atomically make `dest` a hard link to `src` (a copy where links are unsupported).
+
+    Raises FileNotFoundError if `src` disappears first.
     """
-    uploads_root = os.path.join(os.getcwd(), 'uploaded_documents')
-    os.makedirs(uploads_root, exist_ok=True)
-    dest_path = os.path.join(uploads_root, object_name)
-    dest_dir = os.path.dirname(dest_path)
-    os.makedirs(dest_dir, exist_ok=True)
+    tmp = os.path.join(os.path.dirname(dest), f".link-{secrets.token_hex(8)}")
+    try:
+        os.link(src, tmp)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(src, tmp)
+    try:
+        os.replace(tmp, dest)
+    except BaseException:
+        _unlink(tmp)
+        raise
+
+
+def _store_blob(tmp_path: str, sha256: str, dest_path: str, move: bool = True) -> bool:
+    """Point `dest_path` at the blob for `sha256`, moving `tmp_path` into the store if it is new
+    (linking it instead when `move` is false).
 
-    # Accept either bytes or file-like
-    if hasattr(data, 'read'):
-        # file-like
+    Returns True when the blob already existed (the upload was a duplicate).
+    """
+    blob = blob_path(sha256)
+    if os.path.exists(blob):
         try:
-            data.seek(0)
-        except Exception:
-            pass
-        content = data.read()
-        if isinstance(content, (bytes, bytearray)):
-            with open(dest_path, 'wb') as f:
-                f.write(content)
-        else:
-            # assume iterable of bytes
-            with open(dest_path, 'wb') as f:
-                for chunk in content:
-                    f.write(chunk)
+            _link_or_copy(blob, dest_path)
+            return True
+        except FileNotFoundError:
+            pass  # garbage-collected between the check and the link: store this copy
+    os.makedirs(os.path.dirname(blob), exist_ok=True)
+    if move:
+        os.replace(tmp_path, blob)
     else:
-        with open(dest_path, 'wb') as f:
-            f.write(data)
+        _link_or_copy(tmp_path, blob)
+    _link_or_copy(blob, dest_path)
+    return False
+
+
+def save_stream(object_name: str, source: IO[bytes], max_bytes: Optional[int] = None, chunk_size: int = UPLOAD_CHUNK_SIZE, content_addressed: Optional[bool] = None, expected_sha256: Optional[str] = None) -> StoredObject:
+    """Copy `source` to uploaded_documents/<object_name> in `chunk_size` pieces, hashing as it goes.
+
+    At most one chunk is held in memory. The data goes to a temporary file and is renamed into place
+    when complete, so readers never see a partial object. In content-addressed mode the temporary file
+    becomes the blob, or is discarded when that content is already stored. Raises UploadTooLarge, and
+    removes the temporary file, as soon as more than `max_bytes` have been read, and ChecksumMismatch,
+    storing nothing, when `expected_sha256` is given and differs.
+    Blocking: call it through `upload_stream` from async code.
+    """
+    _check_key(object_name)
+    cas = CONTENT_ADDRESSED if content_addressed is None else content_addressed
+    dest_path = os.path.join(_uploads_root(), object_name)
+    dest_dir = os.path.dirname(dest_path)
+    os.makedirs(dest_dir, exist_ok=True)
+    tmp_dir = os.path.join(_uploads_root(), CAS_DIR, 'tmp') if cas else dest_dir
+    tmp_path, size, sha256 = _copy_to_temp(source, tmp_dir, max_bytes, chunk_size)
+    try:
+        if expected_sha256 is not None and expected_sha256.lower() != sha256:
+            raise ChecksumMismatch(expected_sha256.lower(), sha256)
+        if cas:
+            deduplicated = _store_blob(tmp_path, sha256, dest_path)
+        else:
+            os.replace(tmp_path, dest_path)
+            deduplicated = False
+    finally:
+        _unlink(tmp_path)
+    _tag_sha256(dest_path, sha256)
+    return StoredObject(object_name, size, sha256, deduplicated)
 
+
+async def upload_stream(object_name: str, source: IO[bytes], max_bytes: Optional[int] = None, chunk_size: int = UPLOAD_CHUNK_SIZE) -> StoredObject:
+    """`save_stream` on a worker thread, so reads, hashing and disk writes stay off the event loop."""
+    return await asyncio.to_thread(save_stream, object_name, source, max_bytes, chunk_size)
+
+
+def upload_file_to_minio(object_name: str, data: bytes | IO, content_type: str) -> str:
+    """Save the provided bytes or file-like to uploaded_documents/<object_name>.
+
+    Returns the object_name which should be persisted in the DB as the object's key.
+    """
+    source = data if hasattr(data, 'read') else io.BytesIO(data)
+    save_stream(object_name, source)
     return object_name
 
 
+def _url_signature(object_name: str, expires_at: int) -> str:
+    digest = hmac.digest(_URL_SIGNING_KEY, f"{expires_at}:{object_name}".encode('utf-8'), 'sha256')
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode('ascii')
+
+
+def _expiry(expires: int, now: Optional[float] = None) -> int:
+    deadline = int(now if now is not None else time.time()) + expires
+    return -(-deadline // PRESIGNED_URL_EXPIRY_STEP) * PRESIGNED_URL_EXPIRY_STEP
+
+
+def _signed_url(object_name: str, expires_at: int) -> str:
+    if not is_valid_key(object_name):
+        return ""
+    query = urlencode({'expires': expires_at, 'signature': _url_signature(object_name, expires_at)})
+    return f"/internal/static/{quote(object_name)}?{query}"
+
+
 def generate_presigned_url(object_name: str, expires: int = 60 * 5) -> str:
-    """Return an internal download path for a stored file if it exists, otherwise empty string."""
-    uploads_root = os.path.join(os.getcwd(), 'uploaded_documents')
-    candidate = os.path.join(uploads_root, object_name)
-    if os.path.exists(candidate):
-        return f"/internal/static/{object_name}"
-    return ""
+    """Return a download path for `object_name`, valid for about `expires` seconds; "" for invalid or reserved names.
+
+    The URL is not checked against storage: a key with no file behind it gets 404 when fetched.
+    """
+    return _signed_url(object_name, _expiry(expires))
+
+
+def generate_presigned_urls(object_names: Iterable[str], expires: int = 60 * 5) -> List[str]:
+    """generate_presigned_url for many keys at once, with one shared expiry."""
+    expires_at = _expiry(expires)
+    return [_signed_url(name, expires_at) for name in object_names]
+
+
+def verify_presigned(object_name: str, expires_at: int, signature: str, now: Optional[float] = None) -> bool:
+    """True when `signature` was issued for `object_name` and `expires_at`, and that time has not passed."""
+    if expires_at <= (now if now is not None else time.time()):
+        return False
+    expected = _url_signature(object_name, expires_at)
+    return hmac.compare_digest(expected.encode('ascii'), signature.encode('utf-8', 'surrogateescape'))
+
+
+def staging_path(upload_id: str) -> str:
+    return os.path.join(_uploads_root(), STAGING_DIR, upload_id)
+
+
+def open_staging(upload_id: str, offset: int) -> IO[bytes]:
+    """Open the staging file of a resumable upload for writing at `offset`.
+
+    Bytes after `offset` were written by a request that never recorded its offset, and are dropped.
+    """
+    path = staging_path(upload_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path) and os.stat(path).st_nlink > 1:
+        # already linked into the blob store by an interrupted finalize: never modify shared content in place
+        tmp = os.path.join(os.path.dirname(path), f".link-{secrets.token_hex(8)}")
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, path)
+    f = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), 'r+b')
+    f.truncate(offset)
+    f.seek(offset)
+    return f
+
+
+def close_staging(f: IO[bytes]) -> None:
+    """Flush and fsync before the caller records the new offset, so a recorded offset is always on disk."""
+    try:
+        f.flush()
+        os.fsync(f.fileno())
+    finally:
+        f.close()
+
+
+def discard_staging(upload_id: str) -> bool:
+    return _unlink(staging_path(upload_id))
+
+
+def iter_staging() -> Iterator[Tuple[str, os.stat_result]]:
+    """(upload_id, stat) for every staging file."""
+    staging_root = os.path.join(_uploads_root(), STAGING_DIR)
+    try:
+        names = os.listdir(staging_root)
+    except FileNotFoundError:
+        return
+    for name in names:
+        path = os.path.join(staging_root, name)
+        if os.path.isfile(path):
+            yield name, os.stat(path)
+
+
+def save_file(object_name: str, path: str, expected_sha256: Optional[str] = None, chunk_size: int = UPLOAD_CHUNK_SIZE, content_addressed: Optional[bool] = None) -> StoredObject:
+    """Store a complete local file (a finished staging file) under `object_name`.
+
+    The file is hashed in `chunk_size` pieces, then linked into place rather than copied where the
+    filesystem allows; `path` itself is left for the caller to discard. Raises ChecksumMismatch, before
+    storing anything, when `expected_sha256` is given and differs.
+    Blocking: run it on a worker thread from async code.
+    """
+    _check_key(object_name)
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+    sha256 = digest.hexdigest()
+    if expected_sha256 is not None and expected_sha256.lower() != sha256:
+        raise ChecksumMismatch(expected_sha256.lower(), sha256)
+    dest_path = os.path.join(_uploads_root(), object_name)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    cas = CONTENT_ADDRESSED if content_addressed is None else content_addressed
+    if cas:
+        deduplicated = _store_blob(path, sha256, dest_path, move=False)
+    else:
+        _link_or_copy(path, dest_path)
+        deduplicated = False
+    _tag_sha256(dest_path, sha256)
+    return StoredObject(object_name, size, sha256, deduplicated)
+
+
+def delete_object(object_name: str) -> bool:
+    """Remove an object key. Its blob stays until `collect_garbage` finds it unreferenced."""
+    _check_key(object_name)
+    return _unlink(os.path.join(_uploads_root(), object_name))
+
+
+def iter_objects() -> Iterator[Tuple[str, os.stat_result]]:
+    """(object_name, stat) for every stored object key, with '/' separators."""
+    root = _uploads_root()
+    for dirpath, dirnames, filenames in os.walk(root):
+        if dirpath == root:
+            dirnames[:] = [d for d in dirnames if d not in _RESERVED_DIRS]
+        for name in filenames:
+            if name.startswith(_TMP_PREFIXES):
+                continue
+            path = os.path.join(dirpath, name)
+            yield os.path.relpath(path, root).replace(os.sep, '/'), os.stat(path)
+
+
+def iter_blobs() -> Iterator[Tuple[str, os.stat_result]]:
+    """(sha256, stat) for every blob in the content-addressed store."""
+    cas_root = os.path.join(_uploads_root(), CAS_DIR)
+    for dirpath, dirnames, filenames in os.walk(cas_root):
+        if dirpath == cas_root and 'tmp' in dirnames:
+            dirnames.remove('tmp')
+        for name in filenames:
+            if len(name) == 64 and not name.startswith(_TMP_PREFIXES):
+                yield name, os.stat(os.path.join(dirpath, name))
+
+
+def collect_garbage(referenced_keys: Iterable[str], referenced_blobs: Iterable[str], grace_seconds: float = 3600.0, dry_run: bool = False) -> Dict[str, list]:
+    """Remove object keys and blobs that nothing references any more.
+
+    - keys not in `referenced_keys` (UploadedDocuments.file_path values);
+    - blobs not in `referenced_blobs` (hashes with a positive ref_count) and not linked from any key;
+    - temporary files left by interrupted uploads.
+    Anything changed within the last `grace_seconds` is kept, so uploads whose rows are not committed
+    yet are safe. ctime is used because linking a blob to a new key updates it even though the content
+    is old. Returns the removed (or, with dry_run, removable) names.
+    """
+    cutoff = time.time() - grace_seconds
+    keys = set(referenced_keys)
+    blobs = set(referenced_blobs)
+    removed: Dict[str, list] = {"keys": [], "blobs": [], "temp": []}
+    released: Dict[int, int] = {}  # inode -> key links removed (or, with dry_run, removable)
+
+    for name, st in list(iter_objects()):
+        if name not in keys and st.st_ctime < cutoff:
+            removed["keys"].append(name)
+            released[st.st_ino] = released.get(st.st_ino, 0) + 1
+            if not dry_run:
+                _unlink(os.path.join(_uploads_root(), name))
+
+    for sha256, st in list(iter_blobs()):
+        if sha256 in blobs or st.st_ctime >= cutoff:
+            continue
+        # a blob still linked from a key is in use whatever its count says; the key pass has already
+        # unlinked removed keys unless this is a dry run
+        links = st.st_nlink - (released.get(st.st_ino, 0) if dry_run else 0)
+        if links > 1:
+            continue
+        removed["blobs"].append(sha256)
+        if not dry_run:
+            _unlink(blob_path(sha256))
+
+    root = _uploads_root()
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if name.startswith(_TMP_PREFIXES) and os.stat(path).st_ctime < cutoff:
+                removed["temp"].append(os.path.relpath(path, root).replace(os.sep, '/'))
+                if not dry_run:
+                    _unlink(path)
+    return removed
@@ -0,0 +1,383 @@
+"""S3-compatible storage backend (MinIO, AWS S3) for tools/storage.py.
+
+Talks the S3 REST API directly through one pooled `httpx.AsyncClient` per process (S3_MAX_CONNECTIONS
+connections, kept alive between requests), with requests signed by AWS Signature Version 4. No SDK is
+needed, in keeping with tools/minio_storage.py.
+
+Uploads: objects smaller than S3_PART_SIZE (default 8 MiB, minimum 5 MiB) go up in one PUT. Larger ones
+use a multipart upload. While one part is read from the source on a worker thread, up to
+S3_UPLOAD_CONCURRENCY (default 4) parts are in flight, so at most concurrency + 1 parts are in memory.
+Each part is retried on connection errors and 5xx responses. The SHA-256 is computed while reading. A
+failed, oversized or mismatching upload is aborted before completion, so the key never shows partial or
+wrong content. Single PUTs record the hash as `x-amz-meta-sha256`.
+
+Downloads are presigned GET URLs (S3_PRESIGN_ENDPOINT_URL when clients reach the service under another
+host name than the app does). Signing is pure CPU.
+
+Keys are path-style (`<endpoint>/<bucket>/<key>`), which MinIO and AWS S3 both accept.
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from typing import IO, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+import httpx
+
+from database.session import _env_int
+from tools.minio_storage import ChecksumMismatch, StoredObject, UploadTooLarge, _check_key
+from tools.storage import ObjectInfo, ObjectNotFound, StorageBackend
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+MAX_PRESIGN_SECONDS = 7 * 24 * 3600
+
+
+class S3Error(Exception):
+    """An error response from the S3 service."""
+
+    def __init__(self, status: int, code: str = "", message: str = ""):
+        super().__init__(f"S3 {status} {code}: {message}".rstrip(": "))
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _uri_encode(value: str, safe: str = "") -> str:
+    # RFC 3986 unreserved characters stay as they are; "/" only where `safe` allows it (paths)
+    return quote(value, safe=safe)
+
+
+def _amz_date(now: float) -> str:
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(now))
+
+
+class SigV4Signer:
+    """AWS Signature Version 4 for one set of credentials, region and service."""
+
+    def __init__(self, access_key: str, secret_key: str, region: str = "us-east-1", service: str = "s3"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+        self._key: Tuple[str, bytes] = ("", b"")
+
+    def _signing_key(self, date: str) -> bytes:
+        # derived once per day
+        if self._key[0] != date:
+            key = hmac.digest(("AWS4" + self.secret_key).encode(), date.encode(), "sha256")
+            for part in (self.region, self.service, "aws4_request"):
+                key = hmac.digest(key, part.encode(), "sha256")
+            self._key = (date, key)
+        return self._key[1]
+
+    def _scope(self, amz_date: str) -> str:
+        return f"{amz_date[:8]}/{self.region}/{self.service}/aws4_request"
+
+    def _signature(self, method: str, path: str, query: Sequence[Tuple[str, str]], headers: Dict[str, str],
+                   payload_hash: str, amz_date: str) -> Tuple[str, str]:
+        canonical_query = "&".join(f"{k}={v}" for k, v in sorted((_uri_encode(k), _uri_encode(v)) for k, v in query))
+        names = sorted(headers)
+        canonical_headers = "".join(f"{name}:{' '.join(str(headers[name]).split())}\n" for name in names)
+        signed_headers = ";".join(names)
+        canonical_request = "\n".join(
+            [method, _uri_encode(path, "/"), canonical_query, canonical_headers, signed_headers, payload_hash]
+        )
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, self._scope(amz_date),
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        signature = hmac.new(self._signing_key(amz_date[:8]), string_to_sign.encode(), "sha256").hexdigest()
+        return signed_headers, signature
+
+    def sign_headers(self, method: str, host: str, path: str, query: Sequence[Tuple[str, str]] = (),
+                     headers: Optional[Dict[str, str]] = None, payload_hash: str = UNSIGNED_PAYLOAD,
+                     now: Optional[float] = None) -> Dict[str, str]:
+        """The request headers plus x-amz-date, x-amz-content-sha256 and Authorization (names lowercased)."""
+        amz_date = _amz_date(time.time() if now is None else now)
+        signed = {name.lower(): value for name, value in (headers or {}).items()}
+        signed.update({"host": host, "x-amz-date": amz_date, "x-amz-content-sha256": payload_hash})
+        signed_headers, signature = self._signature(method, path, query, signed, payload_hash, amz_date)
+        signed["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{self._scope(amz_date)}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        del signed["host"]  # set by the HTTP client from the URL
+        return signed
+
+    def presign_query(self, method: str, host: str, path: str, expires: int, now: Optional[float] = None) -> str:
+        """Query string that authorizes `method` on `path` for `expires` seconds."""
+        amz_date = _amz_date(time.time() if now is None else now)
+        query = [
+            ("X-Amz-Algorithm", "AWS4-HMAC-SHA256"),
+            ("X-Amz-Credential", f"{self.access_key}/{self._scope(amz_date)}"),
+            ("X-Amz-Date", amz_date),
+            ("X-Amz-Expires", str(expires)),
+            ("X-Amz-SignedHeaders", "host"),
+        ]
+        _, signature = self._signature(method, path, query, {"host": host}, UNSIGNED_PAYLOAD, amz_date)
+        query.append(("X-Amz-Signature", signature))
+        return "&".join(f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in query)
+
+
+def _host(url: httpx.URL) -> str:
+    return url.host + (f":{url.port}" if url.port else "")
+
+
+def _read_part(source: IO[bytes], n: int, digest) -> bytes:
+    """Up to `n` bytes of `source` (fewer only at the end), hashed into `digest`. Blocking."""
+    chunks, size = [], 0
+    while size < n:
+        chunk = source.read(n - size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    data = b"".join(chunks)
+    digest.update(data)
+    return data
+
+
+class S3Storage(StorageBackend):
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        part_size: int = 8 * 1024 * 1024,
+        concurrency: int = 4,
+        max_connections: int = 32,
+        presign_endpoint_url: Optional[str] = None,
+        retries: int = 2,
+        timeout: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.endpoint = httpx.URL(endpoint_url.rstrip("/"))
+        self.presign_endpoint = httpx.URL((presign_endpoint_url or endpoint_url).rstrip("/"))
+        self.bucket = bucket
+        self.signer = SigV4Signer(access_key, secret_key, region)
+        self.part_size = part_size
+        self.concurrency = concurrency
+        self.max_connections = max_connections
+        self.retries = retries
+        self.timeout = timeout
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls) -> "S3Storage":
+        endpoint, bucket = os.getenv("S3_ENDPOINT_URL"), os.getenv("S3_BUCKET")
+        if not endpoint or not bucket:
+            raise ValueError("STORAGE_BACKEND=s3 needs S3_ENDPOINT_URL and S3_BUCKET")
+        return cls(
+            endpoint, bucket,
+            os.getenv("S3_ACCESS_KEY_ID", ""), os.getenv("S3_SECRET_ACCESS_KEY", ""),
+            region=os.getenv("S3_REGION", "us-east-1"),
+            part_size=max(MIN_PART_SIZE, _env_int("S3_PART_SIZE", 8 * 1024 * 1024)),
+            concurrency=max(1, _env_int("S3_UPLOAD_CONCURRENCY", 4)),
+            max_connections=max(1, _env_int("S3_MAX_CONNECTIONS", 32)),
+            presign_endpoint_url=os.getenv("S3_PRESIGN_ENDPOINT_URL") or None,
+        )
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                timeout=self.timeout,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    def _object_path(self, key: str) -> str:
+        _check_key(key)
+        return f"/{self.bucket}/{key.lstrip('/')}"
+
+    async def _send(self, method: str, key: str, query: Sequence[Tuple[str, str]] = (), headers: Optional[Dict[str, str]] = None,
+                    content: bytes = b"", payload_hash: str = UNSIGNED_PAYLOAD, stream: bool = False,
+                    ok: Tuple[int, ...] = (200,)) -> httpx.Response:
+        """One signed request, retried on connection errors and 5xx; raises S3Error for other statuses."""
+        path = self._object_path(key)
+        url = str(self.endpoint) + _uri_encode(path, "/")
+        if query:
+            url += "?" + "&".join(f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in query)
+        for attempt in range(self.retries + 1):
+            signed = self.signer.sign_headers(method, _host(self.endpoint), path, query, headers, payload_hash)
+            request = self._http().build_request(method, url, headers=signed, content=content or None)
+            try:
+                response = await self._http().send(request, stream=stream)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code in ok:
+                    return response
+                if stream:
+                    await response.aread()
+                    await response.aclose()
+                if response.status_code < 500 or attempt == self.retries:
+                    raise self._error(response)
+            await asyncio.sleep(0.1 * 2 ** attempt)
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _error(response: httpx.Response) -> S3Error:
+        code = message = ""
+        if response.content:
+            try:
+                root = ET.fromstring(response.content)
+                code = root.findtext("Code") or ""
+                message = root.findtext("Message") or ""
+            except ET.ParseError:
+                pass
+        return S3Error(response.status_code, code, message)
+
+    async def put_stream(self, key, source, max_bytes=None, content_type=None, expected_sha256=None):
+        self._object_path(key)
+        digest = hashlib.sha256()
+        size = 0
+
+        async def read_part() -> Tuple[bytes, bool]:
+            nonlocal size
+            # never read more than one byte past the limit
+            n = self.part_size if max_bytes is None else min(self.part_size, max_bytes + 1 - size)
+            data = await asyncio.to_thread(_read_part, source, n, digest)
+            size += len(data)
+            if max_bytes is not None and size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            return data, len(data) < n
+
+        data, eof = await read_part()
+        if not eof:
+            return await self._put_multipart(key, data, read_part, content_type, expected_sha256, digest, lambda: size)
+        sha256 = digest.hexdigest()
+        if expected_sha256 is not None and expected_sha256.lower() != sha256:
+            raise ChecksumMismatch(expected_sha256.lower(), sha256)
+        headers = {"content-type": content_type or "application/octet-stream", "x-amz-meta-sha256": sha256}
+        await self._send("PUT", key, headers=headers, content=data, payload_hash=sha256)
+        return StoredObject(key, size, sha256)
+
+    async def _put_multipart(self, key, first, read_part, content_type, expected_sha256, digest, total) -> StoredObject:
+        response = await self._send("POST", key, [("uploads", "")], {"content-type": content_type or "application/octet-stream"})
+        upload_id = ET.fromstring(response.content).findtext("{*}UploadId")
+        if not upload_id:
+            raise S3Error(response.status_code, "", "CreateMultipartUpload returned no UploadId")
+        etags: Dict[int, str] = {}
+        failed: List[BaseException] = []
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: List[asyncio.Task] = []
+
+        async def upload_part(number: int, data: bytes) -> None:
+            try:
+                query = [("partNumber", str(number)), ("uploadId", upload_id)]
+                etags[number] = (await self._send("PUT", key, query, content=data)).headers["etag"]
+            except BaseException as exc:
+                failed.append(exc)
+                raise
+            finally:
+                slots.release()
+
+        try:
+            number, data, eof = 1, first, False
+            while True:
+                await slots.acquire()
+                if failed:
+                    slots.release()
+                    raise failed[0]
+                tasks.append(asyncio.create_task(upload_part(number, data)))
+                if eof:
+                    break
+                data, eof = await read_part()
+                if not data:
+                    break
+                number += 1
+                if number > MAX_PARTS:
+                    raise ValueError(f"object needs more than {MAX_PARTS} parts of {self.part_size} bytes")
+            await asyncio.gather(*tasks)
+            sha256 = digest.hexdigest()
+            if expected_sha256 is not None and expected_sha256.lower() != sha256:
+                raise ChecksumMismatch(expected_sha256.lower(), sha256)
+            body = "".join(
+                f"<Part><PartNumber>{n}</PartNumber><ETag>{escape(etags[n])}</ETag></Part>" for n in sorted(etags)
+            )
+            response = await self._send(
+                "POST", key, [("uploadId", upload_id)],
+                content=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+            )
+            # errors during completion come back as 200 with an <Error> body
+            if ET.fromstring(response.content).tag.rsplit("}", 1)[-1] == "Error":
+                raise self._error(response)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self._send("DELETE", key, [("uploadId", upload_id)], ok=(204, 200, 404))
+            except Exception:
+                pass  # the bucket's lifecycle rule for incomplete uploads cleans up
+            raise
+        return StoredObject(key, total(), sha256)
+
+    async def get_stream(self, key, start=0, end=None):
+        if end is not None and end <= start:
+            return
+        headers = {"range": f"bytes={start}-{'' if end is None else end - 1}"} if start or end is not None else {}
+        try:
+            response = await self._send("GET", key, headers=headers, stream=True, ok=(200, 206))
+        except S3Error as exc:
+            if exc.status == 404:
+                raise ObjectNotFound(key)
+            if exc.status == 416:
+                return
+            raise
+        try:
+            async for chunk in response.aiter_bytes():
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def stat(self, key):
+        try:
+            response = await self._send("HEAD", key)
+        except S3Error as exc:
+            if exc.status == 404:
+                return None
+            raise
+        headers = response.headers
+        modified = headers.get("last-modified")
+        return ObjectInfo(
+            key,
+            int(headers.get("content-length", 0)),
+            parsedate_to_datetime(modified).timestamp() if modified else 0.0,
+            etag=headers.get("etag"),
+            sha256=headers.get("x-amz-meta-sha256"),
+            content_type=headers.get("content-type"),
+        )
+
+    async def delete(self, key):
+        await self._send("DELETE", key, ok=(204, 200, 404))
+
+    def _presign(self, key: str, expires: int, now: float) -> str:
+        path = self._object_path(key)
+        expires = max(1, min(int(expires), MAX_PRESIGN_SECONDS))
+        query = self.signer.presign_query("GET", _host(self.presign_endpoint), path, expires, now)
+        return f"{self.presign_endpoint}{_uri_encode(path, '/')}?{query}"
+
+    def presign(self, key, expires=300):
+        return self._presign(key, expires, time.time())
+
+    def presign_many(self, keys: Iterable[str], expires: int = 300) -> List[str]:
+        now = time.time()
+        return [self._presign(key, expires, now) for key in keys]
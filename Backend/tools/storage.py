@@ -0,0 +1,212 @@
+"""Async storage backends for document files.
+
+Endpoints store and hand out documents through `get_storage()`, which returns the backend selected by
+STORAGE_BACKEND:
+
+- `local` (default): `LocalStorage`, the uploads directory managed by tools/minio_storage.py
+  (content-addressed blobs, signed /internal/static URLs). Every filesystem call runs on a worker thread.
+- `s3`: `tools.s3_storage.S3Storage`, any S3-compatible service (MinIO, AWS S3), configured with the
+  S3_* variables. Downloads go straight to the service through presigned URLs.
+
+Interface (`StorageBackend`):
+- await put_stream(key, source, max_bytes, content_type, expected_sha256) -> StoredObject
+- await put_file(key, path, expected_sha256, content_type) -> StoredObject
+- get_stream(key, start, end) -> async iterator of bytes
+- await stat(key) -> ObjectInfo or None
+- await delete(key)
+- presign(key, expires) -> str, presign_many(keys, expires) -> list of str  (CPU only, not awaited)
+- await ping() -- readiness probe; raises when the backend cannot be reached
+- await aclose()
+- content_addressed: True when objects with the same sha256 share one stored blob. Only LocalStorage
+  does, and only with STORAGE_CONTENT_ADDRESSED on; its blobs are reference-counted in `storage_blobs` (crud/blobs.py) and collected by
+  scripts/gc_storage.py. Objects on S3 are independent, so no counts are kept for them.
+
+`source` is a regular (blocking) file object such as UploadFile.file; backends read it off the event
+loop. Both backends raise the exceptions of tools/minio_storage.py: UploadTooLarge and ChecksumMismatch,
+in each case with nothing stored.
+"""
+import abc
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import IO, AsyncIterator, Iterable, List, Optional
+
+from tools import minio_storage
+from tools.minio_storage import ChecksumMismatch, StoredObject, UploadTooLarge
+
+__all__ = [
+    "ChecksumMismatch",
+    "LocalStorage",
+    "ObjectInfo",
+    "ObjectNotFound",
+    "StorageBackend",
+    "StoredObject",
+    "UploadTooLarge",
+    "close_storage",
+    "get_storage",
+]
+
+
+# looked up (never written) by StorageBackend.ping()
+PROBE_KEY = "health/probe"
+
+
+class ObjectNotFound(LookupError):
+    """No object is stored under the key."""
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    key: str
+    size: int
+    last_modified: float
+    etag: Optional[str] = None
+    sha256: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+class StorageBackend(abc.ABC):
+    """Base class of the storage backends; see the module docstring for the contract."""
+
+    content_addressed = False
+
+    @abc.abstractmethod
+    async def put_stream(self, key: str, source: IO[bytes], max_bytes: Optional[int] = None,
+                         content_type: Optional[str] = None, expected_sha256: Optional[str] = None) -> StoredObject:
+        ...
+
+    async def put_file(self, key: str, path: str, expected_sha256: Optional[str] = None,
+                       content_type: Optional[str] = None) -> StoredObject:
+        """Store a complete local file; `path` is left for the caller to remove."""
+        f = await asyncio.to_thread(open, path, "rb")
+        try:
+            return await self.put_stream(key, f, content_type=content_type, expected_sha256=expected_sha256)
+        finally:
+            await asyncio.to_thread(f.close)
+
+    @abc.abstractmethod
+    def get_stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Bytes `start` up to (not including) `end` of the object; raises ObjectNotFound."""
+
+    @abc.abstractmethod
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        ...
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def presign(self, key: str, expires: int = 300) -> str:
+        ...
+
+    def presign_many(self, keys: Iterable[str], expires: int = 300) -> List[str]:
+        return [self.presign(key, expires) for key in keys]
+
+    async def ping(self) -> None:
+        """Stat a key that need not exist: a missing object is fine, an unreachable backend raises."""
+        await self.stat(PROBE_KEY)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class LocalStorage(StorageBackend):
+    """The uploads directory (tools/minio_storage.py), with blocking calls moved to worker threads."""
+
+    def __init__(self, chunk_size: int = minio_storage.UPLOAD_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    async def put_stream(self, key, source, max_bytes=None, content_type=None, expected_sha256=None):
+        return await asyncio.to_thread(
+            minio_storage.save_stream, key, source, max_bytes, self.chunk_size, None, expected_sha256,
+        )
+
+    async def put_file(self, key, path, expected_sha256=None, content_type=None):
+        # links the file into place instead of copying it
+        return await asyncio.to_thread(minio_storage.save_file, key, path, expected_sha256, self.chunk_size)
+
+    @property
+    def content_addressed(self) -> bool:
+        return minio_storage.CONTENT_ADDRESSED
+
+    def _path(self, key: str) -> str:
+        minio_storage._check_key(key)
+        return os.path.join(minio_storage._uploads_root(), key)
+
+    async def get_stream(self, key, start=0, end=None):
+        try:
+            f = await asyncio.to_thread(open, self._path(key), "rb")
+        except (FileNotFoundError, IsADirectoryError):
+            raise ObjectNotFound(key)
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                n = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+                chunk = await asyncio.to_thread(f.read, n)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(f.close)
+
+    def _stat(self, key: str) -> Optional[ObjectInfo]:
+        path = self._path(key)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        sha256 = minio_storage.stored_sha256(path)
+        return ObjectInfo(key, st.st_size, st.st_mtime, etag=sha256, sha256=sha256)
+
+    async def stat(self, key):
+        return await asyncio.to_thread(self._stat, key)
+
+    async def delete(self, key):
+        await asyncio.to_thread(minio_storage.delete_object, key)
+
+    def presign(self, key, expires=300):
+        return minio_storage.generate_presigned_url(key, expires)
+
+    async def ping(self):
+        def _check():
+            root = minio_storage._uploads_root()
+            if not os.path.isdir(root):
+                raise FileNotFoundError(f"{root} missing")
+            if not os.access(root, os.W_OK):
+                raise PermissionError(f"{root} not writable")
+        await asyncio.to_thread(_check)
+
+    def presign_many(self, keys, expires=300):
+        return minio_storage.generate_presigned_urls(keys, expires)
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """The process-wide backend named by STORAGE_BACKEND, created on first use."""
+    global _storage
+    if _storage is None:
+        name = os.getenv("STORAGE_BACKEND", "local").strip().lower()
+        if name == "s3":
+            from tools.s3_storage import S3Storage
+            _storage = S3Storage.from_env()
+        elif name == "local":
+            _storage = LocalStorage()
+        else:
+            raise ValueError(f"unknown STORAGE_BACKEND {name!r} (expected 'local' or 's3')")
+    return _storage
+
+
+async def close_storage() -> None:
+    """Release the backend's connections (app shutdown); the next get_storage() starts afresh."""
+    global _storage
+    if _storage is not None:
+        backend, _storage = _storage, None
+        await backend.aclose()